@@ -0,0 +1,205 @@
+"""
+Бенчмарки создания Channel, Video, PLVideo и PlayList и расчётов по плейлисту на подменном API.
+
+Запросы обслуживает FakeYoutubeClient из tests/fake_api.py, поэтому результаты воспроизводимы
+и не зависят от сети и квоты. Для каждого сценария и размера выводятся время, количество запросов
+к API, израсходованные единицы квоты и пиковый объём памяти (tracemalloc).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench                                  # размеры 10, 1000, 50000
+    python -m benchmarks.bench --sizes 10 1000 --latency 0.001 --error-rate 0.01
+    python -m benchmarks.bench --save                           # записать результаты как базовые
+    python -m benchmarks.bench --check                          # код возврата 1 при регрессии
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+# youtube загружает NumPy при первом использовании; загрузка не должна попадать в замер сценария
+import numpy  # noqa: F401
+from tests.fake_api import FakeYoutubeClient, make_playlist_item, make_video_item
+from youtube import Channel, PLVideo, PlayList, QuotaScheduler, RetryPolicy, Video, Youtube
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+PLAYLIST_ID = 'PL_bench'
+# сценарии с запросом на каждый объект ограничены этим количеством объектов, чтобы прогон на 50k не шёл часами
+PER_OBJECT_LIMIT = 1_000
+# разница во времени меньше этой считается шумом и не сообщается как регрессия
+MIN_WALL_DELTA = 0.05
+
+
+def make_data(size: int) -> dict:
+    """Возвращает данные подменного API: size каналов, size видео и плейлист из этих видео"""
+    videos = [make_video_item(f'v{i:06d}', duration=f'PT{i % 60}M{i % 59}S', view_count=i * 7, like_count=i % 977,
+                              channel_id=f'UC{i % 100:04d}') for i in range(size)]
+    channels = [{
+        'kind': 'youtube#channel',
+        'id': f'UC{i:06d}',
+        'snippet': {'title': f'Канал {i}', 'description': 'Описание', 'customUrl': f'@channel{i}'},
+        'statistics': {'subscriberCount': str(i * 3), 'videoCount': str(i % 500), 'viewCount': str(i * 11)},
+        'contentDetails': {'relatedPlaylists': {'uploads': f'UU{i:06d}'}},
+    } for i in range(size)]
+    playlist = {'kind': 'youtube#playlist', 'id': PLAYLIST_ID,
+                'snippet': {'title': 'Плейлист'}, 'contentDetails': {'itemCount': size}}
+    items = [make_playlist_item(PLAYLIST_ID, video['id'], position) for position, video in enumerate(videos)]
+    return {'channels': channels, 'videos': videos, 'playlists': [playlist], 'playlist_items': {PLAYLIST_ID: items}}
+
+
+def channel_construct(size: int) -> None:
+    for i in range(min(size, PER_OBJECT_LIMIT)):
+        Channel(channel_id=f'UC{i:06d}')
+
+
+def channel_load_many(size: int) -> None:
+    Channel.load_many(f'UC{i:06d}' for i in range(size))
+
+
+def video_construct(size: int) -> None:
+    for i in range(min(size, PER_OBJECT_LIMIT)):
+        Video(video_id=f'v{i:06d}')
+
+
+def video_get_many(size: int) -> None:
+    Video.get_many(f'v{i:06d}' for i in range(size))
+
+
+def plvideo_construct(size: int) -> None:
+    for i in range(min(size, PER_OBJECT_LIMIT)):
+        PLVideo(video_id=f'v{i:06d}', playlist_id=PLAYLIST_ID)
+
+
+def plvideo_load_many(size: int) -> None:
+    PLVideo.load_many((f'v{i:06d}', PLAYLIST_ID) for i in range(size))
+
+
+def playlist_construct(size: int) -> None:
+    len(PlayList(playlist_id=PLAYLIST_ID).video_ids)
+
+
+def playlist_total_duration(size: int) -> None:
+    PlayList(playlist_id=PLAYLIST_ID).total_duration
+
+
+def playlist_show_best_video(size: int) -> None:
+    PlayList(playlist_id=PLAYLIST_ID).show_best_video()
+
+
+SCENARIOS: Dict[str, Callable[[int], None]] = {
+    'channel_construct': channel_construct,
+    'channel_load_many': channel_load_many,
+    'video_construct': video_construct,
+    'video_get_many': video_get_many,
+    'plvideo_construct': plvideo_construct,
+    'plvideo_load_many': plvideo_load_many,
+    'playlist_construct': playlist_construct,
+    'playlist_total_duration': playlist_total_duration,
+    'playlist_show_best_video': playlist_show_best_video,
+}
+
+
+def run_scenario(scenario: Callable[[int], None], size: int, data: dict, latency: float, error_rate: float) -> dict:
+    """Выполняет сценарий на чистом клиенте и пустых реестрах и возвращает измерения"""
+    client = FakeYoutubeClient(**data, latency=latency, error_rate=error_rate)
+    scheduler = QuotaScheduler(budget=10 ** 9, qps=10 ** 9)
+    Youtube.set_client(client)
+    Youtube.set_scheduler(scheduler)
+    for cls in (Channel, Video, PlayList):
+        cls.registry.invalidate()
+    PLVideo.index.invalidate()
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        scenario(size)
+        wall = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        Youtube.set_client(None)
+        Youtube.set_scheduler(None)
+    return {'wall_s': round(wall, 4), 'calls': len(client.calls), 'quota': scheduler.stats()['used'],
+            'peak_kib': round(peak / 1024, 1)}
+
+
+def run(sizes: List[int], scenarios: List[str], latency: float = 0.0, error_rate: float = 0.0) -> dict:
+    """Выполняет сценарии для всех размеров и возвращает результаты {сценарий: {размер: измерения}}"""
+    results = {name: {} for name in scenarios}
+    for size in sizes:
+        data = make_data(size)
+        for name in scenarios:
+            results[name][str(size)] = run_scenario(SCENARIOS[name], size, data, latency, error_rate)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Возвращает описания регрессий: рост времени или памяти больше tolerance, рост запросов или квоты"""
+    regressions = []
+    for name, by_size in results.items():
+        for size, current in by_size.items():
+            previous = baseline.get(name, {}).get(size)
+            if previous is None:
+                continue
+            if current['wall_s'] > max(previous['wall_s'] * (1 + tolerance), previous['wall_s'] + MIN_WALL_DELTA):
+                regressions.append(f'{name}[{size}] wall_s: {previous["wall_s"]} -> {current["wall_s"]}')
+            if current['peak_kib'] > previous['peak_kib'] * (1 + tolerance):
+                regressions.append(f'{name}[{size}] peak_kib: {previous["peak_kib"]} -> {current["peak_kib"]}')
+            for metric in ('calls', 'quota'):
+                if current[metric] > previous[metric]:
+                    regressions.append(f'{name}[{size}] {metric}: {previous[metric]} -> {current[metric]}')
+    return regressions
+
+
+def print_report(results: dict, baseline: dict) -> None:
+    print(f'{"сценарий":<26}{"размер":>8}{"время, с":>11}{"база":>9}{"запросы":>9}{"квота":>8}{"память, КиБ":>13}')
+    for name, by_size in results.items():
+        for size, current in by_size.items():
+            previous = baseline.get(name, {}).get(size, {}).get('wall_s', '-')
+            print(f'{name:<26}{size:>8}{current["wall_s"]:>11}{previous:>9}{current["calls"]:>9}'
+                  f'{current["quota"]:>8}{current["peak_kib"]:>13}')
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Бенчмарки на подменном API YouTube')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1_000, 50_000])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка каждого запроса в секундах')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='доля запросов с ошибкой 503')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.25, help='допустимый рост времени и памяти')
+    parser.add_argument('--save', action='store_true', help='сохранить результаты как базовые')
+    parser.add_argument('--check', action='store_true', help='вернуть код 1, если есть регрессии')
+    args = parser.parse_args(argv)
+
+    # повторы при внедрённых ошибках не должны ждать реальные секунды
+    Youtube.retry_policy = RetryPolicy(base_delay=0.001, max_delay=0.01)
+    results = run(args.sizes, args.scenarios, args.latency, args.error_rate)
+
+    # базовые результаты сравнимы только при тех же задержке и доле ошибок
+    conditions = {'latency': args.latency, 'error_rate': args.error_rate}
+    stored = {'conditions': conditions, 'results': {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as file:
+            stored = json.load(file)
+    baseline = stored['results'] if stored['conditions'] == conditions else {}
+    if stored['conditions'] != conditions:
+        print(f'Базовые результаты получены при {stored["conditions"]}, сравнение пропущено')
+    print_report(results, baseline)
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f'РЕГРЕССИЯ {regression}')
+
+    if args.save:
+        if stored['conditions'] != conditions:
+            stored = {'conditions': conditions, 'results': {}}
+        for name, by_size in results.items():
+            stored['results'].setdefault(name, {}).update(by_size)
+        with open(args.baseline, 'w') as file:
+            json.dump(stored, file, indent=2, ensure_ascii=False)
+    return 1 if args.check and regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
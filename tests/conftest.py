@@ -2,7 +2,8 @@ import os
 
 import pytest
 
-from youtube import Channel, Video, PLVideo, PlayList
+from tests.fake_api import FakeYoutubeClient, make_playlist_item, make_video_item
+from youtube import Channel, Video, PLVideo, PlayList, Youtube
 
 PATH_TO_TEST_CHANNEL_1_JSON = os.path.join('tests', 'data/test_channel_1.json')
 PATH_TO_TEST_CHANNEL_2_JSON = os.path.join('tests', 'data/test_channel_2.json')
@@ -56,3 +57,29 @@ def playlist_from_json():
 @pytest.fixture
 def playlist_from_youtube():
     return PlayList(playlist_id='PLguYHBi01DWr4bRWc4uaguASmo7lW4GCb')
+
+
+@pytest.fixture
+def fake_client():
+    """Возвращает функцию, которая подменяет клиент API YouTube на FakeYoutubeClient с указанными данными"""
+    def install(**data):
+        client = FakeYoutubeClient(**data)
+        Youtube.set_client(client)
+        return client
+    for cls in (Channel, Video, PlayList):
+        cls.registry.invalidate()
+        cls._pending.clear()
+    PLVideo.index.invalidate()
+    yield install
+    Youtube.set_client(None)
+
+
+@pytest.fixture
+def big_playlist_data():
+    """Данные плейлиста из 120 видео длительностью 1, 2, ... 120 секунд"""
+    playlist_id = 'PL_big'
+    videos = [make_video_item(f'v{i:03d}', duration=f'PT{i}S', like_count=i * 10) for i in range(1, 121)]
+    playlist = {'kind': 'youtube#playlist', 'id': playlist_id,
+                'snippet': {'title': 'Большой плейлист'}, 'contentDetails': {'itemCount': 120}}
+    items = [make_playlist_item(playlist_id, video['id'], position) for position, video in enumerate(videos)]
+    return {'videos': videos, 'playlists': [playlist], 'playlist_items': {playlist_id: items}}
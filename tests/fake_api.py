@@ -0,0 +1,327 @@
+import functools
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+DATA_DIR = os.path.join('tests', 'data')
+
+
+def load_items(file_name: str) -> list:
+    """Возвращает элементы items из файла json с записанным ответом API"""
+    with open(os.path.join(DATA_DIR, file_name), 'r') as file:
+        return json.loads(file.read())['items']
+
+
+def load_items_or_empty(path: str) -> list:
+    """Возвращает элементы items из файла json или пустой список, если это не записанный ответ API"""
+    with open(path, 'r') as file:
+        data = json.loads(file.read())
+    return data.get('items', []) if isinstance(data, dict) else []
+
+
+def error_content(status: int, reason: str) -> bytes:
+    """Возвращает тело ответа API с ошибкой"""
+    return json.dumps({'error': {'code': status, 'errors': [{'reason': reason}]}}).encode()
+
+
+def make_video_item(video_id: str, duration: str = 'PT1M', view_count: int = 0, like_count: int = 0,
+                    comment_count: int = 0, channel_id: str = 'UC_fake', title: str | None = None,
+                    published_at: str = '2023-01-01T00:00:00Z') -> dict:
+    """Возвращает элемент ответа videos().list с заданными полями"""
+    return {
+        'kind': 'youtube#video',
+        'etag': f'etag-{video_id}',
+        'id': video_id,
+        'snippet': {
+            'publishedAt': published_at,
+            'channelId': channel_id,
+            'title': title or f'Видео {video_id}',
+            'description': 'Описание',
+            'localized': {'title': title or f'Видео {video_id}', 'description': 'Описание'},
+        },
+        'contentDetails': {'duration': duration},
+        'statistics': {
+            'viewCount': str(view_count),
+            'likeCount': str(like_count),
+            'commentCount': str(comment_count),
+        },
+    }
+
+
+def make_playlist_item(playlist_id: str, video_id: str, position: int) -> dict:
+    """Возвращает элемент ответа playlistItems().list"""
+    return {
+        'kind': 'youtube#playlistItem',
+        'id': f'{playlist_id}.{position}',
+        'snippet': {
+            'playlistId': playlist_id,
+            'position': position,
+            'resourceId': {'kind': 'youtube#video', 'videoId': video_id},
+        },
+        'contentDetails': {'videoId': video_id},
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def parse_fields(mask: str) -> dict:
+    """
+    Разбирает маску частичного ответа fields (например, 'etag,items(id,snippet/title)')
+    в дерево {поле: поддерево}; None вместо поддерева означает поле целиком
+    """
+    def merge(tree: dict, name: str, subtree: dict | None) -> None:
+        if name in tree and (tree[name] is None or subtree is None):
+            tree[name] = None
+        elif name in tree:
+            for key, value in subtree.items():
+                merge(tree[name], key, value)
+        else:
+            tree[name] = subtree
+
+    def parse_list(position: int) -> tuple:
+        tree = {}
+        while position < len(mask) and mask[position] != ')':
+            end = position
+            while end < len(mask) and mask[end] not in ',()':
+                end += 1
+            path = mask[position:end].split('/')
+            subtree = None
+            if end < len(mask) and mask[end] == '(':
+                subtree, end = parse_list(end + 1)
+                end += 1
+            for name in reversed(path[1:]):
+                subtree = {name: subtree}
+            merge(tree, path[0], subtree)
+            position = end + 1 if end < len(mask) and mask[end] == ',' else end
+        return tree, position
+
+    return parse_list(0)[0]
+
+
+def apply_fields(value, tree: dict | None):
+    """Оставляет в ответе только поля из дерева маски, как это делает API"""
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [apply_fields(element, tree) for element in value]
+    if isinstance(value, dict):
+        return {key: apply_fields(value[key], subtree) for key, subtree in tree.items() if key in value}
+    return value
+
+
+class FakeRequest:
+    """Запрос, который возвращает заранее подготовленный ответ при вызове execute()"""
+
+    def __init__(self, client: 'FakeYoutubeClient', resource: str, params: dict) -> None:
+        self.client = client
+        self.resource = resource
+        self.params = params
+        self.headers = {}
+        self.postproc = lambda response, content: json.loads(content)
+
+    def execute(self) -> dict:
+        self.client.calls.append((self.resource, self.params))
+        failure = self.client.next_failure()
+        if failure is not None:
+            status, reason = failure
+            raise HttpError(httplib2.Response({'status': status}), error_content(status, reason))
+        response = self.client.respond(self.resource, self.params)
+        response['etag'] = hashlib.md5(json.dumps(response, sort_keys=True).encode()).hexdigest()
+        if self.headers.get('If-None-Match') == response['etag']:
+            raise HttpError(httplib2.Response({'status': 304}), b'')
+        if self.params.get('fields'):
+            response = apply_fields(response, parse_fields(self.params['fields']))
+        return self.postproc(httplib2.Response({'status': 200}), json.dumps(response).encode())
+
+
+class FakeResource:
+    def __init__(self, client: 'FakeYoutubeClient', resource: str) -> None:
+        self.client = client
+        self.resource = resource
+
+    def list(self, **params) -> FakeRequest:
+        return FakeRequest(self.client, self.resource, params)
+
+
+class FakeYoutubeClient:
+    """
+    Подменный клиент API YouTube, повторяющий интерфейс googleapiclient:
+    client.videos().list(...).execute().
+    Все выполненные запросы сохраняются в атрибуте calls.
+    latency - задержка каждого запроса в секундах; error_rate - доля запросов, завершающихся
+    временной ошибкой (503 backendError), случайные ошибки воспроизводимы при одинаковом seed.
+    """
+
+    def __init__(self, channels=None, videos=None, playlists=None, playlist_items=None, page_size=50,
+                 latency: float = 0.0, error_rate: float = 0.0, seed: int = 0) -> None:
+        self.channels_data = {item['id']: item for item in channels or []}
+        self.videos_data = {item['id']: item for item in videos or []}
+        self.playlists_data = {item['id']: item for item in playlists or []}
+        self.playlist_items_data = playlist_items or {}
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.calls = []
+        self.failures = []
+        self.__positions = {}
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def from_fixtures(cls, data_dir: str = DATA_DIR, **options) -> 'FakeYoutubeClient':
+        """Создаёт клиент, который отвечает записанными ответами API из файлов json в data_dir"""
+        data = {'channels': [], 'videos': [], 'playlists': [], 'playlist_items': {}}
+        for file_name in sorted(os.listdir(data_dir)):
+            if not file_name.endswith('.json'):
+                continue
+            for item in load_items_or_empty(os.path.join(data_dir, file_name)):
+                kind = item.get('kind', '').split('#')[-1]
+                if kind == 'playlistItem':
+                    data['playlist_items'].setdefault(item['snippet']['playlistId'], []).append(item)
+                elif kind in ('channel', 'video', 'playlist'):
+                    data[f'{kind}s'].append(item)
+        return cls(**data, **options)
+
+    def fail_next(self, *failures: tuple) -> None:
+        """Следующие запросы завершатся ошибками с указанными (статус, причина); None означает успешный запрос"""
+        self.failures.extend(failures)
+
+    def next_failure(self) -> tuple | None:
+        """
+        Выдерживает задержку latency и возвращает ошибку (статус, причина) для очередного запроса
+        или None, если запрос должен завершиться успешно
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        with self.__lock:
+            if self.failures:
+                return self.failures.pop(0)
+            if self.error_rate and self.random.random() < self.error_rate:
+                return 503, 'backendError'
+        return None
+
+    def channels(self) -> FakeResource:
+        return FakeResource(self, 'channels')
+
+    def videos(self) -> FakeResource:
+        return FakeResource(self, 'videos')
+
+    def playlists(self) -> FakeResource:
+        return FakeResource(self, 'playlists')
+
+    def playlistItems(self) -> FakeResource:
+        return FakeResource(self, 'playlistItems')
+
+    def _positions(self, playlist_id: str) -> dict:
+        """Возвращает элементы плейлиста, сгруппированные по id видео (строится один раз на плейлист)"""
+        if playlist_id not in self.__positions:
+            positions = {}
+            for item in self.playlist_items_data.get(playlist_id, []):
+                positions.setdefault(item['snippet']['resourceId']['videoId'], []).append(item)
+            self.__positions[playlist_id] = positions
+        return self.__positions[playlist_id]
+
+    def calls_to(self, resource: str) -> int:
+        """Возвращает количество запросов к указанному ресурсу"""
+        return len([call for call in self.calls if call[0] == resource])
+
+    @staticmethod
+    def project(item: dict, part: str | None) -> dict:
+        """Оставляет в элементе только запрошенные части ответа, как это делает API"""
+        if not part:
+            return item
+        parts = part.split(',')
+        return {key: value for key, value in item.items() if key in ('kind', 'etag', 'id') or key in parts}
+
+    def respond(self, resource: str, params: dict) -> dict:
+        if resource == 'playlistItems':
+            return self._page(resource, params)
+        if resource == 'playlists' and 'channelId' in params:
+            items = [item for item in self.playlists_data.values()
+                     if item.get('snippet', {}).get('channelId') == params['channelId']]
+            return self._paginate(resource, items, params)
+        data = {'channels': self.channels_data, 'videos': self.videos_data, 'playlists': self.playlists_data}[resource]
+        ids = params.get('id', '').split(',')
+        items = [self.project(data[i], params.get('part')) for i in ids if i in data]
+        return {'kind': f'youtube#{resource}ListResponse', 'items': items}
+
+    def _page(self, resource: str, params: dict) -> dict:
+        items = self.playlist_items_data.get(params['playlistId'], [])
+        if 'videoId' in params:
+            items = self._positions(params['playlistId']).get(params['videoId'], [])
+        return self._paginate(resource, items, params)
+
+    def _paginate(self, resource: str, items: list, params: dict) -> dict:
+        page_size = min(self.page_size, params.get('maxResults', 5))
+        start = int(params.get('pageToken') or 0)
+        page = [self.project(item, params.get('part')) for item in items[start:start + page_size]]
+        response = {'kind': f'youtube#{resource}ListResponse', 'items': page,
+                    'pageInfo': {'totalResults': len(items), 'resultsPerPage': page_size}}
+        if start + page_size < len(items):
+            response['nextPageToken'] = str(start + page_size)
+        return response
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов вида GET /youtube/v3/<ресурс>?<параметры>"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        resource = url.path.rstrip('/').rsplit('/', 1)[-1]
+        params = dict(parse_qsl(url.query))
+        params.pop('key', None)
+        if 'maxResults' in params:
+            params['maxResults'] = int(params['maxResults'])
+        server = self.server.fake_server
+        server.client.calls.append((resource, params))
+        failure = server.client.next_failure()
+        if failure is not None:
+            status, content = failure[0], error_content(*failure)
+        else:
+            try:
+                response = server.client.respond(resource, params)
+                if params.get('fields'):
+                    response = apply_fields(response, parse_fields(params['fields']))
+                status, content = 200, json.dumps(response).encode()
+            except KeyError:
+                status, content = 404, error_content(404, 'notFound')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class FakeApiServer:
+    """
+    Локальный HTTP-сервер, отдающий данные FakeYoutubeClient в формате API YouTube.
+    Используется как контекстный менеджер; адрес API доступен в атрибуте url.
+    """
+
+    def __init__(self, client: FakeYoutubeClient) -> None:
+        self.client = client
+        self.__server = ThreadingHTTPServer(('127.0.0.1', 0), FakeApiHandler)
+        self.__server.daemon_threads = True
+        self.__server.fake_server = self
+        self.url = f'http://127.0.0.1:{self.__server.server_address[1]}/youtube/v3'
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+
+    def __enter__(self) -> 'FakeApiServer':
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.__server.shutdown()
+        self.__server.server_close()
@@ -0,0 +1,49 @@
+import json
+import os
+
+from tests.fake_api import DATA_DIR, load_items, make_video_item
+from youtube import DumpAggregate
+
+
+def write_dumps(path, count):
+    """Записывает count файлов ответа videos().list по 10 видео и возвращает пути к ним"""
+    paths = []
+    for index in range(count):
+        items = [make_video_item(f'v{index:02d}{i}', duration=f'PT{i}M', view_count=index * 10 + i, like_count=i)
+                 for i in range(10)]
+        file_path = os.path.join(path, f'videos_{index:02d}.json')
+        with open(file_path, 'w') as file:
+            json.dump({'kind': 'youtube#videoListResponse', 'items': items}, file)
+        paths.append(file_path)
+    return paths
+
+
+def test_aggregate_fixtures():
+    """Проверка сводной статистики по записанным ответам API"""
+    paths = [os.path.join(DATA_DIR, name) for name in sorted(os.listdir(DATA_DIR))]
+    aggregate = DumpAggregate.from_files(paths, workers=1, top=1)
+    assert aggregate.counts['channels'] == 2
+    assert aggregate.counts['playlists'] == 1
+    channels = load_items('test_channel_1.json') + load_items('test_channel_2.json')
+    assert aggregate.sums['subscriber_count'] == sum(int(item['statistics']['subscriberCount']) for item in channels)
+    assert aggregate.top_channels == [('UCMCgOm8GZkHp8zJ6l7_hIuA', 10300000)]
+    assert aggregate.failed == []
+
+
+def test_partial_aggregates_merge_across_processes(tmp_path):
+    """Проверка, что агрегат, посчитанный в нескольких процессах, совпадает с последовательным"""
+    paths = write_dumps(str(tmp_path), 12)
+    broken = tmp_path / 'broken.json'
+    broken.write_text('{"items": [')
+    paths.append(str(broken))
+    serial = DumpAggregate.from_files(paths, workers=1, top=3)
+    parallel = DumpAggregate.from_files(paths, workers=2, top=3)
+    assert parallel.to_dict() == serial.to_dict()
+    assert serial.counts['videos'] == 120
+    assert serial.failed == [str(broken)]
+    assert serial.sums['view_count'] == sum(range(120))
+    assert serial.top_videos == [('v119', 119), ('v118', 118), ('v117', 117)]
+    assert serial.mean('duration_seconds') == 270
+    counts, edges = serial.histogram('duration_seconds')
+    assert counts.tolist()[:3] == [12, 48, 60]
+    assert edges[1] == 60
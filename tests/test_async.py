@@ -0,0 +1,70 @@
+import asyncio
+import datetime
+
+from tests.fake_api import FakeApiServer, FakeYoutubeClient, load_items
+from youtube import AsyncPlayList, AsyncYoutube, Channel, RetryPolicy, Youtube
+
+
+def test_get_channels():
+    """Проверка загрузки каналов пачками по 50 id через локальный сервер"""
+    channel = load_items('test_channel_1.json')[0]
+    channels = [dict(channel, id=f'UC{i:03d}') for i in range(120)]
+    client = FakeYoutubeClient(channels=channels)
+
+    async def load(url):
+        async with AsyncYoutube(api_key='test', base_url=url, concurrency=2) as youtube:
+            return await youtube.get_channels([item['id'] for item in channels])
+
+    with FakeApiServer(client) as server:
+        items = asyncio.run(load(server.url))
+    assert len(items) == 120
+    assert client.calls_to('channels') == 3
+    assert Channel.from_item(items['UC007']).subscriber_count == 10300000
+
+
+def test_load_playlist(big_playlist_data):
+    """Проверка загрузки плейлиста и его видео асинхронным клиентом"""
+    client = FakeYoutubeClient(page_size=50, **big_playlist_data)
+
+    async def load(url):
+        async with AsyncYoutube(api_key='test', base_url=url) as youtube:
+            playlist = await AsyncPlayList.load('PL_big', youtube)
+            videos = await youtube.load_videos(['v001', 'v002'])
+            return playlist, videos
+
+    with FakeApiServer(client) as server:
+        playlist, videos = asyncio.run(load(server.url))
+    assert playlist.title == 'Большой плейлист'
+    assert [video.duration for video in videos] == [datetime.timedelta(seconds=1), datetime.timedelta(seconds=2)]
+    assert client.calls_to('playlistItems') == 3
+
+
+def test_server_replays_fixtures_with_injected_errors(monkeypatch):
+    """Проверка воспроизведения записанных ответов сервером с задержкой и внедрённой временной ошибкой"""
+    monkeypatch.setattr(Youtube, 'retry_policy', RetryPolicy(base_delay=0.001, max_delay=0.001))
+    client = FakeYoutubeClient.from_fixtures(latency=0.001)
+    client.fail_next((503, 'backendError'))
+
+    async def load(url):
+        async with AsyncYoutube(api_key='test', base_url=url) as youtube:
+            return await youtube.load_channels(['UCMCgOm8GZkHp8zJ6l7_hIuA'])
+
+    with FakeApiServer(client) as server:
+        channels = asyncio.run(load(server.url))
+    assert [channel.title for channel in channels] == ['вДудь']
+    assert client.calls_to('channels') == 2
+
+
+def test_concurrent_identical_requests_are_coalesced():
+    """Проверка, что одновременные одинаковые запросы задач выполняются одним запросом"""
+    channel = load_items('test_channel_1.json')[0]
+    client = FakeYoutubeClient(channels=[channel], latency=0.05)
+
+    async def load(url):
+        async with AsyncYoutube(api_key='test', base_url=url) as youtube:
+            return await asyncio.gather(*[youtube.get_channels([channel['id']]) for _ in range(5)])
+
+    with FakeApiServer(client) as server:
+        results = asyncio.run(load(server.url))
+    assert all(list(items) == [channel['id']] for items in results)
+    assert client.calls_to('channels') == 1
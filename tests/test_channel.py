@@ -1,7 +1,10 @@
+import copy
+import itertools
 import os.path
 
 import pytest
 
+from tests.fake_api import load_items
 from youtube import Channel
 
 
@@ -103,3 +106,47 @@ def test_incorrect_id_channel(channel_1_from_json):
     assert len(channel) == 0
     assert channel + channel_1_from_json is None
     assert (channel < channel_1_from_json) is None
+
+
+def test_to_json_without_raw_payload(channel_1_from_json, tmp_path, monkeypatch):
+    """Проверка, что канал без сохранённого ответа API записывается в json, который можно прочитать обратно"""
+    monkeypatch.chdir(tmp_path)
+    channel_1_from_json.to_json()
+    channel = Channel(channel_json='None.json')
+    assert channel.title == channel_1_from_json.title
+    assert channel.subscriber_count == channel_1_from_json.subscriber_count
+
+
+def test_iter_uploads_resumes_from_checkpoint(fake_client, big_playlist_data, tmp_path):
+    """Проверка обхода видео канала через плейлист загрузок с продолжением после прерывания"""
+    channel_item = {'kind': 'youtube#channel', 'id': 'UC_big', 'snippet': {'title': 'Канал'}, 'statistics': {},
+                    'contentDetails': {'relatedPlaylists': {'uploads': 'PL_big'}}}
+    client = fake_client(channels=[channel_item], **big_playlist_data)
+    checkpoint = str(tmp_path / 'UC_big.json')
+    channel = Channel(channel_id='UC_big')
+    assert channel.uploads_playlist_id == 'PL_big'
+
+    first = list(itertools.islice(channel.iter_uploads(checkpoint), 60))
+    rest = list(channel.iter_uploads(checkpoint))
+    assert [video.video_id for video in first + rest] == [f'v{i:03d}' for i in range(1, 121)]
+    assert client.calls_to('playlistItems') == 4
+    assert list(channel.iter_uploads(checkpoint)) == []
+
+
+def test_load_many_and_rank(fake_client):
+    """Проверка загрузки каналов пачками по 50 id и выбора лучших каналов"""
+    template = load_items('test_channel_1.json')[0]
+    items = []
+    for i in range(120):
+        item = copy.deepcopy(template)
+        item['id'] = f'UC{i:03d}'
+        item['statistics'].update(subscriberCount=str(i * 10), viewCount=str(1000 - i), videoCount=str(i % 7))
+        items.append(item)
+    client = fake_client(channels=items)
+    channels = Channel.load_many(item['id'] for item in items)
+    assert len(channels) == 120
+    assert client.calls_to('channels') == 3
+    assert [channel.channel_id for channel in Channel.rank(channels, k=2)] == ['UC119', 'UC118']
+    assert [channel.channel_id for channel in Channel.rank(channels, by='view_count', k=1)] == ['UC000']
+    assert Channel.rank(channels, by='views_per_video', k=1)[0].channel_id == 'UC001'
+    assert sorted(channels[:3], reverse=True)[0].channel_id == 'UC002'
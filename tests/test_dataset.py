@@ -0,0 +1,68 @@
+import pytest
+
+from tests.fake_api import load_items, make_playlist_item, make_video_item
+from youtube import NDJSON, Channel, Dataset, OfflineClient, PlayList, Video, Youtube
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    items = load_items('test_channel_1.json') + [make_video_item(f'v{i}', duration=f'PT{i}S') for i in range(1, 8)]
+    items += [make_playlist_item('PL1', f'v{i}', i) for i in range(7, 0, -1)]
+    items.append({'kind': 'youtube#playlist', 'id': 'PL1', 'snippet': {'title': 'Плейлист'}})
+    with Dataset.build(str(tmp_path / 'dump'), items) as dataset:
+        yield dataset
+
+
+def test_get_and_iter(dataset):
+    """Проверка поиска по индексу и последовательного чтения набора"""
+    assert len(dataset) == 16
+    assert dataset.get('videos', 'v3')['contentDetails']['duration'] == 'PT3S'
+    assert dataset.get('videos', 'missing') is None
+    assert dataset.get('channels', 'v3') is None
+    assert [item['kind'] for item in dataset][:2] == ['youtube#channel', 'youtube#video']
+
+
+def test_from_dataset(dataset):
+    """Проверка создания объектов по данным из набора"""
+    assert Video.from_dataset(dataset, 'v5').duration.total_seconds() == 5
+    assert Channel.from_dataset(dataset, 'UCMCgOm8GZkHp8zJ6l7_hIuA').title == 'вДудь'
+    playlist = PlayList.from_dataset(dataset, 'PL1')
+    assert playlist.title == 'Плейлист'
+    assert playlist.video_ids == [f'v{i}' for i in range(1, 8)]
+
+
+def test_offline_client(dataset):
+    """Проверка работы Youtube поверх офлайн-набора"""
+    Youtube.set_client(OfflineClient(dataset))
+    try:
+        assert sorted(Youtube.get_videos(['v1', 'v2', 'missing'])) == ['v1', 'v2']
+        assert list(Youtube.get_playlist_video_ids('PL1')) == [f'v{i}' for i in range(1, 8)]
+    finally:
+        Youtube.set_client(None)
+
+
+def test_long_keys_keep_playlist_order(tmp_path):
+    """Проверка, что длинные ключи не обрезаются и элементы плейлиста идут по позициям"""
+    playlist_id = 'PL' + 'x' * 45
+    items = [make_playlist_item(playlist_id, f'v{position}', position) for position in (2, 0, 1)]
+    items.append(make_video_item('v' * 80))
+    with Dataset.build(str(tmp_path / 'dump'), items) as dataset:
+        assert [item['snippet']['position'] for item in dataset.playlist_items(playlist_id)] == [0, 1, 2]
+        assert dataset.get('videos', 'v' * 80)['id'] == 'v' * 80
+        assert dataset.get('videos', 'v' * 81) is None
+
+
+def test_offline_pages_decode_only_requested_items(tmp_path, monkeypatch):
+    """Проверка, что страница элементов плейлиста не декодирует элементы предыдущих страниц"""
+    items = [make_playlist_item('PL1', f'v{position}', position) for position in range(200)]
+    with Dataset.build(str(tmp_path / 'dump'), items) as dataset:
+        decoded = []
+        loads = NDJSON._loads
+        monkeypatch.setattr(NDJSON, '_loads', staticmethod(lambda data: decoded.append(data) or loads(data)))
+        Youtube.set_client(OfflineClient(dataset))
+        try:
+            assert list(Youtube.get_playlist_video_ids('PL1')) == [f'v{position}' for position in range(200)]
+        finally:
+            Youtube.set_client(None)
+        assert len(decoded) <= 200 * 2
+        assert [item['snippet']['position'] for item in dataset.playlist_items('PL1', 195, 300)] == list(range(195, 200))
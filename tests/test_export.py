@@ -0,0 +1,22 @@
+import pytest
+
+from tests.conftest import PATH_TO_TEST_CHANNEL_1_JSON, PATH_TO_TEST_VIDEO_JSON
+from youtube import NDJSON, Channel, PlayList, Video
+
+
+@pytest.mark.parametrize('file_name', ['dump.ndjson', 'dump.ndjson.gz'])
+def test_dump_and_load(tmp_path, file_name):
+    """Проверка записи объектов в NDJSON (в том числе со сжатием) и чтения обратно"""
+    channel = Channel(channel_json=PATH_TO_TEST_CHANNEL_1_JSON)
+    video = Video(video_json=PATH_TO_TEST_VIDEO_JSON)
+    playlist = PlayList.from_dict({'playlist_id': 'PL1', 'title': 'Плейлист', 'video_ids': ['9lO06Zxhu88']})
+    path = str(tmp_path / file_name)
+
+    assert NDJSON.dump(iter([channel, video, playlist]), path) == 3
+    loaded_channel, loaded_video, loaded_playlist = NDJSON.load(path)
+    assert loaded_channel.title == 'вДудь'
+    assert loaded_channel.subscriber_count == 10300000
+    assert loaded_video.duration == video.duration
+    assert loaded_video.url == 'https://www.youtube.com/watch?v=9lO06Zxhu88'
+    assert loaded_playlist.title == 'Плейлист'
+    assert loaded_playlist.video_ids == ['9lO06Zxhu88']
@@ -1,8 +1,10 @@
 import datetime
+import itertools
 
 import pytest
 
-from youtube import PlayList
+from tests.fake_api import make_playlist_item, make_video_item
+from youtube import PlayList, PlaylistSync, Youtube
 
 
 def test_get_attributes(playlist_from_json, ):
@@ -55,3 +57,170 @@ def test_incorrect_playlist_id():
     assert playlist.url is None
     assert playlist.total_duration == datetime.timedelta(0)
     assert playlist.show_best_video() is None
+
+
+def test_total_duration_batches_video_requests(fake_client, big_playlist_data):
+    """Проверка, что длительность плейлиста из 120 видео считается за ceil(120 / 50) запросов videos().list"""
+    client = fake_client(**big_playlist_data)
+    playlist = PlayList(playlist_id='PL_big')
+    assert playlist.total_duration == datetime.timedelta(seconds=sum(range(1, 121)))
+    assert client.calls_to('videos') == 3
+
+
+def test_show_best_video_batches_video_requests(fake_client, big_playlist_data):
+    """Проверка выбора лучшего видео пачками по 50 id"""
+    client = fake_client(**big_playlist_data)
+    playlist = PlayList(playlist_id='PL_big')
+    assert playlist.show_best_video() == 'https://www.youtube.com/watch?v=v120'
+    assert client.calls_to('videos') == 3
+
+
+def test_repeated_analytics_reuse_loaded_videos(fake_client, big_playlist_data):
+    """
+    Проверка, что вычисления по плейлисту запрашивают только нужные части ответа,
+    а повторные вычисления используют уже загруженные видео
+    """
+    client = fake_client(**big_playlist_data)
+    playlist = PlayList.get('PL_big')
+    playlist.total_duration
+    playlist.show_best_video()
+    parts = [params['part'] for resource, params in client.calls if resource == 'videos']
+    assert parts == ['contentDetails'] * 3 + ['statistics'] * 3
+    assert playlist.total_duration == datetime.timedelta(seconds=sum(range(1, 121)))
+    assert playlist.show_best_video() == 'https://www.youtube.com/watch?v=v120'
+    assert PlayList.get('PL_big') is playlist
+    assert client.calls_to('videos') == 6
+    assert client.calls_to('playlists') == 1
+
+
+def test_video_ids_retry_transient_errors(fake_client, big_playlist_data, monkeypatch):
+    """Проверка, что временные ошибки при постраничной загрузке повторяются, а не обрезают список"""
+    monkeypatch.setattr(Youtube.retry_policy, 'sleep', lambda delay: None)
+    client = fake_client(**big_playlist_data)
+    client.fail_next((500, 'backendError'), (403, 'rateLimitExceeded'))
+    video_ids = Youtube.get_playlist_video_ids('PL_big')
+    assert len(video_ids) == 120
+    assert video_ids.complete
+
+
+def test_video_ids_fatal_error_returns_partial_list(fake_client, big_playlist_data):
+    """Проверка, что после фатальной ошибки возвращается часть списка с признаком неполноты"""
+    client = fake_client(**big_playlist_data)
+    client.fail_next(None, (403, 'quotaExceeded'))
+    video_ids = Youtube.get_playlist_video_ids('PL_big')
+    assert len(video_ids) == 50
+    assert not video_ids.complete
+    assert video_ids.error.resp.status == 403
+    assert client.calls_to('playlistItems') == 2
+
+
+def test_totals_fail_on_partial_playlist(fake_client, big_playlist_data):
+    """Проверка, что длительность и лучшее видео не считаются по части плейлиста после фатальной ошибки"""
+    client = fake_client(**big_playlist_data)
+    client.fail_next(None, None, (403, 'quotaExceeded'))
+    playlist = PlayList(playlist_id='PL_big')
+    with pytest.raises(Exception) as error:
+        playlist.total_duration
+    assert error.value.resp.status == 403
+    assert not playlist.is_complete
+    with pytest.raises(Exception):
+        playlist.show_best_video()
+
+
+def test_totals_of_missing_playlist_are_empty(fake_client):
+    """Проверка, что для ненайденного плейлиста длительность нулевая, а лучшего видео нет"""
+    client = fake_client()
+    client.fail_next(None, (404, 'playlistNotFound'))
+    playlist = PlayList(playlist_id='missing')
+    assert playlist.total_duration == datetime.timedelta(0)
+    assert playlist.show_best_video() is None
+
+
+def test_playlist_loads_video_ids_lazily(fake_client, big_playlist_data):
+    """Проверка, что создание плейлиста не загружает список видео"""
+    client = fake_client(**big_playlist_data)
+    playlist = PlayList(playlist_id='PL_big')
+    assert playlist.title == 'Большой плейлист'
+    assert client.calls_to('playlistItems') == 0
+    assert len(playlist.video_ids) == 120
+
+
+def test_iter_videos_stops_early(fake_client, big_playlist_data):
+    """Проверка постраничного перебора видео с досрочной остановкой"""
+    client = fake_client(**big_playlist_data)
+    playlist = PlayList(playlist_id='PL_big')
+    videos = list(itertools.islice(playlist.iter_videos(), 10))
+    assert [video.video_id for video in videos] == [f'v{i:03d}' for i in range(1, 11)]
+    assert client.calls_to('playlistItems') == 1
+    assert client.calls_to('videos') == 1
+
+
+def test_incremental_sync(fake_client, big_playlist_data, tmp_path):
+    """Проверка инкрементальной синхронизации: повторная загрузка только изменений"""
+    client = fake_client(**big_playlist_data)
+    sync = PlaylistSync(str(tmp_path))
+    result = sync.sync('PL_big')
+    assert result.changed and len(result.added) == 120
+    assert client.calls_to('videos') == 3
+
+    client.calls.clear()
+    result = sync.sync('PL_big')
+    assert not result.changed and result.added == []
+    assert [call[0] for call in client.calls] == ['playlists']
+
+    client.calls.clear()
+    new_videos = [make_video_item('new1', published_at=datetime.datetime.now(datetime.timezone.utc).isoformat()),
+                  make_video_item('new2')]
+    for video in new_videos:
+        client.videos_data[video['id']] = video
+        client.playlist_items_data['PL_big'].append(make_playlist_item('PL_big', video['id'], 0))
+    client.playlists_data['PL_big']['contentDetails']['itemCount'] = 122
+    result = sync.sync('PL_big')
+    assert result.added == ['new1', 'new2']
+    assert client.calls_to('videos') == 1
+
+    client.calls.clear()
+    client.videos_data['new1']['statistics']['viewCount'] = '500'
+    result = sync.sync('PL_big')
+    assert result.refreshed == ['new1']
+    assert [params['part'] for resource, params in client.calls if resource == 'videos'] == ['statistics']
+    records = {record.video_id: record for record in sync.videos('PL_big')}
+    assert len(records) == 122
+    assert (records['new1'].view_count, records['new1'].title) == (500, 'Видео new1')
+
+
+def test_lazy_playlists_load_together(fake_client, big_playlist_data):
+    """Проверка, что ленивые плейлисты загружаются одним запросом при первом обращении"""
+    playlists = big_playlist_data['playlists'] + [{'kind': 'youtube#playlist', 'id': 'PL_small',
+                                                   'snippet': {'title': 'Маленький плейлист'}}]
+    client = fake_client(**{**big_playlist_data, 'playlists': playlists})
+    big, small, missing = PlayList.lazy('PL_big'), PlayList.lazy('PL_small'), PlayList.lazy('PL_missing')
+    assert client.calls == []
+    assert str(small) == 'YouTube-плейлист: Маленький плейлист'
+    assert big.title == 'Большой плейлист'
+    assert missing.url is None
+    assert client.calls_to('playlists') == 1
+    assert big.total_duration == datetime.timedelta(seconds=sum(range(1, 121)))
+
+
+def test_incremental_sync_with_cache(fake_client, tmp_path):
+    """Проверка, что синхронизация с включённым кэшем находит новые видео изменившегося плейлиста"""
+    videos = [make_video_item(f'v{i}') for i in range(3)]
+    client = fake_client(videos=videos, playlists=[{'kind': 'youtube#playlist', 'id': 'PL1',
+                                                    'contentDetails': {'itemCount': 3}}],
+                         playlist_items={'PL1': [make_playlist_item('PL1', video['id'], position)
+                                                 for position, video in enumerate(videos)]})
+    Youtube.enable_cache(str(tmp_path / 'cache.sqlite'))
+    try:
+        sync = PlaylistSync(str(tmp_path / 'snapshots'))
+        sync.sync('PL1')
+        video = make_video_item('v3')
+        client.videos_data['v3'] = video
+        client.playlist_items_data['PL1'].append(make_playlist_item('PL1', 'v3', 3))
+        client.playlists_data['PL1']['contentDetails']['itemCount'] = 4
+        result = sync.sync('PL1')
+        assert result.changed and result.added == ['v3']
+        assert not sync.sync('PL1').changed
+    finally:
+        Youtube.set_cache(None)
+    assert len(sync.videos('PL1')) == 4
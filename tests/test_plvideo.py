@@ -1,5 +1,6 @@
 import datetime
 
+from tests.fake_api import make_playlist_item
 from youtube import PLVideo
 
 
@@ -34,3 +35,35 @@ def test_get_attributes_when_video_not_in_playlist(video_not_playlist_from_json)
 def test_get_video_in_playlist_by_id():
     video = PLVideo(playlist_id='PL7Ntiz7eTKwrqmApjln9u4ItzhDLRtPuD', video_id='BBotskuyw_M')
     assert str(video) == 'Пушкин: наше все?'
+
+
+def test_load_many_uses_membership_index(fake_client, big_playlist_data):
+    """Проверка, что принадлежность многих видео плейлисту определяется одним обходом плейлиста"""
+    client = fake_client(**big_playlist_data)
+    pairs = [(f'v{i:03d}', 'PL_big') for i in range(1, 121)] + [('v001', 'PL_other')]
+    videos = PLVideo.load_many(pairs)
+    assert [video.id_playlist for video in videos[:120]] == ['PL_big'] * 120
+    assert videos[-1].id_playlist == 'Видео "Видео v001" нет в указанном плейлисте'
+    assert videos[0].duration == datetime.timedelta(seconds=1)
+    assert PLVideo.index.position('PL_big', 'v005') == 4
+    assert client.calls_to('playlistItems') == 3 + 1
+    assert client.calls_to('videos') == 3
+    PLVideo(video_id='v007', playlist_id='PL_big')
+    assert client.calls_to('playlistItems') == 4
+
+
+def test_reverse_index_across_channel_playlists(fake_client):
+    """Проверка обратного индекса: в каких плейлистах канала есть видео"""
+    playlists = [{'kind': 'youtube#playlist', 'id': playlist_id, 'snippet': {'channelId': 'UC1'}}
+                 for playlist_id in ('PL1', 'PL2', 'PL3')]
+    items = {
+        'PL1': [make_playlist_item('PL1', 'a', 0), make_playlist_item('PL1', 'b', 1)],
+        'PL2': [make_playlist_item('PL2', 'b', 0)],
+        'PL3': [],
+    }
+    client = fake_client(playlists=playlists, playlist_items=items)
+    assert PLVideo.index.playlists_of('b', 'UC1') == ['PL1', 'PL2']
+    assert PLVideo.index.playlists_of('a', 'UC1') == ['PL1']
+    assert PLVideo.index.playlists_of('c', 'UC1') == []
+    assert client.calls_to('playlists') == 1
+    assert client.calls_to('playlistItems') == 3
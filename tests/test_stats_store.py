@@ -0,0 +1,46 @@
+import pytest
+
+from youtube import StatsStore
+
+DAY = 24 * 60 * 60
+
+
+def test_append_and_range_query(channel_1_from_json, tmp_path):
+    """Проверка дозаписи статистики канала и выборки за период"""
+    store = StatsStore(str(tmp_path))
+    store.append_channel(channel_1_from_json, timestamp=0)
+    store.append('channels', 'None', {'subscriber_count': 10300100, 'view_count': 1946800000}, timestamp=DAY)
+    store.append('channels', 'None', {'subscriber_count': 10300400, 'view_count': 1946900000}, timestamp=3 * DAY)
+
+    records = store.read('channels', 'None', start=DAY)
+    assert list(records['subscriber_count']) == [10300100, 10300400]
+    assert list(records['video_count']) == [-1, -1]
+    assert list(store.deltas('channels', 'None', 'subscriber_count')) == [100, 300]
+    assert store.growth('channels', 'None', 'subscriber_count') == {
+        'start': 10300000, 'end': 10300400, 'delta': 400, 'per_day': 400 / 3,
+    }
+
+
+def test_append_rejects_out_of_order_records(tmp_path):
+    """Проверка, что записи нельзя дописывать в прошлое"""
+    store = StatsStore(str(tmp_path))
+    store.append('videos', 'abc', {'view_count': 1}, timestamp=100)
+    with pytest.raises(Exception):
+        store.append('videos', 'abc', {'view_count': 2}, timestamp=50)
+    assert len(store.read('videos', 'abc')) == 1
+    assert len(store.read('videos', 'missing')) == 0
+
+
+def test_missing_values_are_skipped(tmp_path):
+    """Проверка, что скрытые значения (-1) не участвуют в расчёте приращений и роста"""
+    store = StatsStore(str(tmp_path))
+    store.append('channels', 'UC1', {'view_count': 50}, timestamp=0)
+    store.append('channels', 'UC1', {'subscriber_count': 100, 'view_count': 70}, timestamp=DAY)
+    store.append('channels', 'UC1', {'view_count': 80}, timestamp=2 * DAY)
+    store.append('channels', 'UC1', {'subscriber_count': 130, 'view_count': 90}, timestamp=4 * DAY)
+    assert list(store.deltas('channels', 'UC1', 'subscriber_count')) == [30]
+    assert store.growth('channels', 'UC1', 'subscriber_count') == {
+        'start': 100, 'end': 130, 'delta': 30, 'per_day': 10.0,
+    }
+    assert store.growth('channels', 'UC1', 'subscriber_count', end=2 * DAY) is None
+    assert list(store.deltas('channels', 'UC1', 'view_count')) == [20, 10, 10]
@@ -1,8 +1,13 @@
 import datetime
+import json
+import os
 
+import isodate
 import pytest
 
-from youtube import Video
+from tests.conftest import PATH_TO_TEST_VIDEO_JSON
+from tests.fake_api import make_video_item
+from youtube import IdentityMap, Video, parse_duration_seconds, parse_durations
 
 
 def test_get_attributes(video_from_json):
@@ -48,3 +53,93 @@ def test_incorrect_video_id():
     assert video.view_count is None
     assert video.like_count is None
     assert video.duration is None
+
+
+def test_registry(fake_client):
+    """Проверка реестра загруженных видео: повторное получение, инвалидация и счётчики"""
+    client = fake_client(videos=[make_video_item('abc')])
+    hits, misses = Video.registry.hits, Video.registry.misses
+    video = Video.get('abc')
+    assert Video.get('abc') is video
+    assert client.calls_to('videos') == 1
+    Video.registry.invalidate('abc')
+    assert Video.get('abc') is not video
+    assert client.calls_to('videos') == 2
+    assert Video.registry.hits - hits == 1
+    assert Video.registry.misses - misses == 2
+    assert len(Video.registry) == 1
+
+
+def test_registry_ttl_and_size():
+    """Проверка устаревания и вытеснения объектов из реестра"""
+    registry = IdentityMap(maxsize=2, ttl=60)
+    for key in ('a', 'b', 'c'):
+        registry.put(key, key.upper())
+    assert registry.get('a') is None
+    assert registry.get('c') == 'C'
+    registry.ttl = 0
+    assert registry.get('c') is None
+
+
+def test_compact_record():
+    """Проверка, что видео хранит компактную запись без полного ответа API"""
+    video = Video(video_json=PATH_TO_TEST_VIDEO_JSON)
+    assert not hasattr(video, '__dict__')
+    assert video.raw is None
+    assert video.record.duration_seconds == 11253
+    assert video.record.view_count == 49345436
+    assert Video(video_json=PATH_TO_TEST_VIDEO_JSON, keep_raw=True).raw['items'][0]['id'] == '9lO06Zxhu88'
+
+
+def test_partial_parts_are_merged(fake_client):
+    """Проверка, что видео, загруженное без части ответа, догружается только недостающей частью"""
+    client = fake_client(videos=[make_video_item('abc', duration='PT1M', like_count=7)])
+    video = Video.get('abc', part='contentDetails')
+    assert video.duration.total_seconds() == 60
+    assert video.like_count is None
+    assert Video.get('abc', part='contentDetails') is video
+    merged = Video.get('abc', part='statistics')
+    assert merged.like_count == 7
+    assert merged.duration.total_seconds() == 60
+    assert merged.has_parts('contentDetails,statistics')
+    assert [params['part'] for resource, params in client.calls] == ['contentDetails', 'statistics']
+    assert client.calls[1][1]['fields'] == 'etag,items(id,statistics(viewCount,likeCount,commentCount))'
+
+
+def test_parse_duration_matches_isodate():
+    """Проверка, что быстрый разбор длительности совпадает с isodate на наборе записанных значений"""
+    with open(os.path.join('tests', 'data', 'durations.json'), 'r') as file:
+        corpus = json.load(file)['durations']
+    expected = [int(isodate.parse_duration(value).total_seconds()) for value in corpus]
+    assert [parse_duration_seconds(value) for value in corpus] == expected
+    assert parse_durations(corpus + [None]).tolist() == expected + [0]
+    assert parse_duration_seconds(None) is None
+    with pytest.raises(isodate.ISO8601Error):
+        parse_duration_seconds('P')
+
+
+def test_lazy_videos_load_in_batches(fake_client, big_playlist_data):
+    """Проверка, что ленивые видео не обращаются к API до первого доступа и загружаются пачками"""
+    client = fake_client(**big_playlist_data)
+    videos = [Video.lazy(f'v{i:03d}') for i in range(1, 121)] + [Video.lazy('missing')]
+    assert client.calls == []
+    assert not videos[0].is_loaded
+    assert videos[5].duration == datetime.timedelta(seconds=6)
+    assert client.calls_to('videos') == 3
+    assert all(video.is_loaded for video in videos)
+    assert videos[-1].title is None
+    assert videos[119].like_count == 1200
+    assert Video.lazy('v001') is Video.get('v001')
+    assert client.calls_to('videos') == 3
+
+
+def test_dropped_lazy_videos_are_not_loaded(fake_client, big_playlist_data):
+    """Проверка, что ожидающие загрузки видео хранятся по слабым ссылкам и брошенные не запрашиваются"""
+    client = fake_client(**big_playlist_data)
+    for i in range(1, 100):
+        Video.lazy(f'v{i:03d}')
+    video = Video.lazy('v100')
+    assert Video.lazy('v100') is video
+    assert len(Video._pending) == 1
+    assert video.view_count == 0
+    assert client.calls[0][1]['id'] == 'v100'
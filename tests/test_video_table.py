@@ -0,0 +1,67 @@
+import numpy as np
+
+from tests.fake_api import make_video_item
+from youtube import VideoRecord, VideoTable
+
+
+def make_table() -> VideoTable:
+    records = [
+        VideoRecord('a', channel_id='UC1', view_count=100, like_count=10, comment_count=1, duration_seconds=60),
+        VideoRecord('b', channel_id='UC2', view_count=400, like_count=30, comment_count=2, duration_seconds=120),
+        VideoRecord('c', channel_id='UC1', view_count=0, like_count=None, comment_count=3, duration_seconds=30),
+        VideoRecord('d', channel_id='UC2', view_count=300, like_count=30, comment_count=4, duration_seconds=90),
+    ]
+    return VideoTable.from_records(records)
+
+
+def test_sum_and_top_k():
+    """Проверка суммы столбца и выбора лучших строк"""
+    table = make_table()
+    assert table.sum('duration_seconds') == 300
+    assert list(table.top_k('like_count', 2).video_ids) == ['b', 'd']
+    assert list(table.top_k('view_count', 10).video_ids) == ['b', 'd', 'a', 'c']
+
+
+def test_ratio_percentile_histogram():
+    """Проверка отношения столбцов, перцентилей и гистограммы"""
+    table = make_table()
+    assert np.allclose(table.ratio('like_count', 'view_count'), [0.1, 0.075, 0.0, 0.1])
+    assert table.percentile('view_count', 50) == 200
+    counts, _ = table.histogram('duration_seconds', bins=[0, 60, 180])
+    assert list(counts) == [1, 3]
+
+
+def test_filter_and_group_by_channel():
+    """Проверка фильтрации и группировки по каналам"""
+    table = make_table()
+    assert list(table.filter(table.view_count > 150).video_ids) == ['b', 'd']
+    assert table.group_by_channel('view_count') == {'UC1': 100, 'UC2': 700}
+
+
+def test_from_items():
+    """Проверка создания таблицы напрямую из элементов ответа API"""
+    items = [make_video_item('a', duration='PT1M', like_count=3), make_video_item('b', duration='PT1H1S')]
+    table = VideoTable.from_items(items)
+    assert table.duration_seconds.tolist() == [60, 3601]
+    assert table.like_count.tolist() == [3, 0]
+
+
+def test_top_k_prefers_earlier_rows_on_ties():
+    """Проверка, что при равных значениях выбираются строки, стоящие в таблице раньше"""
+    def table_of(likes):
+        return VideoTable.from_records([VideoRecord(f'v{i}', like_count=count) for i, count in enumerate(likes)])
+
+    assert list(table_of([7] * 1000).top_k('like_count', 1).video_ids) == ['v0']
+    likes = [1] * 30 + [5] * 40 + [3] * 30
+    assert list(table_of(likes).top_k('like_count', 3).video_ids) == ['v30', 'v31', 'v32']
+    assert list(table_of(likes).top_k('like_count', 42).video_ids)[-2:] == ['v70', 'v71']
+
+
+def test_records_share_parts_sets():
+    """Проверка, что записи с одинаковым набором частей хранят один экземпляр parts"""
+    first = VideoRecord.from_item(make_video_item('a', duration='PT1M'))
+    second = VideoRecord.from_item(make_video_item('b', duration='PT2M'))
+    assert first.parts is second.parts
+    statistics = VideoRecord.from_item({'id': 'a', 'statistics': {'viewCount': '5'}})
+    assert statistics.parts == {'statistics'}
+    assert statistics.merge(first).parts is first.parts
@@ -0,0 +1,313 @@
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tests.fake_api import make_video_item
+from youtube import (PlayList, QuotaExceededError, QuotaScheduler, RetryPolicy, SQLiteResponseCache, Video,
+                     VideoRecord, Youtube, YoutubeApiError)
+
+
+def test_import_does_not_build_client():
+    """Проверка, что импорт модуля не создаёт клиент API и не загружает googleapiclient"""
+    code = 'import sys, youtube; assert youtube.Youtube._client is None; assert "googleapiclient" not in sys.modules'
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_import_does_not_load_numpy():
+    """Проверка, что NumPy загружается только при работе с таблицами, а не при импорте модуля"""
+    code = ('import sys, youtube; assert "numpy" not in sys.modules; '
+            'youtube.Channel(channel_json="tests/data/test_channel_1.json").title; assert "numpy" not in sys.modules; '
+            'assert youtube.StatsStore.KINDS["videos"].itemsize == 32; assert "numpy" in sys.modules')
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_build_client_from_static_discovery(monkeypatch):
+    """Проверка создания клиента из поставляемого discovery-документа без обращения к сети"""
+    monkeypatch.setattr(Youtube, 'YOUTUBE_API_KEY', 'test-key')
+    client = Youtube.build_client()
+    assert hasattr(client, 'videos')
+
+
+def test_set_client(fake_client):
+    """Проверка подмены клиента API готовым объектом"""
+    client = fake_client(videos=[make_video_item('abc', duration='PT2M')])
+    assert Youtube.youtube is client
+    assert Video(video_id='abc').duration.total_seconds() == 120
+    assert client.calls_to('videos') == 1
+
+
+def test_cache_returns_fresh_response(fake_client, tmp_path):
+    """Проверка, что повторный запрос отдаётся из кэша без обращения к API"""
+    client = fake_client(videos=[make_video_item('abc')])
+    cache = SQLiteResponseCache(str(tmp_path / 'cache.sqlite'))
+    Youtube.set_cache(cache)
+    try:
+        assert Youtube.get_video('abc') == Youtube.get_video('abc')
+    finally:
+        Youtube.set_cache(None)
+    assert client.calls_to('videos') == 1
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_cache_ttl_by_part(tmp_path):
+    """Проверка выбора времени жизни записи по запрошенным частям ответа"""
+    cache = SQLiteResponseCache(str(tmp_path / 'cache.sqlite'), ttl={'snippet': 100, 'statistics': 5})
+    assert cache.ttl_for('videos', {'part': 'snippet'}) == 100
+    assert cache.ttl_for('videos', {'part': 'snippet,statistics'}) == 5
+
+
+def test_cache_keeps_playlist_items_briefly(tmp_path):
+    """Проверка, что состав плейлиста кэшируется ненадолго, а данные видео - на сутки"""
+    cache = SQLiteResponseCache(str(tmp_path / 'cache.sqlite'))
+    assert cache.ttl_for('playlistItems', {'part': 'contentDetails'}) == 10 * 60
+    assert cache.ttl_for('playlistItems', {'part': 'snippet'}) == 10 * 60
+    assert cache.ttl_for('playlists', {'part': 'snippet,contentDetails'}) == 10 * 60
+    assert cache.ttl_for('videos', {'part': 'contentDetails'}) == 24 * 60 * 60
+
+
+def test_cache_revalidates_with_etag(fake_client, tmp_path):
+    """Проверка перепроверки устаревшей записи по ETag: ответ 304 продлевает запись"""
+    client = fake_client(videos=[make_video_item('abc')])
+    cache = SQLiteResponseCache(str(tmp_path / 'cache.sqlite'), ttl={'videos': 0, 'snippet': 0,
+                                                                      'statistics': 0, 'contentDetails': 0})
+    Youtube.set_cache(cache)
+    try:
+        first = Youtube.get_video('abc')
+        second = Youtube.get_video('abc')
+    finally:
+        Youtube.set_cache(None)
+    assert first == second
+    assert client.calls_to('videos') == 2
+    assert cache.stats()['revalidations'] == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Проверка вытеснения записей при превышении размера кэша"""
+    cache = SQLiteResponseCache(str(tmp_path / 'cache.sqlite'), max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, {'items': []}, ttl=60)
+    assert len(cache) == 2
+    assert cache.get('a') is None
+    assert cache.stats()['evictions'] == 1
+
+
+
+def test_cache_hits_do_not_write_until_store(tmp_path):
+    """Проверка, что чтение из кэша не пишет в базу, но учитывается при вытеснении"""
+    path = str(tmp_path / 'cache.sqlite')
+    cache = SQLiteResponseCache(path, max_entries=2)
+    cache.set('a', {'items': []}, ttl=60)
+    cache.set('b', {'items': []}, ttl=60)
+    with sqlite3.connect(path) as reader:
+        query = "SELECT accessed_at FROM responses WHERE key = 'a'"
+        stored = reader.execute(query).fetchone()
+        for _ in range(10):
+            assert cache.get('a') is not None
+        assert reader.execute(query).fetchone() == stored
+    cache.set('c', {'items': []}, ttl=60)
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    cache.close()
+
+def test_scheduler_budget(fake_client):
+    """Проверка списания квоты и исключения при исчерпании бюджета"""
+    fake_client(videos=[make_video_item('abc')])
+    Youtube.set_scheduler(QuotaScheduler(budget=2, qps=1000))
+    try:
+        Youtube.get_video('abc')
+        Youtube.get_video('abc')
+        assert Youtube.scheduler.remaining() == 0
+        with pytest.raises(QuotaExceededError):
+            Youtube.get_video('abc')
+    finally:
+        Youtube.set_scheduler(None)
+
+
+def test_scheduler_reserves_budget_for_interactive_calls(fake_client):
+    """Проверка, что фоновые запросы не расходуют резерв интерактивных"""
+    fake_client(videos=[make_video_item('abc')])
+    Youtube.set_scheduler(QuotaScheduler(budget=3, qps=1000, interactive_reserve=1))
+    try:
+        with Youtube.background():
+            Youtube.get_video('abc')
+            Youtube.get_video('abc')
+            with pytest.raises(QuotaExceededError):
+                Youtube.get_video('abc')
+        Youtube.get_video('abc')
+    finally:
+        Youtube.set_scheduler(None)
+
+
+def test_scheduler_rate_limit():
+    """Проверка ограничения частоты запросов: 5 запросов при qps=100 и burst=1 занимают не меньше 40 мс"""
+    scheduler = QuotaScheduler(qps=100, burst=1)
+    start = time.monotonic()
+    for _ in range(5):
+        scheduler.acquire('videos')
+    assert time.monotonic() - start >= 0.039
+    assert scheduler.stats()['used'] == 5
+
+
+def test_retry_policy_gives_up_after_max_attempts():
+    """Проверка ограничения количества попыток и отказа от повтора фатальных ошибок"""
+    policy = RetryPolicy(max_attempts=3, sleep=lambda delay: None)
+    attempts = []
+
+    def fail(error):
+        attempts.append(error)
+        raise error
+
+    with pytest.raises(YoutubeApiError):
+        policy.call(fail, YoutubeApiError(503, b''))
+    assert len(attempts) == 3
+    with pytest.raises(YoutubeApiError):
+        policy.call(fail, YoutubeApiError(404, b''))
+    assert len(attempts) == 4
+
+
+def test_metrics(fake_client, tmp_path, monkeypatch, big_playlist_data):
+    """Проверка метрик по ресурсам: запросы, ошибки, повторы, объём, квота, кэш и прогресс"""
+    monkeypatch.setattr(Youtube.retry_policy, 'sleep', lambda delay: None)
+    client = fake_client(**big_playlist_data)
+    metrics = Youtube.enable_metrics()
+    progress = []
+    metrics.add_progress_hook(lambda task, done, total: progress.append((task, done, total)))
+    Youtube.enable_cache(str(tmp_path / 'cache.sqlite'))
+    try:
+        client.fail_next((503, 'backendError'))
+        playlist = PlayList(playlist_id='PL_big')
+        playlist.total_duration
+        Youtube.get_videos(['v001'], part='contentDetails', fields=VideoRecord.fields_mask('contentDetails'))
+        Youtube.get_videos(['v001'], part='contentDetails', fields=VideoRecord.fields_mask('contentDetails'))
+    finally:
+        Youtube.set_metrics(None)
+        Youtube.set_cache(None)
+    playlists = metrics.snapshot()['endpoints']['playlists']
+    assert (playlists['calls'], playlists['errors'], playlists['retries'], playlists['quota']) == (2, 1, 1, 2)
+    videos = metrics.snapshot()['endpoints']['videos']
+    assert videos['calls'] == 4
+    assert videos['bytes'] > 0
+    assert videos['latency_buckets']['+Inf'] == 4
+    assert (videos['cache_hits'], videos['cache_misses']) == (1, 4)
+    assert progress == [('playlist:PL_big:total_duration', 50, 120), ('playlist:PL_big:total_duration', 100, 120),
+                        ('playlist:PL_big:total_duration', 120, 120)]
+    text = metrics.prometheus()
+    assert 'youtube_api_calls_total{endpoint="videos"} 4' in text
+    assert 'youtube_api_request_duration_seconds_count{endpoint="playlists"} 2' in text
+    assert 'youtube_progress_done{task="playlist:PL_big:total_duration"} 120' in text
+
+
+def test_client_per_thread(monkeypatch):
+    """Проверка, что без установленного клиента каждый поток получает собственный клиент API"""
+    monkeypatch.setattr(Youtube, 'build_client', classmethod(lambda cls: object()))
+    Youtube.set_client(None)
+    try:
+        client = Youtube.get_client()
+        assert Youtube.get_client() is client
+        clients = Youtube.map(lambda _: Youtube.get_client(), range(4), workers=4)
+        assert client not in clients
+    finally:
+        Youtube.set_client(None)
+
+
+def test_map_loads_in_parallel(fake_client, tmp_path):
+    """Проверка параллельной загрузки: порядок результатов, пакетные запросы и счётчики кэша"""
+    videos = [make_video_item(f'v{i:03d}') for i in range(200)]
+    client = fake_client(videos=videos)
+    cache = Youtube.enable_cache(str(tmp_path / 'cache.sqlite'))
+    try:
+        video_ids = [video['id'] for video in videos]
+        assert [video.video_id for video in Youtube.map(Video.get, video_ids[:40], workers=8)] == video_ids[:40]
+        assert list(Video.get_many(video_ids, workers=4)) == video_ids
+        assert client.calls_to('videos') == 40 + 4
+        Youtube.map(lambda video_id: Youtube.get_video(video_id), video_ids[:40] * 2, workers=8)
+        assert cache.hits + cache.misses == 40 + 4 + 80
+    finally:
+        Youtube.set_cache(None)
+
+
+def test_concurrent_identical_requests_are_coalesced(fake_client):
+    """Проверка, что одновременные запросы одного видео выполняются одним запросом к API"""
+    client = fake_client(videos=[make_video_item('v001')])
+    client.latency = 0.2
+    metrics = Youtube.enable_metrics()
+    try:
+        responses = Youtube.map(lambda _: Youtube.get_video('v001'), range(8), workers=8)
+    finally:
+        Youtube.set_metrics(None)
+    assert [response['items'][0]['id'] for response in responses] == ['v001'] * 8
+    assert client.calls_to('videos') == 1
+    assert metrics.snapshot()['endpoints']['videos']['coalesced'] == 7
+    assert 'youtube_api_coalesced_total{endpoint="videos"} 7' in metrics.prometheus()
+    Youtube.get_video('v001')
+    assert client.calls_to('videos') == 2
+
+
+def test_batching_merges_lookups_within_window(fake_client):
+    """Проверка объединения запросов отдельных видео из разных потоков в один запрос list"""
+    client = fake_client(videos=[make_video_item(f'v{i:03d}', view_count=i) for i in range(30)])
+    Youtube.enable_batching(window=0.2)
+    try:
+        video_ids = [f'v{i:03d}' for i in range(30)] + ['missing']
+        videos = Youtube.map(Video.get, video_ids, workers=len(video_ids))
+    finally:
+        Youtube.set_batcher(None)
+    assert [video.view_count for video in videos[:30]] == list(range(30))
+    assert videos[-1].title is None
+    assert client.calls_to('videos') == 1
+    assert client.calls[0][1]['maxResults'] == 50
+
+
+def test_batching_requests_ids_for_masks_without_them(fake_client):
+    """Проверка, что пакетный запрос добавляет id элементов в маску fields, в которой их нет"""
+    channel = {'kind': 'youtube#channel', 'id': 'UC1', 'contentDetails': {'relatedPlaylists': {'uploads': 'UU1'}}}
+    client = fake_client(channels=[channel])
+    Youtube.enable_batching(window=0.01)
+    try:
+        assert Youtube.get_uploads_playlist_id('UC1') == 'UU1'
+        assert Youtube.get_uploads_playlist_id('UC_missing') is None
+    finally:
+        Youtube.set_batcher(None)
+    assert client.calls[0][1]['fields'].endswith(',items/id')
+
+
+def test_pool_threads_keep_clients_between_calls(monkeypatch):
+    """Проверка, что потоки пула и их клиенты API переиспользуются между вызовами map"""
+    built = []
+    monkeypatch.setattr(Youtube, 'build_client', classmethod(lambda cls: built.append(object()) or built[-1]))
+    monkeypatch.setattr(Youtube, '_executor', None)
+    monkeypatch.setattr(Youtube, '_executor_size', 0)
+    Youtube.set_client(None)
+    try:
+        for _ in range(5):
+            Youtube.map(lambda _: Youtube.get_client(), range(32), workers=4)
+        assert len(built) <= Youtube.DEFAULT_WORKERS
+        nested = Youtube.map(lambda item: Youtube.map(lambda value: value * item, range(3), workers=4), range(20))
+        assert nested[2] == [0, 2, 4]
+    finally:
+        Youtube.set_client(None)
+
+
+def test_concurrent_map_calls_with_different_pool_sizes(monkeypatch):
+    """Проверка, что замена пула более крупным не ломает идущий на прежнем пуле вызов imap"""
+    monkeypatch.setattr(Youtube, '_executor', None)
+    monkeypatch.setattr(Youtube, '_executor_size', 0)
+    started, replaced = threading.Event(), threading.Event()
+
+    def slow(item):
+        started.set()
+        replaced.wait(5)
+        return item * 2
+
+    with ThreadPoolExecutor(max_workers=1) as caller:
+        first = caller.submit(Youtube.map, slow, range(40), workers=8)
+        assert started.wait(5)
+        assert Youtube.map(lambda item: item + 1, range(40), workers=16) == list(range(1, 41))
+        replaced.set()
+        assert first.result(timeout=10) == [item * 2 for item in range(40)]
@@ -1,11 +1,752 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import contextlib
+import contextvars
 import datetime
+import functools
+import gzip
+import heapq
+import http.client
+import importlib
+import itertools
 import json
+import mmap
 import os
-from typing import List
+import queue
+import random
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple
 
 import isodate
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class _LazyModule:
+    """
+    Модуль, который импортируется при первом обращении к его атрибутам.
+    NumPy нужен только таблицам, истории статистики и офлайн-наборам, поэтому импорт youtube его не загружает.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.__name = name
+        self.__module = None
+
+    def __getattr__(self, attr: str):
+        if self.__module is None:
+            self.__module = importlib.import_module(self.__name)
+        return getattr(self.__module, attr)
+
+
+class _ClassConstant:
+    """Атрибут класса, значение которого создаётся при первом обращении (например, тип записей NumPy)"""
+
+    def __init__(self, factory) -> None:
+        self.factory = factory
+        self.value = None
+
+    def __get__(self, instance, owner):
+        if self.value is None:
+            self.value = self.factory()
+        return self.value
+
+
+np = _LazyModule('numpy')
+
+
+class CacheEntry(NamedTuple):
+    """Запись кэша ответов API"""
+    response: dict
+    etag: str | None
+    expires_at: float
+
+    def is_fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+
+class ResponseCache:
+    """
+    Базовый класс кэша ответов API YouTube.
+    Ключ записи строится по названию ресурса API и параметрам запроса.
+    Время жизни записи определяется по запрошенным частям (part) ответа: берётся минимальное
+    из значений TTL для '<ресурс>.<часть>', '<часть>' или '<ресурс>', иначе default.
+    Наследники реализуют хранение записей в методах _load, _store и _touch.
+    Attrs:
+        DEFAULT_TTL (dict): время жизни записей в секундах по умолчанию
+        hits (int): количество ответов, отданных из кэша без запроса
+        misses (int): количество запросов, ушедших в API
+        revalidations (int): количество ответов 304, подтвердивших устаревшую запись
+        evictions (int): количество записей, вытесненных из-за ограничения размера
+    """
+
+    DEFAULT_TTL = {
+        'default': 60 * 60,
+        'snippet': 24 * 60 * 60,
+        'contentDetails': 24 * 60 * 60,
+        'statistics': 10 * 60,
+        # состав плейлистов меняется часто, в отличие от названий и длительностей
+        'playlistItems': 10 * 60,
+        'playlistItems.contentDetails': 10 * 60,
+        'playlistItems.snippet': 10 * 60,
+        'playlists.contentDetails': 10 * 60,
+    }
+
+    def __init__(self, ttl: dict | None = None) -> None:
+        self.ttl = {**self.DEFAULT_TTL, **(ttl or {})}
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(resource: str, params: dict) -> str:
+        """Возвращает ключ записи для запроса к ресурсу API с указанными параметрами"""
+        return json.dumps([resource, params], sort_keys=True, ensure_ascii=False)
+
+    def ttl_for(self, resource: str, params: dict) -> float:
+        """Возвращает время жизни ответа на запрос к ресурсу API с указанными параметрами"""
+        ttls = []
+        for part in params.get('part', '').split(','):
+            for name in (f'{resource}.{part}', part, resource):
+                if name in self.ttl:
+                    ttls.append(self.ttl[name])
+                    break
+        return min(ttls) if ttls else self.ttl['default']
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Возвращает запись кэша (в том числе устаревшую) или None"""
+        with self._lock:
+            return self._load(key)
+
+    def set(self, key: str, response: dict, ttl: float) -> None:
+        """Сохраняет ответ API в кэш"""
+        with self._lock:
+            self._store(key, CacheEntry(response, response.get('etag'), time.time() + ttl))
+
+    def record_lookup(self, hit: bool) -> None:
+        """Учитывает попадание или промах; счётчики меняются под блокировкой, поэтому кэш можно использовать из потоков"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def touch(self, key: str, ttl: float) -> None:
+        """Продлевает время жизни записи после ответа 304"""
+        with self._lock:
+            self.revalidations += 1
+            self._touch(key, time.time() + ttl)
+
+    def stats(self) -> dict:
+        """Возвращает счётчики работы кэша"""
+        requests = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / requests if requests else 0.0,
+        }
+
+    def _load(self, key: str) -> CacheEntry | None:
+        raise NotImplementedError
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        raise NotImplementedError
+
+    def _touch(self, key: str, expires_at: float) -> None:
+        raise NotImplementedError
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    Кэш ответов API YouTube в файле SQLite.
+    При превышении max_entries вытесняются записи, к которым дольше всего не обращались.
+    Время обращения к записям копится в памяти и записывается в базу одной транзакцией при сохранении
+    записи, закрытии кэша или после ACCESS_FLUSH_SIZE обращений, поэтому чтение из кэша не пишет в файл.
+    Attrs:
+        :param path: путь к файлу базы данных
+        :type path: str
+        :param max_entries: максимальное количество записей
+        :type max_entries: int
+        :param ttl: время жизни записей в секундах (дополняет DEFAULT_TTL)
+        :type ttl: dict
+    """
+
+    ACCESS_FLUSH_SIZE = 1000
+
+    def __init__(self, path: str = '.youtube_cache.sqlite', max_entries: int = 100_000, ttl: dict | None = None) -> None:
+        super().__init__(ttl)
+        self.path = path
+        self.max_entries = max_entries
+        self.__accessed = {}
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                etag TEXT,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+            """
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.__connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def close(self) -> None:
+        """Записывает накопленное время обращений и закрывает соединение с базой данных"""
+        with self._lock:
+            with self.__connection:
+                self.__flush_accessed()
+        self.__connection.close()
+
+    def __flush_accessed(self) -> None:
+        """Записывает накопленное время обращений к записям; вызывается внутри транзакции"""
+        if self.__accessed:
+            self.__connection.executemany('UPDATE responses SET accessed_at = ? WHERE key = ?',
+                                          [(accessed_at, key) for key, accessed_at in self.__accessed.items()])
+            self.__accessed.clear()
+
+    def _load(self, key: str) -> CacheEntry | None:
+        row = self.__connection.execute(
+            'SELECT response, etag, expires_at FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.__accessed[key] = time.time()
+        if len(self.__accessed) >= self.ACCESS_FLUSH_SIZE:
+            with self.__connection:
+                self.__flush_accessed()
+        return CacheEntry(json.loads(row[0]), row[1], row[2])
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        with self.__connection:
+            # вытеснение опирается на время обращений, поэтому накопленные значения записываются первыми
+            self.__flush_accessed()
+            self.__connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                (key, json.dumps(entry.response, ensure_ascii=False), entry.etag, entry.expires_at, time.time())
+            )
+            excess = self.__connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.__connection.execute(
+                    'DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)',
+                    (excess,)
+                )
+                self.evictions += excess
+
+    def _touch(self, key: str, expires_at: float) -> None:
+        self.__accessed.pop(key, None)
+        with self.__connection:
+            self.__connection.execute(
+                'UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?', (expires_at, time.time(), key)
+            )
+
+
+class QuotaExceededError(Exception):
+    """Квота запросов к API YouTube исчерпана"""
+
+
+_request_priority = contextvars.ContextVar('request_priority', default=0)
+_progress_task = contextvars.ContextVar('progress_task', default=None)
+# маска fields уже запрашивает id элементов: items/id или id в списке полей items(...)
+_ITEM_ID_FIELD = re.compile(r'items(?:/id\b|\((?:[^()]*,)?id[,)])')
+# внутри Youtube.revalidating свежие записи кэша перепроверяются условным запросом
+_cache_revalidate = contextvars.ContextVar('cache_revalidate', default=False)
+
+
+class QuotaScheduler:
+    """
+    Планировщик запросов к API YouTube с учётом квоты.
+    Каждый запрос списывает из бюджета стоимость ресурса (ENDPOINT_COSTS). Частота запросов
+    ограничивается алгоритмом token bucket: не более qps запросов в секунду в среднем и не более
+    burst запросов подряд. Когда частота превышена, запрос ждёт, а не завершается ошибкой.
+    Фоновые запросы ждут, пока есть ожидающие интерактивные, и не могут расходовать последние
+    interactive_reserve единиц бюджета.
+    Attrs:
+        :param budget: бюджет квоты в единицах на период
+        :type budget: int
+        :param qps: допустимое среднее количество запросов в секунду
+        :type qps: float
+        :param burst: максимальное количество запросов подряд без ожидания
+        :type burst: int
+        :param period: период обновления бюджета в секундах
+        :type period: float
+        :param interactive_reserve: часть бюджета, доступная только интерактивным запросам
+        :type interactive_reserve: int
+        :param wait_for_quota: ждать обновления бюджета вместо исключения QuotaExceededError
+        :type wait_for_quota: bool
+    """
+
+    ENDPOINT_COSTS = {
+        'channels': 1,
+        'videos': 1,
+        'playlists': 1,
+        'playlistItems': 1,
+        'search': 100,
+    }
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+    def __init__(self, budget: int = 10_000, qps: float = 10.0, burst: int | None = None,
+                 period: float = 24 * 60 * 60, interactive_reserve: int = 0, wait_for_quota: bool = False) -> None:
+        self.budget = budget
+        self.qps = qps
+        self.burst = burst or max(1, int(qps))
+        self.period = period
+        self.interactive_reserve = interactive_reserve
+        self.wait_for_quota = wait_for_quota
+        self.used = 0
+        self.calls = 0
+        self.__tokens = float(self.burst)
+        self.__refilled_at = time.monotonic()
+        self.__period_start = time.monotonic()
+        self.__interactive_waiting = 0
+        self.__condition = threading.Condition()
+
+    def cost(self, resource: str) -> int:
+        """Возвращает стоимость запроса к ресурсу в единицах квоты"""
+        return self.ENDPOINT_COSTS.get(resource, 1)
+
+    def remaining(self) -> int:
+        """Возвращает остаток бюджета в текущем периоде"""
+        with self.__condition:
+            self.__reset_period()
+            return self.budget - self.used
+
+    def stats(self) -> dict:
+        """Возвращает состояние планировщика"""
+        with self.__condition:
+            self.__reset_period()
+            return {
+                'budget': self.budget,
+                'used': self.used,
+                'remaining': self.budget - self.used,
+                'calls': self.calls,
+                'resets_in': self.__period_start + self.period - time.monotonic(),
+            }
+
+    def acquire(self, resource: str, priority: int | None = None) -> None:
+        """
+        Блокирует поток, пока запрос к ресурсу нельзя выполнить, и списывает его стоимость.
+        Приоритет по умолчанию берётся из контекста (см. Youtube.background).
+        Если бюджета не хватает и wait_for_quota=False, вызывает QuotaExceededError.
+        """
+        if priority is None:
+            priority = _request_priority.get()
+        cost = self.cost(resource)
+        interactive = priority == self.INTERACTIVE
+        with self.__condition:
+            if interactive:
+                self.__interactive_waiting += 1
+            try:
+                while True:
+                    self.__reset_period()
+                    reserve = 0 if interactive else self.interactive_reserve
+                    if self.used + cost > self.budget - reserve:
+                        if not self.wait_for_quota:
+                            raise QuotaExceededError(
+                                f'Квота исчерпана: израсходовано {self.used} из {self.budget} единиц'
+                            )
+                        self.__condition.wait(self.__period_start + self.period - time.monotonic())
+                        continue
+                    if not interactive and self.__interactive_waiting:
+                        self.__condition.wait()
+                        continue
+                    self.__refill()
+                    if self.__tokens >= 1:
+                        self.__tokens -= 1
+                        self.used += cost
+                        self.calls += 1
+                        return
+                    self.__condition.wait((1 - self.__tokens) / self.qps)
+            finally:
+                if interactive:
+                    self.__interactive_waiting -= 1
+                    self.__condition.notify_all()
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+        self.__tokens = min(self.burst, self.__tokens + (now - self.__refilled_at) * self.qps)
+        self.__refilled_at = now
+
+    def __reset_period(self) -> None:
+        now = time.monotonic()
+        if now - self.__period_start >= self.period:
+            self.__period_start = now
+            self.used = 0
+            self.__condition.notify_all()
+
+
+class RetryPolicy:
+    """
+    Политика повторных запросов к API YouTube: экспоненциальная задержка со случайным разбросом (full jitter).
+    Повторяются сетевые ошибки, ответы с кодами RETRYABLE_STATUSES и ответы 403 с причиной из
+    RETRYABLE_REASONS (превышение частоты запросов). Остальные ошибки, например 404 или исчерпанная
+    дневная квота (quotaExceeded), считаются фатальными и возвращаются сразу.
+    Attrs:
+        :param max_attempts: максимальное количество попыток, включая первую
+        :type max_attempts: int
+        :param base_delay: задержка перед первым повтором в секундах
+        :type base_delay: float
+        :param max_delay: максимальная задержка между попытками в секундах
+        :type max_delay: float
+        :param max_elapsed: максимальное общее время попыток в секундах
+        :type max_elapsed: float
+        :param sleep: функция ожидания (подменяется в тестах)
+        :type sleep: Callable
+    """
+
+    RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+    RETRYABLE_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'backendError', 'internalError'}
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30,
+                 max_elapsed: float = 120, sleep=time.sleep) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+        self.sleep = sleep
+        self.retries = 0
+
+    @staticmethod
+    def error_status(error: Exception) -> int | None:
+        """Возвращает HTTP-статус ошибки API или None для сетевых и прочих ошибок"""
+        if isinstance(error, YoutubeApiError):
+            return error.status
+        return getattr(getattr(error, 'resp', None), 'status', None)
+
+    @staticmethod
+    def error_reasons(error: Exception) -> List[str]:
+        """Возвращает причины ошибки API (поле reason) из тела ответа"""
+        if isinstance(error, YoutubeApiError):
+            return error.reasons
+        try:
+            errors = json.loads(getattr(error, 'content', b'')).get('error', {}).get('errors', [])
+        except (ValueError, AttributeError):
+            return []
+        return [item.get('reason') for item in errors]
+
+    def is_retryable(self, error: Exception) -> bool:
+        """Возвращает True, если после ошибки запрос имеет смысл повторить"""
+        status = self.error_status(error)
+        if status is None:
+            return isinstance(error, (OSError, http.client.HTTPException))
+        if status in self.RETRYABLE_STATUSES:
+            return True
+        return status == 403 and bool(self.RETRYABLE_REASONS.intersection(self.error_reasons(error)))
+
+    def delay(self, attempt: int) -> float:
+        """Возвращает задержку перед повтором с номером attempt (начиная с 1)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def __next_delay(self, error: Exception, attempt: int, started_at: float) -> float | None:
+        """Возвращает задержку перед следующей попыткой или None, если повторять нельзя"""
+        if attempt >= self.max_attempts or not self.is_retryable(error):
+            return None
+        delay = self.delay(attempt)
+        if time.monotonic() + delay - started_at > self.max_elapsed:
+            return None
+        self.retries += 1
+        return delay
+
+    def call(self, func, *args, **kwargs):
+        """Вызывает func, повторяя вызов по правилам политики"""
+        started_at = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return func(*args, **kwargs)
+            except Exception as error:
+                delay = self.__next_delay(error, attempt, started_at)
+                if delay is None:
+                    raise
+            self.sleep(delay)
+
+    async def call_async(self, func, *args, **kwargs):
+        """Асинхронный вариант call для корутинных функций"""
+        started_at = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await func(*args, **kwargs)
+            except Exception as error:
+                delay = self.__next_delay(error, attempt, started_at)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+
+class Metrics:
+    """
+    Метрики обращений к API YouTube по ресурсам (channels, videos, playlists, playlistItems):
+    количество запросов, ошибок и повторов, объём полученных данных, гистограмма задержек,
+    израсходованная квота, попадания в кэш ответов и запросы, объединённые с другими (coalesced),
+    а также прогресс длительных операций.
+    Метрики собираются, только если они включены через Youtube.enable_metrics; выключенные метрики
+    стоят одной проверки на None на запрос. Доступны в виде словаря (snapshot) и в текстовом формате
+    Prometheus (prometheus).
+    Attrs:
+        :param buckets: верхние границы интервалов гистограммы задержек в секундах
+        :type buckets: tuple
+    """
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    COUNTERS = ('calls', 'errors', 'retries', 'bytes', 'quota', 'cache_hits', 'cache_misses', 'coalesced')
+
+    def __init__(self, buckets: Iterable[float] | None = None) -> None:
+        self.buckets = tuple(sorted(buckets or self.LATENCY_BUCKETS))
+        self.__endpoints = {}
+        self.__progress = {}
+        self.__hooks = []
+        self.__lock = threading.Lock()
+
+    def __endpoint(self, resource: str) -> dict:
+        endpoint = self.__endpoints.get(resource)
+        if endpoint is None:
+            endpoint = dict.fromkeys(self.COUNTERS, 0)
+            endpoint['latency_sum'] = 0.0
+            endpoint['latency_buckets'] = [0] * (len(self.buckets) + 1)
+            self.__endpoints[resource] = endpoint
+        return endpoint
+
+    def add(self, resource: str, counter: str, value: int = 1) -> None:
+        """Увеличивает счётчик ресурса"""
+        with self.__lock:
+            self.__endpoint(resource)[counter] += value
+
+    def record_call(self, resource: str, latency: float, quota: int, error: bool = False) -> None:
+        """Учитывает выполненный запрос к ресурсу: задержку, стоимость в квоте и признак ошибки"""
+        position = bisect.bisect_left(self.buckets, latency)
+        with self.__lock:
+            endpoint = self.__endpoint(resource)
+            endpoint['calls'] += 1
+            endpoint['quota'] += quota
+            endpoint['errors'] += error
+            endpoint['latency_sum'] += latency
+            endpoint['latency_buckets'][position] += 1
+
+    def add_progress_hook(self, hook) -> None:
+        """Добавляет функцию hook(task, done, total), которая вызывается при каждом обновлении прогресса"""
+        self.__hooks.append(hook)
+
+    def progress(self, task: str, done: int, total: int | None = None) -> None:
+        """Обновляет прогресс операции task: выполнено done из total"""
+        with self.__lock:
+            self.__progress[task] = (done, total)
+        for hook in self.__hooks:
+            hook(task, done, total)
+
+    def reset(self) -> None:
+        """Сбрасывает все метрики"""
+        with self.__lock:
+            self.__endpoints.clear()
+            self.__progress.clear()
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает копию метрик: {'endpoints': {ресурс: {...}}, 'progress': {операция: {'done', 'total'}}}.
+        Гистограмма задержек задаётся накопительными значениями по границам buckets (последняя - '+Inf').
+        """
+        with self.__lock:
+            endpoints = {resource: dict(endpoint, latency_buckets=list(endpoint['latency_buckets']))
+                         for resource, endpoint in self.__endpoints.items()}
+            progress = {task: {'done': done, 'total': total} for task, (done, total) in self.__progress.items()}
+        for endpoint in endpoints.values():
+            cumulative = list(itertools.accumulate(endpoint['latency_buckets']))
+            endpoint['latency_buckets'] = dict(zip([*map(str, self.buckets), '+Inf'], cumulative))
+            lookups = endpoint['cache_hits'] + endpoint['cache_misses']
+            endpoint['cache_hit_ratio'] = endpoint['cache_hits'] / lookups if lookups else 0.0
+        return {'endpoints': endpoints, 'progress': progress}
+
+    def prometheus(self) -> str:
+        """Возвращает метрики в текстовом формате Prometheus"""
+        snapshot = self.snapshot()
+        endpoints = snapshot['endpoints']
+        lines = []
+        counters = (
+            ('calls', 'youtube_api_calls_total', 'Количество запросов к API'),
+            ('errors', 'youtube_api_errors_total', 'Количество запросов, завершившихся ошибкой'),
+            ('retries', 'youtube_api_retries_total', 'Количество повторов запросов'),
+            ('bytes', 'youtube_api_received_bytes_total', 'Объём полученных ответов в байтах'),
+            ('quota', 'youtube_api_quota_units_total', 'Израсходованные единицы квоты'),
+            ('cache_hits', 'youtube_api_cache_hits_total', 'Ответы, взятые из кэша'),
+            ('cache_misses', 'youtube_api_cache_misses_total', 'Запросы, не найденные в кэше'),
+            ('coalesced', 'youtube_api_coalesced_total', 'Запросы, объединённые с одновременными такими же запросами'),
+        )
+        for key, name, description in counters:
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} counter']
+            lines += [f'{name}{{endpoint="{resource}"}} {endpoint[key]}' for resource, endpoint in endpoints.items()]
+        name = 'youtube_api_request_duration_seconds'
+        lines += [f'# HELP {name} Задержка запросов к API', f'# TYPE {name} histogram']
+        for resource, endpoint in endpoints.items():
+            for bound, count in endpoint['latency_buckets'].items():
+                lines.append(f'{name}_bucket{{endpoint="{resource}",le="{bound}"}} {count}')
+            lines.append(f'{name}_sum{{endpoint="{resource}"}} {endpoint["latency_sum"]}')
+            lines.append(f'{name}_count{{endpoint="{resource}"}} {endpoint["calls"]}')
+        name = 'youtube_api_cache_hit_ratio'
+        lines += [f'# HELP {name} Доля ответов, взятых из кэша', f'# TYPE {name} gauge']
+        lines += [f'{name}{{endpoint="{resource}"}} {endpoint["cache_hit_ratio"]}'
+                  for resource, endpoint in endpoints.items()]
+        lines += ['# HELP youtube_progress_done Выполненная часть операции', '# TYPE youtube_progress_done gauge']
+        lines += [f'youtube_progress_done{{task="{task}"}} {state["done"]}'
+                  for task, state in snapshot['progress'].items()]
+        lines += ['# HELP youtube_progress_total Размер операции', '# TYPE youtube_progress_total gauge']
+        lines += [f'youtube_progress_total{{task="{task}"}} {state["total"]}'
+                  for task, state in snapshot['progress'].items() if state['total'] is not None]
+        return '\n'.join(lines) + '\n'
+
+
+class SingleFlight:
+    """
+    Объединяет одновременные одинаковые вызовы: пока вызов с ключом key выполняется,
+    остальные вызовы с тем же ключом не выполняют fn, а ждут и получают тот же результат или ту же ошибку.
+    Результат не сохраняется: следующий вызов после завершения выполняется заново.
+    """
+
+    def __init__(self) -> None:
+        self.__calls = {}
+        self.__lock = threading.Lock()
+
+    def do(self, key, fn, *args) -> Any:
+        """Выполняет fn(*args) или дожидается результата уже выполняющегося вызова с тем же ключом"""
+        with self.__lock:
+            future = self.__calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.__calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+
+    def in_flight(self) -> int:
+        """Возвращает количество выполняющихся вызовов"""
+        with self.__lock:
+            return len(self.__calls)
+
+
+class _Batch:
+    """Пачка id, ожидающих одного запроса list: {id: Future с ответом для этого id}"""
+
+    __slots__ = ('futures', 'full')
+
+    def __init__(self) -> None:
+        self.futures = {}
+        self.full = threading.Event()
+
+
+class RequestBatcher:
+    """
+    Объединяет запросы отдельных каналов и видео по id, поступившие из разных потоков в течение окна window,
+    в один запрос list с несколькими id (не более max_ids). Первый запрос пачки ждёт окно, затем выполняет
+    общий запрос и раздаёт каждому вызывающему ответ с его элементом. Включается через Youtube.enable_batching.
+    Если маска fields не запрашивает id элементов, он добавляется в общий запрос.
+    Attrs:
+        :param window: время ожидания других запросов в секундах
+        :type window: float
+        :param max_ids: максимальное количество id в одном запросе
+        :type max_ids: int
+    """
+
+    def __init__(self, window: float = 0.005, max_ids: int = 50) -> None:
+        self.window = window
+        self.max_ids = max_ids
+        self.__batches = {}
+        self.__lock = threading.Lock()
+
+    def get(self, resource: str, item_id: str, part: str | None = None, fields: str | None = None) -> dict:
+        """Возвращает ответ API для одного id так, как если бы он был запрошен отдельно"""
+        key = (resource, part, fields)
+        with self.__lock:
+            batch = self.__batches.get(key)
+            leader = batch is None
+            if leader:
+                batch = self.__batches[key] = _Batch()
+            future = batch.futures.get(item_id)
+            if future is None:
+                future = batch.futures[item_id] = Future()
+            if len(batch.futures) >= self.max_ids:
+                # заполненная пачка закрывается, следующие id попадут в новую
+                del self.__batches[key]
+                batch.full.set()
+        if leader:
+            self.__flush(key, batch, resource, part, fields)
+        return future.result()
+
+    def __flush(self, key: tuple, batch: _Batch, resource: str, part: str | None, fields: str | None) -> None:
+        """Дожидается окончания окна или заполнения пачки и выполняет общий запрос"""
+        batch.full.wait(self.window)
+        with self.__lock:
+            if self.__batches.get(key) is batch:
+                del self.__batches[key]
+        ids = list(batch.futures)
+        try:
+            items = Youtube._get_many(resource, ids, part, fields)
+        except BaseException as error:
+            for future in batch.futures.values():
+                future.set_exception(error)
+            return
+        metrics = Youtube.metrics
+        if metrics is not None and len(ids) > 1:
+            metrics.add(resource, 'coalesced', len(ids) - 1)
+        for item_id, future in batch.futures.items():
+            future.set_result({'kind': f'youtube#{resource[:-1]}ListResponse',
+                               'items': [items[item_id]] if item_id in items else []})
+
+
+class VideoIdList(list):
+    """
+    Список id видео в плейлисте.
+    Attrs:
+        complete (bool): True, если получены все страницы плейлиста
+        error (Exception): ошибка, на которой остановилась загрузка страниц
+    """
+
+    def __init__(self, video_ids: Iterable[str] = (), complete: bool = True, error: Exception | None = None) -> None:
+        super().__init__(video_ids)
+        self.complete = complete
+        self.error = error
+
+
+class _LazyClient:
+    """
+    Дескриптор, который создаёт клиент API YouTube при первом обращении к нему.
+    Клиент googleapiclient работает поверх одного соединения httplib2 и не потокобезопасен,
+    поэтому каждый поток получает собственный клиент.
+    """
+
+    def __get__(self, instance, owner):
+        return owner.get_client()
 
 
 class Youtube:
@@ -13,57 +754,996 @@ class Youtube:
     Базовый класс, описывающий объект для работы с API YouTube
     Attrs:
         YOUTUBE_API_KEY (str): ключ для работы с API YouTube
-        youtube: клиент для работы с API YouTube
+        DISCOVERY_DOCUMENT (str): путь к локальному discovery-документу API (необязательно)
+        youtube: клиент для работы с API YouTube, создаётся при первом обращении (отдельный для каждого потока)
+        cache (ResponseCache): кэш ответов API, по умолчанию отключён
+        scheduler (QuotaScheduler): планировщик запросов с учётом квоты, по умолчанию отключён
+        retry_policy (RetryPolicy): политика повторных запросов при временных ошибках
+        metrics (Metrics): метрики обращений к API, по умолчанию отключены
+        single_flight (SingleFlight): объединение одновременных одинаковых запросов, None отключает его
+        batcher (RequestBatcher): объединение запросов отдельных каналов и видео в пачки, по умолчанию отключено
     """
 
     YOUTUBE_API_KEY = os.environ.get('YOUTUBE_API_KEY')
-    youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+    DISCOVERY_DOCUMENT = os.environ.get('YOUTUBE_DISCOVERY_DOCUMENT')
+    MAX_IDS_PER_REQUEST = 50
+    # части ответа по умолчанию; методы get_* принимают part и fields, чтобы запрашивать только нужное
+    DEFAULT_PARTS = {
+        'channels': 'snippet,statistics,contentDetails',
+        'videos': 'snippet,statistics,contentDetails',
+        'playlists': 'snippet,contentDetails',
+        'playlistItems': 'contentDetails',
+    }
+    # маски частичного ответа включают etag, чтобы кэш мог перепроверять ответы условными запросами
+    PLAYLIST_ITEM_IDS_FIELDS = 'etag,nextPageToken,items/contentDetails/videoId'
+    youtube = _LazyClient()
+    cache = None
+    scheduler = None
+    retry_policy = RetryPolicy()
+    metrics = None
+    single_flight = SingleFlight()
+    batcher = None
+    DEFAULT_WORKERS = 8
+    _client = None
+    _client_generation = 0
+    _thread_clients = threading.local()
+    _executor = None
+    _executor_size = 0
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls):
+        """
+        Возвращает клиент API YouTube. Если клиент установлен через set_client, он общий для всех потоков;
+        иначе каждый поток при первом вызове создаёт собственный клиент со своим соединением.
+        """
+        if Youtube._client is not None:
+            return Youtube._client
+        local = Youtube._thread_clients
+        if getattr(local, 'generation', None) != Youtube._client_generation:
+            local.client = cls.build_client()
+            local.generation = Youtube._client_generation
+        return local.client
+
+    @classmethod
+    def set_client(cls, client=None) -> None:
+        """
+        Устанавливает готовый клиент API YouTube (например, подменный клиент для тестов), общий для всех потоков.
+        Если client не передан, клиенты потоков будут заново созданы при следующем обращении к API.
+        """
+        Youtube._client = client
+        Youtube._client_generation += 1
+
+    @classmethod
+    def get_executor(cls, workers: int | None = None) -> ThreadPoolExecutor:
+        """
+        Возвращает общий пул потоков для запросов к API. Пул создаётся при первом обращении размером
+        DEFAULT_WORKERS и живёт всё время работы программы, поэтому клиенты API и соединения потоков
+        переиспользуются между вызовами imap. Если нужно больше потоков, пул заменяется более крупным;
+        прежний пул не останавливается: начатые на нём вызовы imap дорабатывают, а его потоки завершаются,
+        когда на пул не остаётся ссылок.
+        """
+        workers = max(workers or 0, cls.DEFAULT_WORKERS)
+        with Youtube._executor_lock:
+            if Youtube._executor is None or Youtube._executor_size < workers:
+                Youtube._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='youtube',
+                                                       initializer=cls.__mark_worker)
+                Youtube._executor_size = workers
+            return Youtube._executor
+
+    @staticmethod
+    def __mark_worker() -> None:
+        Youtube._thread_clients.in_pool = True
+
+    @staticmethod
+    def _reset_after_fork() -> None:
+        """Сбрасывает пул потоков в дочернем процессе: потоки родителя в нём не существуют"""
+        Youtube._executor = None
+        Youtube._executor_size = 0
+        Youtube._executor_lock = threading.Lock()
+        Youtube._thread_clients = threading.local()
+
+    @classmethod
+    def imap(cls, fn, items: Iterable, workers: int | None = None) -> Iterator:
+        """
+        Применяет fn к элементам items в общем пуле потоков (get_executor) и возвращает результаты
+        в порядке items; одновременно выполняется не больше workers вызовов.
+        Каждый поток работает со своим клиентом API; контекст вызывающего кода (приоритет запросов,
+        отслеживание прогресса) передаётся в потоки. При workers=1, а также при вызове из потока пула
+        (чтобы вложенные вызовы не ждали сами себя) вызовы выполняются в текущем потоке.
+        """
+        workers = cls.DEFAULT_WORKERS if workers is None else workers
+        if workers <= 1 or getattr(Youtube._thread_clients, 'in_pool', False):
+            yield from (fn(item) for item in items)
+            return
+        executor = cls.get_executor(workers)
+        items = iter(items)
+        futures = deque(executor.submit(contextvars.copy_context().run, fn, item)
+                        for item in itertools.islice(items, workers))
+        try:
+            while futures:
+                result = futures.popleft().result()
+                for item in itertools.islice(items, 1):
+                    futures.append(executor.submit(contextvars.copy_context().run, fn, item))
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
+
+    @classmethod
+    def map(cls, fn, items: Iterable, workers: int | None = None) -> list:
+        """
+        Возвращает список результатов fn для элементов items, вычисленных в пуле из workers потоков.
+        Например, Youtube.map(Video.get, video_ids, workers=16).
+        """
+        return list(cls.imap(fn, items, workers))
+
+    @classmethod
+    def build_client(cls):
+        """
+        Создаёт клиент API YouTube.
+        Если задан DISCOVERY_DOCUMENT, клиент строится из этого файла, иначе из discovery-документа,
+        поставляемого вместе с googleapiclient. В обоих случаях сеть при создании клиента не используется.
+        """
+        # googleapiclient импортируется здесь, чтобы импорт модуля не тянул за собой загрузку клиента
+        from googleapiclient.discovery import build, build_from_document
+
+        api_key = cls.YOUTUBE_API_KEY or os.environ.get('YOUTUBE_API_KEY')
+        if cls.DISCOVERY_DOCUMENT:
+            with open(cls.DISCOVERY_DOCUMENT, 'r') as file:
+                return build_from_document(file.read(), developerKey=api_key)
+        return build('youtube', 'v3', developerKey=api_key, static_discovery=True, cache_discovery=False)
 
     @classmethod
-    def get_channel(cls, channel_id: str) -> dict:
+    def set_cache(cls, cache: ResponseCache | None) -> None:
+        """Устанавливает кэш ответов API. None отключает кэширование"""
+        Youtube.cache = cache
+
+    @classmethod
+    def enable_cache(cls, path: str = '.youtube_cache.sqlite', **kwargs) -> 'SQLiteResponseCache':
+        """Включает кэширование ответов API в файле SQLite и возвращает созданный кэш"""
+        cache = SQLiteResponseCache(path, **kwargs)
+        cls.set_cache(cache)
+        return cache
+
+    @classmethod
+    def set_scheduler(cls, scheduler: 'QuotaScheduler | None') -> None:
+        """Устанавливает планировщик запросов с учётом квоты. None отключает планирование"""
+        Youtube.scheduler = scheduler
+
+    @classmethod
+    def set_metrics(cls, metrics: 'Metrics | None') -> None:
+        """Устанавливает объект для сбора метрик обращений к API. None отключает сбор метрик"""
+        Youtube.metrics = metrics
+
+    @classmethod
+    def set_batcher(cls, batcher: 'RequestBatcher | None') -> None:
+        """Устанавливает объединение запросов отдельных каналов и видео в пачки. None отключает его"""
+        Youtube.batcher = batcher
+
+    @classmethod
+    def enable_batching(cls, window: float = 0.005, **kwargs) -> 'RequestBatcher':
+        """
+        Включает объединение запросов get_channel и get_video из разных потоков, поступивших
+        в течение window секунд, в общие запросы list. Возвращает созданный RequestBatcher.
+        """
+        batcher = RequestBatcher(window, **kwargs)
+        cls.set_batcher(batcher)
+        return batcher
+
+    @classmethod
+    def enable_metrics(cls, **kwargs) -> 'Metrics':
+        """Включает сбор метрик обращений к API и возвращает созданный объект Metrics"""
+        metrics = Metrics(**kwargs)
+        cls.set_metrics(metrics)
+        return metrics
+
+    @staticmethod
+    @contextlib.contextmanager
+    def track_progress(task: str):
+        """
+        Контекстный менеджер, внутри которого пакетные загрузки сообщают о прогрессе операции task
+        в метрики (Metrics.progress).
+        """
+        token = _progress_task.set(task)
+        try:
+            yield
+        finally:
+            _progress_task.reset(token)
+
+    @classmethod
+    def report_progress(cls, done: int, total: int | None = None) -> None:
+        """Сообщает о прогрессе текущей операции (см. track_progress), если включены метрики"""
+        task = _progress_task.get()
+        if cls.metrics is not None and task is not None:
+            cls.metrics.progress(task, done, total)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def revalidating():
+        """
+        Контекстный менеджер, внутри которого ответы из кэша не используются без проверки:
+        каждая запись перепроверяется условным запросом по ETag (ответ 304 не расходует загрузку данных).
+        Нужен, когда известно, что данные изменились, а в кэше может лежать ещё не устаревший ответ.
+        """
+        token = _cache_revalidate.set(True)
+        try:
+            yield
+        finally:
+            _cache_revalidate.reset(token)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def background():
+        """
+        Контекстный менеджер, внутри которого запросы к API считаются фоновыми:
+        планировщик пропускает их только после ожидающих интерактивных запросов.
+        """
+        token = _request_priority.set(QuotaScheduler.BACKGROUND)
+        try:
+            yield
+        finally:
+            _request_priority.reset(token)
+
+    @classmethod
+    def _execute(cls, resource: str, **params) -> dict:
+        """
+        Выполняет запрос list к ресурсу API (channels, videos, playlists, playlistItems).
+        Одновременные одинаковые запросы из разных потоков выполняются один раз (single_flight).
+        """
+        single_flight = cls.single_flight
+        if single_flight is None:
+            return cls._execute_cached(resource, params)
+        key = (resource, tuple(sorted(params.items())), _cache_revalidate.get())
+        calls = itertools.count()
+
+        def execute():
+            next(calls)
+            return cls._execute_cached(resource, params)
+
+        response = single_flight.do(key, execute)
+        metrics = cls.metrics
+        if metrics is not None and not next(calls):
+            # запрос не выполнялся: результат получен от такого же одновременного запроса
+            metrics.add(resource, 'coalesced')
+        return response
+
+    @classmethod
+    def _execute_cached(cls, resource: str, params: dict) -> dict:
+        """
+        Выполняет запрос с учётом кэша: свежий ответ берётся из кэша, а устаревший с ETag перепроверяется
+        условным запросом: ответ 304 продлевает запись без повторной загрузки данных.
+        Внутри Youtube.revalidating перепроверяются и свежие записи.
+        """
+        cache = cls.cache
+        if cache is None:
+            return cls._send(resource, params)
+
+        key = cache.make_key(resource, params)
+        ttl = cache.ttl_for(resource, params)
+        entry = cache.get(key)
+        metrics = cls.metrics
+        if entry is not None and entry.is_fresh() and not _cache_revalidate.get():
+            cache.record_lookup(True)
+            if metrics is not None:
+                metrics.add(resource, 'cache_hits')
+            return entry.response
+
+        cache.record_lookup(False)
+        if metrics is not None:
+            metrics.add(resource, 'cache_misses')
+        headers = {'If-None-Match': entry.etag} if entry is not None and entry.etag else {}
+        try:
+            response = cls._send(resource, params, headers)
+        except Exception as error:
+            if entry is not None and getattr(getattr(error, 'resp', None), 'status', None) == 304:
+                cache.touch(key, ttl)
+                return entry.response
+            raise
+        cache.set(key, response, ttl)
+        return response
+
+    @classmethod
+    def _send(cls, resource: str, params: dict, headers: dict | None = None) -> dict:
+        """Отправляет запрос в API, повторяя его при временных ошибках по правилам retry_policy"""
+        metrics = cls.metrics
+        if metrics is None:
+            return cls.retry_policy.call(cls._send_once, resource, params, headers)
+        attempts = itertools.count()
+
+        def attempt():
+            if next(attempts):
+                metrics.add(resource, 'retries')
+            return cls._send_once(resource, params, headers)
+
+        return cls.retry_policy.call(attempt)
+
+    @classmethod
+    def _send_once(cls, resource: str, params: dict, headers: dict | None = None) -> dict:
+        """Отправляет запрос в API, предварительно получив разрешение планировщика"""
+        scheduler = cls.scheduler
+        if scheduler is not None:
+            scheduler.acquire(resource)
+        request = getattr(cls.youtube, resource)().list(**params)
+        if headers:
+            request.headers.update(headers)
+        metrics = cls.metrics
+        if metrics is None:
+            return request.execute()
+        return cls._execute_measured(request, resource, metrics)
+
+    @classmethod
+    def _execute_measured(cls, request, resource: str, metrics: 'Metrics') -> dict:
+        """Выполняет запрос, записывая в метрики задержку, ошибки, квоту и объём ответа"""
+        postproc = getattr(request, 'postproc', None)
+        if postproc is not None:
+            # postproc получает тело ответа до разбора JSON, поэтому здесь виден его размер
+            def measured_postproc(response, content):
+                metrics.add(resource, 'bytes', len(content))
+                return postproc(response, content)
+            request.postproc = measured_postproc
+        quota = (cls.scheduler or QuotaScheduler).ENDPOINT_COSTS.get(resource, 1)
+        started = time.perf_counter()
+        try:
+            response = request.execute()
+        except Exception as error:
+            # 304 - успешная перепроверка кэша, а не ошибка
+            metrics.record_call(resource, time.perf_counter() - started, quota,
+                                error=RetryPolicy.error_status(error) != 304)
+            raise
+        metrics.record_call(resource, time.perf_counter() - started, quota)
+        return response
+
+    @classmethod
+    def _projection(cls, resource: str, part: str | None, fields: str | None, **params) -> dict:
+        """
+        Возвращает параметры запроса с частями ответа part (по умолчанию DEFAULT_PARTS[resource])
+        и маской частичного ответа fields, если она задана.
+        """
+        params['part'] = part or cls.DEFAULT_PARTS[resource]
+        if fields:
+            params['fields'] = fields
+        return params
+
+    @classmethod
+    def get_channel(cls, channel_id: str, part: str | None = None, fields: str | None = None) -> dict:
         """Возвращает данные о канале"""
-        channel = cls.youtube.channels().list(id=channel_id, part='snippet,statistics').execute()
+        if cls.batcher is not None:
+            return cls.batcher.get('channels', channel_id, part, fields)
+        channel = cls._execute('channels', **cls._projection('channels', part, fields, id=channel_id))
         return channel
 
     @classmethod
-    def get_video(cls, video_id: str) -> dict:
+    def get_video(cls, video_id: str, part: str | None = None, fields: str | None = None) -> dict:
         """Возвращает данные о видео"""
-        video = cls.youtube.videos().list(id=video_id, part='snippet,statistics,contentDetails').execute()
+        if cls.batcher is not None:
+            return cls.batcher.get('videos', video_id, part, fields)
+        video = cls._execute('videos', **cls._projection('videos', part, fields, id=video_id))
         return video
 
+    @staticmethod
+    def _with_item_ids(fields: str | None) -> str | None:
+        """Возвращает маску fields, дополненную id элементов, если она их не запрашивает"""
+        if not fields or _ITEM_ID_FIELD.search(fields):
+            return fields
+        return f'{fields},items/id'
+
+    @classmethod
+    def _get_many(cls, resource: str, ids: Iterable[str], part: str | None = None,
+                  fields: str | None = None, workers: int = 1) -> Dict[str, dict]:
+        """
+        Возвращает элементы ресурса API по списку id в виде словаря {id: данные}.
+        Id упаковываются в запросы по MAX_IDS_PER_REQUEST штук, поэтому для N id
+        выполняется ceil(N / 50) запросов вместо N. При workers > 1 пачки запрашиваются параллельно.
+        Элементы, по которым API не вернул данные, в словарь не попадают.
+        Ответы раскладываются по id элементов, поэтому id добавляется в маску fields, если его там нет.
+        """
+        fields = cls._with_item_ids(fields)
+        unique_ids = list(dict.fromkeys(ids))
+        size = cls.MAX_IDS_PER_REQUEST
+        chunks = [unique_ids[start:start + size] for start in range(0, len(unique_ids), size)]
+
+        def fetch(chunk: List[str]) -> dict:
+            return cls._execute(resource, **cls._projection(resource, part, fields, id=','.join(chunk), maxResults=size))
+
+        items = {}
+        done = 0
+        for chunk, response in zip(chunks, cls.imap(fetch, chunks, workers)):
+            for item in response.get('items', []):
+                items[item['id']] = item
+            done += len(chunk)
+            cls.report_progress(done, len(unique_ids))
+        return items
+
     @classmethod
-    def get_video_in_playlist(cls, video_id: str, playlist_id: str) -> dict:
+    def get_videos(cls, video_ids: Iterable[str], part: str | None = None,
+                   fields: str | None = None, workers: int = 1) -> Dict[str, dict]:
+        """
+        Возвращает данные о нескольких видео в виде словаря {id видео: данные видео}, по 50 id на запрос.
+        При workers > 1 запросы выполняются в нескольких потоках.
+        """
+        return cls._get_many('videos', video_ids, part, fields, workers)
+
+    @classmethod
+    def get_channels(cls, channel_ids: Iterable[str], part: str | None = None,
+                     fields: str | None = None, workers: int = 1) -> Dict[str, dict]:
+        """
+        Возвращает данные о нескольких каналах в виде словаря {id канала: данные канала}, по 50 id на запрос.
+        При workers > 1 запросы выполняются в нескольких потоках.
+        """
+        return cls._get_many('channels', channel_ids, part, fields, workers)
+
+    @classmethod
+    def get_playlists(cls, playlist_ids: Iterable[str], part: str | None = None,
+                      fields: str | None = None, workers: int = 1) -> Dict[str, dict]:
+        """
+        Возвращает данные о нескольких плейлистах в виде словаря {id плейлиста: данные плейлиста},
+        по 50 id на запрос
+        """
+        return cls._get_many('playlists', playlist_ids, part, fields, workers)
+
+    @classmethod
+    def get_uploads_playlist_id(cls, channel_id: str) -> str | None:
+        """Возвращает id плейлиста со всеми загруженными на канал видео"""
+        channel = cls.get_channel(channel_id, part='contentDetails',
+                                  fields='etag,items/contentDetails/relatedPlaylists/uploads')
+        if channel.get('items'):
+            return channel['items'][0].get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
+        return None
+
+    @classmethod
+    def get_video_in_playlist(cls, video_id: str, playlist_id: str, part: str = 'snippet',
+                              fields: str | None = 'etag,items/snippet/playlistId') -> dict:
         """Возвращает данные о видео в плейлисте"""
-        video_in_playlist = cls.youtube.playlistItems().list(
-            part="snippet", playlistId=playlist_id, videoId=video_id
-        ).execute()
+        params = cls._projection('playlistItems', part, fields, playlistId=playlist_id, videoId=video_id)
+        video_in_playlist = cls._execute('playlistItems', **params)
         return video_in_playlist
 
     @classmethod
-    def get_playlist(cls, playlist_id: str) -> dict:
+    def get_playlist(cls, playlist_id: str, part: str | None = None, fields: str | None = None) -> dict:
         """Возвращает данные о плейлисте"""
-        playlist = cls.youtube.playlists().list(id=playlist_id, part='snippet,contentDetails', maxResults=50).execute()
+        playlist = cls._execute('playlists', **cls._projection('playlists', part, fields, id=playlist_id, maxResults=50))
         return playlist
 
     @classmethod
-    def get_playlist_video_ids(cls, playlist_id: str) -> List[str]:
-        """Возвращает список id видео в плейлисте"""
-        video_ids = []
-        params = {'playlistId': playlist_id, 'part': 'snippet,contentDetails', 'maxResults': 50}
+    def iter_playlist_items(cls, playlist_id: str, part: str = 'contentDetails', page_token: str | None = None,
+                            fields: str | None = None) -> Iterator[dict]:
+        """
+        Постранично возвращает ответы playlistItems().list по мере их получения.
+        Следующая страница запрашивается, только когда вызывающий код перешёл к ней,
+        поэтому обработку можно совмещать с загрузкой и прервать в любой момент.
+        Загрузку можно продолжить с нужной страницы, передав page_token.
+        Маска fields должна включать nextPageToken, иначе будет получена только первая страница.
+        """
+        params = cls._projection('playlistItems', part, fields, playlistId=playlist_id,
+                                 maxResults=cls.MAX_IDS_PER_REQUEST)
+        if page_token:
+            params['pageToken'] = page_token
         while True:
-            try:
-                playlists = cls.youtube.playlistItems().list(**params).execute()
-                for item in playlists['items']:
-                    video_ids.append(item['snippet']['resourceId'].get('videoId'))
-                params['pageToken'] = playlists.get('nextPageToken')
-                if not params['pageToken']:
-                    break
-            except HttpError:
-                break
+            page = cls._execute('playlistItems', **params)
+            yield page
+            params['pageToken'] = page.get('nextPageToken')
+            if not params['pageToken']:
+                return
+
+    @staticmethod
+    def playlist_item_video_id(item: dict) -> str | None:
+        """Возвращает id видео из элемента ответа playlistItems().list"""
+        if 'contentDetails' in item:
+            return item['contentDetails'].get('videoId')
+        return item.get('snippet', {}).get('resourceId', {}).get('videoId')
+
+    @classmethod
+    def get_playlist_if_changed(cls, playlist_id: str, etag: str | None) -> dict | None:
+        """
+        Возвращает данные о количестве элементов плейлиста (contentDetails.itemCount) или None,
+        если ETag плейлиста совпадает с переданным и сервер ответил 304.
+        """
+        try:
+            return cls._send('playlists', {'id': playlist_id, 'part': 'contentDetails'},
+                             {'If-None-Match': etag} if etag else None)
+        except Exception as error:
+            if RetryPolicy.error_status(error) == 304:
+                return None
+            raise
+
+    @classmethod
+    def get_playlist_video_ids(cls, playlist_id: str) -> VideoIdList:
+        """
+        Возвращает список id видео в плейлисте.
+        Временные ошибки повторяются по правилам retry_policy. Если страницу так и не удалось получить,
+        возвращается уже загруженная часть списка с complete=False и ошибкой в атрибуте error.
+        """
+        from googleapiclient.errors import HttpError
+
+        video_ids = VideoIdList()
+        try:
+            for page in cls.iter_playlist_items(playlist_id, fields=cls.PLAYLIST_ITEM_IDS_FIELDS):
+                video_ids.extend(cls.playlist_item_video_id(item) for item in page['items'])
+        except (HttpError, QuotaExceededError) as error:
+            video_ids.complete = False
+            video_ids.error = error
         return video_ids
 
+    @classmethod
+    def get_channel_playlist_ids(cls, channel_id: str) -> List[str]:
+        """Возвращает id всех плейлистов канала (постранично, по 50 на запрос)"""
+        params = {'channelId': channel_id, 'part': 'id', 'maxResults': cls.MAX_IDS_PER_REQUEST,
+                  'fields': 'etag,nextPageToken,items/id'}
+        playlist_ids = []
+        while True:
+            page = cls._execute('playlists', **params)
+            playlist_ids.extend(item['id'] for item in page.get('items', []))
+            params['pageToken'] = page.get('nextPageToken')
+            if not params['pageToken']:
+                return playlist_ids
+
 
-class Channel:
+# дочерний процесс (например, воркер ProcessPoolExecutor) создаёт собственный пул потоков
+os.register_at_fork(after_in_child=Youtube._reset_after_fork)
+
+
+class IdentityMap:
+    """
+    Ограниченный по размеру реестр загруженных объектов с вытеснением давно не использованных (LRU).
+    Объект считается актуальным в течение ttl секунд после загрузки.
+    Attrs:
+        :param maxsize: максимальное количество объектов в реестре
+        :type maxsize: int
+        :param ttl: время актуальности объекта в секундах
+        :type ttl: float
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 10 * 60) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__objects = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__objects)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, count=False) is not None
+
+    def get(self, key: str, count: bool = True) -> Any | None:
+        """Возвращает актуальный объект по ключу или None"""
+        with self.__lock:
+            value = self.__objects.get(key)
+            if value is not None and time.monotonic() - value[0] > self.ttl:
+                del self.__objects[key]
+                value = None
+            if value is None:
+                if count:
+                    self.misses += 1
+                return None
+            self.__objects.move_to_end(key)
+            if count:
+                self.hits += 1
+            return value[1]
+
+    def put(self, key: str, obj: Any) -> None:
+        """Добавляет объект в реестр, вытесняя давно не использованные объекты"""
+        with self.__lock:
+            self.__objects[key] = (time.monotonic(), obj)
+            self.__objects.move_to_end(key)
+            while len(self.__objects) > self.maxsize:
+                self.__objects.popitem(last=False)
+
+    def invalidate(self, key: str | None = None) -> None:
+        """Удаляет объект из реестра. Если ключ не указан, реестр очищается полностью"""
+        with self.__lock:
+            if key is None:
+                self.__objects.clear()
+            else:
+                self.__objects.pop(key, None)
+
+    def stats(self) -> dict:
+        """Возвращает счётчики попаданий и промахов"""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.__objects)}
+
+
+# запись ленивого объекта (Channel.lazy, Video.lazy), данные которого ещё не загружены
+_PENDING = object()
+
+
+def _to_int(value: str | int | None) -> int | None:
+    """Преобразует числовое поле ответа API (строку) в int"""
+    if value is None:
+        return None
+    return int(value)
+
+
+def _to_str(value: int | None) -> str | None:
+    """Преобразует число в строку, как это делает API"""
+    if value is None:
+        return None
+    return str(value)
+
+
+_DURATION_PATTERN = re.compile(r'P(?:(\d+)D)?(?:T(?=\d)(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?')
+
+
+@functools.lru_cache(maxsize=65_536)
+def _duration_seconds(iso_8601_duration: str) -> int:
+    """
+    Возвращает длительность в секундах. Формат P#DT#H#M#S, который возвращает API YouTube, разбирается
+    регулярным выражением; остальные варианты ISO 8601 (недели, дробные секунды и т. п.) - через isodate.
+    """
+    match = _DURATION_PATTERN.fullmatch(iso_8601_duration)
+    if match is None or iso_8601_duration == 'P':
+        return int(isodate.parse_duration(iso_8601_duration).total_seconds())
+    days, hours, minutes, seconds = (int(value) if value else 0 for value in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def parse_duration_seconds(iso_8601_duration: str | None) -> int | None:
+    """Возвращает длительность в формате ISO 8601 в секундах"""
+    if iso_8601_duration is None:
+        return None
+    return _duration_seconds(iso_8601_duration)
+
+
+def parse_durations(durations: Iterable[str | None]) -> np.ndarray:
+    """
+    Преобразует столбец длительностей в формате ISO 8601 в массив секунд (int64).
+    Каждое уникальное значение разбирается один раз; отсутствующие значения заменяются на 0.
+    """
+    durations = np.array([duration or '' for duration in durations], dtype=str)
+    values, inverse = np.unique(durations, return_inverse=True)
+    seconds = np.fromiter((_duration_seconds(value) if value else 0 for value in values), dtype=np.int64,
+                          count=len(values))
+    return seconds[inverse.reshape(-1)]
+
+
+class _Record:
+    """
+    Общая часть компактных записей ChannelRecord и VideoRecord. Наследник задаёт поля записи FIELDS,
+    поля каждой части ответа API PART_FIELDS и маски частичного ответа для этих частей FIELD_MASKS.
+    """
+
+    FIELDS = ()
+    PART_FIELDS = {}
+    FIELD_MASKS = {}
+    # различных наборов частей немного, поэтому записи хранят общие экземпляры frozenset
+    _PARTS = {}
+    __slots__ = ('parts',)
+
+    @staticmethod
+    def _intern_parts(parts: Iterable[str]) -> frozenset:
+        """Возвращает общий для всех записей экземпляр frozenset с частями parts"""
+        key = tuple(sorted(set(parts)))
+        interned = _Record._PARTS.get(key)
+        if interned is None:
+            interned = _Record._PARTS.setdefault(key, frozenset(key))
+        return interned
+
+    @classmethod
+    def from_dict(cls, data: dict) -> '_Record':
+        """Создаёт запись из словаря, полученного методом to_dict"""
+        return cls(**{name: data.get(name) for name in cls.FIELDS})
+
+    def to_dict(self) -> dict:
+        """Возвращает поля записи в виде словаря"""
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def split_parts(cls, part: str | None) -> frozenset:
+        """Возвращает множество частей ответа API из строки part (по умолчанию все части записи)"""
+        return frozenset(part.split(',')) if part else frozenset(cls.PART_FIELDS)
+
+    @classmethod
+    def fields_mask(cls, part: str | None = None) -> str:
+        """Возвращает маску частичного ответа fields с полями записи из указанных частей ответа API"""
+        parts = cls.split_parts(part)
+        masks = [mask for name, mask in cls.FIELD_MASKS.items() if name in parts]
+        return f'etag,items(id,{",".join(masks)})'
+
+    def has_parts(self, part: str | None) -> bool:
+        """Возвращает True, если запись заполнена из всех указанных частей ответа API"""
+        return self.split_parts(part) <= self.parts
+
+    def merge(self, other: '_Record') -> '_Record':
+        """Возвращает новую запись с данными этой записи, дополненными частями other, которых в ней нет"""
+        merged = self.__class__(**self.to_dict(), parts=self.parts | other.parts)
+        for part in other.parts - self.parts:
+            for name in self.PART_FIELDS[part]:
+                setattr(merged, name, getattr(other, name))
+        return merged
+
+
+class ChannelRecord(_Record):
+    """
+    Компактная запись с данными канала. Поля извлекаются из ответа API один раз при загрузке,
+    числовые значения хранятся в виде int. В parts хранятся части ответа API, из которых заполнена запись.
+    """
+
+    FIELDS = ('channel_id', 'title', 'description', 'link', 'subscriber_count', 'video_count', 'view_count',
+              'uploads_playlist_id')
+    PART_FIELDS = {
+        'snippet': ('title', 'description', 'link'),
+        'statistics': ('subscriber_count', 'video_count', 'view_count'),
+        'contentDetails': ('uploads_playlist_id',),
+    }
+    FIELD_MASKS = {
+        'snippet': 'snippet(title,description,customUrl)',
+        'statistics': 'statistics(subscriberCount,videoCount,viewCount)',
+        'contentDetails': 'contentDetails/relatedPlaylists/uploads',
+    }
+    __slots__ = FIELDS
+
+    def __init__(self, channel_id: str | None, title: str | None = None, description: str | None = None,
+                 link: str | None = None, subscriber_count: int | None = None, video_count: int | None = None,
+                 view_count: int | None = None, uploads_playlist_id: str | None = None,
+                 parts: Iterable[str] | None = None) -> None:
+        self.channel_id = channel_id
+        self.title = title
+        self.description = description
+        self.link = link
+        self.subscriber_count = subscriber_count
+        self.video_count = video_count
+        self.view_count = view_count
+        self.uploads_playlist_id = uploads_playlist_id
+        self.parts = self._intern_parts(self.PART_FIELDS if parts is None else parts)
+
+    @classmethod
+    def from_item(cls, item: dict) -> 'ChannelRecord':
+        """Создаёт запись из элемента ответа channels().list"""
+        snippet = item.get('snippet', {})
+        statistics = item.get('statistics', {})
+        return cls(
+            channel_id=item.get('id'),
+            title=snippet.get('title'),
+            description=snippet.get('description'),
+            link=snippet.get('customUrl'),
+            subscriber_count=_to_int(statistics.get('subscriberCount')),
+            video_count=_to_int(statistics.get('videoCount')),
+            view_count=_to_int(statistics.get('viewCount')),
+            uploads_playlist_id=item.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads'),
+            parts=[part for part in cls.PART_FIELDS if part in item],
+        )
+
+    def to_item(self) -> dict:
+        """Возвращает запись в виде элемента ответа channels().list"""
+        return {
+            'kind': 'youtube#channel',
+            'id': self.channel_id,
+            'snippet': {'title': self.title, 'description': self.description, 'customUrl': self.link},
+            'statistics': {
+                'subscriberCount': _to_str(self.subscriber_count),
+                'videoCount': _to_str(self.video_count),
+                'viewCount': _to_str(self.view_count),
+            },
+            'contentDetails': {'relatedPlaylists': {'uploads': self.uploads_playlist_id}},
+        }
+
+
+class VideoRecord(_Record):
+    """
+    Компактная запись с данными видео. Поля извлекаются из ответа API один раз при загрузке,
+    количества и длительность (в секундах) хранятся в виде int.
+    В parts хранятся части ответа API, из которых заполнена запись.
+    """
+
+    FIELDS = ('video_id', 'title', 'channel_id', 'published_at', 'view_count', 'like_count', 'comment_count',
+              'duration_seconds')
+    PART_FIELDS = {
+        'snippet': ('title', 'channel_id', 'published_at'),
+        'statistics': ('view_count', 'like_count', 'comment_count'),
+        'contentDetails': ('duration_seconds',),
+    }
+    FIELD_MASKS = {
+        'snippet': 'snippet(title,localized/title,channelId,publishedAt)',
+        'statistics': 'statistics(viewCount,likeCount,commentCount)',
+        'contentDetails': 'contentDetails/duration',
+    }
+    __slots__ = FIELDS
+
+    def __init__(self, video_id: str | None, title: str | None = None, channel_id: str | None = None,
+                 published_at: str | None = None, view_count: int | None = None, like_count: int | None = None,
+                 comment_count: int | None = None, duration_seconds: int | None = None,
+                 parts: Iterable[str] | None = None) -> None:
+        self.video_id = video_id
+        self.title = title
+        self.channel_id = channel_id
+        self.published_at = published_at
+        self.view_count = view_count
+        self.like_count = like_count
+        self.comment_count = comment_count
+        self.duration_seconds = duration_seconds
+        self.parts = self._intern_parts(self.PART_FIELDS if parts is None else parts)
+
+    @classmethod
+    def from_item(cls, item: dict) -> 'VideoRecord':
+        """Создаёт запись из элемента ответа videos().list"""
+        snippet = item.get('snippet', {})
+        statistics = item.get('statistics', {})
+        return cls(
+            video_id=item.get('id'),
+            title=snippet.get('localized', {}).get('title', snippet.get('title')),
+            channel_id=snippet.get('channelId'),
+            published_at=snippet.get('publishedAt'),
+            view_count=_to_int(statistics.get('viewCount')),
+            like_count=_to_int(statistics.get('likeCount')),
+            comment_count=_to_int(statistics.get('commentCount')),
+            duration_seconds=parse_duration_seconds(item.get('contentDetails', {}).get('duration')),
+            parts=[part for part in cls.PART_FIELDS if part in item],
+        )
+
+    def to_item(self) -> dict:
+        """Возвращает запись в виде элемента ответа videos().list"""
+        duration = None if self.duration_seconds is None else f'PT{self.duration_seconds}S'
+        return {
+            'kind': 'youtube#video',
+            'id': self.video_id,
+            'snippet': {
+                'title': self.title,
+                'localized': {'title': self.title},
+                'channelId': self.channel_id,
+                'publishedAt': self.published_at,
+            },
+            'contentDetails': {'duration': duration},
+            'statistics': {
+                'viewCount': _to_str(self.view_count),
+                'likeCount': _to_str(self.like_count),
+                'commentCount': _to_str(self.comment_count),
+            },
+        }
+
+
+class _RegistryEntity:
+    """
+    Общая часть Channel и Video: реестр загруженных объектов, догрузка недостающих частей ответа API
+    и ленивые объекты (lazy), данные которых загружаются пачками при первом обращении.
+    Наследник задаёт реестр registry, класс компактной записи RECORD, атрибут записи с id (ID_FIELD)
+    и методы _blank (пустой объект с id), _from_response (объект из ответа API) и _fetch_one/_fetch_many
+    (запросы к API).
+    """
+
+    __slots__ = ('_record', '__weakref__')
+    RECORD = None
+    ID_FIELD = None
+
+    @classmethod
+    def _entity(cls) -> type:
+        """Возвращает класс, которому принадлежит реестр (для PLVideo - Video)"""
+        return next(klass for klass in cls.__mro__ if 'registry' in vars(klass))
+
+    @classmethod
+    def _blank(cls, item_id: str) -> '_RegistryEntity':
+        raise NotImplementedError
+
+    @classmethod
+    def _from_response(cls, item_id: str, response: dict) -> '_RegistryEntity':
+        raise NotImplementedError
+
+    @classmethod
+    def _fetch_one(cls, item_id: str, part: str | None, fields: str | None) -> dict:
+        raise NotImplementedError
+
+    @classmethod
+    def _fetch_many(cls, item_ids: List[str], part: str | None, fields: str | None, workers: int) -> Dict[str, dict]:
+        raise NotImplementedError
+
+    @classmethod
+    def from_record(cls, record) -> '_RegistryEntity':
+        """Создаёт объект из компактной записи без обращения к API"""
+        entity = cls._blank(getattr(record, cls.ID_FIELD))
+        entity._record = record
+        return entity
+
+    @classmethod
+    def lazy(cls, item_id: str) -> '_RegistryEntity':
+        """
+        Возвращает объект без обращения к API: данные загружаются при первом обращении к любому из атрибутов.
+        Данные всех ожидающих загрузки объектов, созданных lazy, запрашиваются вместе пачками по 50 id.
+        Если объект уже есть в реестре или уже ожидает загрузки, возвращается он. Ожидающие объекты
+        хранятся по слабым ссылкам: объект, на который больше никто не ссылается, не загружается.
+        """
+        entity_class = cls._entity()
+        entity = entity_class.registry.get(item_id, count=False)
+        if entity is not None:
+            return entity
+        with entity_class._pending_lock:
+            entity = entity_class._pending.get(item_id)
+            if entity is None:
+                entity = entity_class._blank(item_id)
+                entity._record = _PENDING
+                entity_class._pending[item_id] = entity
+        return entity
+
+    @classmethod
+    def load_pending(cls) -> None:
+        """Загружает данные всех ожидающих загрузки объектов, созданных методом lazy"""
+        entity_class = cls._entity()
+        with entity_class._pending_lock:
+            pending = dict(entity_class._pending)
+            entity_class._pending.clear()
+        if not pending:
+            return
+        loaded = entity_class.get_many(pending)
+        for item_id, entity in pending.items():
+            entity._record = loaded[item_id].record if item_id in loaded else None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Возвращает False, если данные объекта, созданного lazy, ещё не загружены"""
+        return self._record is not _PENDING
+
+    def _loaded(self):
+        """Возвращает запись с данными, загружая данные ленивого объекта при первом обращении"""
+        if self._record is _PENDING:
+            self.load_pending()
+            if self._record is _PENDING:
+                # объект загружается в другом потоке или пакетная загрузка завершилась ошибкой
+                self._record = self._entity().get(getattr(self, self.ID_FIELD)).record
+        return self._record
+
+    def has_parts(self, part: str | None) -> bool:
+        """Возвращает True, если данные объекта загружены из всех указанных частей ответа API"""
+        record = self._loaded()
+        return record is None or record.has_parts(part)
+
+    @property
+    def record(self):
+        """Возвращает компактную запись с данными"""
+        return self._loaded()
+
+    @classmethod
+    def _fields(cls, part: str | None) -> str | None:
+        """Возвращает маску fields с полями записи или None, если сохраняется полный ответ API"""
+        return None if cls.KEEP_RAW else cls.RECORD.fields_mask(part)
+
+    @classmethod
+    def get(cls, item_id: str, part: str | None = None) -> '_RegistryEntity':
+        """
+        Возвращает объект из реестра загруженных объектов, загружая его при отсутствии или устаревании.
+        part - нужные части ответа API (по умолчанию все): если в реестре объект загружен без них,
+        недостающие части запрашиваются и объединяются с уже загруженными.
+        """
+        entity_class = cls._entity()
+        entity = entity_class.registry.get(item_id)
+        if entity is None or not entity.has_parts(part):
+            loaded = entity_class._from_response(item_id, cls._fetch_one(item_id, part, cls._fields(part)))
+            if entity is not None and loaded.record is not None:
+                loaded = entity_class.from_record(loaded.record.merge(entity.record))
+            entity = loaded
+            entity_class.registry.put(item_id, entity)
+        return entity
+
+    @classmethod
+    def get_many(cls, item_ids: Iterable[str], part: str | None = None, workers: int = 1) -> Dict[str, '_RegistryEntity']:
+        """
+        Возвращает словарь {id: объект} для указанных id в порядке id.
+        Объекты, которых нет в реестре (или которые загружены без частей ответа part), загружаются пачками
+        по 50 id (в workers потоков) и добавляются в реестр. Запрашиваются только части part и только поля,
+        которые хранит компактная запись. Объекты, по которым API не вернул данные, в словарь не попадают.
+        """
+        entity_class = cls._entity()
+        item_ids = list(dict.fromkeys(item_ids))
+        found = {}
+        partial = {}
+        missing = []
+        for item_id in item_ids:
+            entity = entity_class.registry.get(item_id)
+            if entity is None or not entity.has_parts(part):
+                missing.append(item_id)
+                if entity is not None:
+                    partial[item_id] = entity
+            else:
+                found[item_id] = entity
+        for item_id, item in cls._fetch_many(missing, part, cls._fields(part), workers).items():
+            entity = entity_class.from_item(item)
+            if item_id in partial:
+                entity = entity_class.from_record(entity.record.merge(partial[item_id].record))
+            entity_class.registry.put(item_id, entity)
+            found[item_id] = entity
+        return {item_id: found[item_id] for item_id in item_ids if item_id in found}
+
+
+class Channel(_RegistryEntity):
     """
     Базовый класс, описывающий YouTube канал
     Attrs:
@@ -71,13 +1751,26 @@ class Channel:
         :type channel_id: str
         :param channel_json: путь к файлу json с информацией о канала
         :type channel_json: str
+        :param keep_raw: сохранять ли полный ответ API (по умолчанию KEEP_RAW)
+        :type keep_raw: bool
+        registry (IdentityMap): общий реестр загруженных каналов
     """
 
-    def __init__(self, channel_id=None, channel_json=None) -> None:
+    __slots__ = ('__channel_id', '__channel_info')
+    KEEP_RAW = False
+    RANKING_KEYS = ('subscriber_count', 'view_count', 'video_count', 'views_per_video')
+    RECORD = ChannelRecord
+    ID_FIELD = 'channel_id'
+    registry = IdentityMap()
+    _pending = weakref.WeakValueDictionary()
+    _pending_lock = threading.Lock()
+
+    def __init__(self, channel_id=None, channel_json=None, channel_info=None, keep_raw=None) -> None:
         """
         Экземпляр класса инициализируется по id канала или по пути к файлу json (для тестирования)
-        Во время создания экземпляра инициализируются атрибуты:
-        - channel_info: информация о канале
+        Если вместе с id передан channel_info (уже полученный ответ API), запрос к API не выполняется.
+        Во время создания экземпляра данные канала извлекаются из ответа API в компактную запись ChannelRecord;
+        полный ответ API сохраняется, только если keep_raw=True. Доступны атрибуты:
         - title: название канала
         - description: описание канала
         - link: ссылка на канал
@@ -85,42 +1778,81 @@ class Channel:
         - video_count: количество видео
         - view_count: количество просмотров
         """
-        if channel_id is not None:
-            self.__channel_info = Youtube.get_channel(channel_id=channel_id)
-        elif channel_json is not None:
-            with open(channel_json, 'r') as file:
-                data = file.read()
-                self.__channel_info = json.loads(data)
-        else:
-            raise Exception('Illegal arguments')
+        keep_raw = self.KEEP_RAW if keep_raw is None else keep_raw
+        if channel_info is None:
+            if channel_id is not None:
+                channel_info = Youtube.get_channel(channel_id=channel_id,
+                                                   fields=None if keep_raw else ChannelRecord.fields_mask())
+            elif channel_json is not None:
+                with open(channel_json, 'r') as file:
+                    data = file.read()
+                    channel_info = json.loads(data)
+            else:
+                raise Exception('Illegal arguments')
 
         self.__channel_id = channel_id
-        self.__title = self.title
-        self.__description = self.description
-        self.__link = self.link
-        self.__subscriber_count = self.subscriber_count
-        self.__video_count = self.video_count
-        self.__view_count = self.view_count
+        items = channel_info.get('items')
+        self._record = ChannelRecord.from_item(items[0]) if items else None
+        self.__channel_info = channel_info if keep_raw else None
 
     def __repr__(self) -> str:
         return f'Channel(channel_id={self.__channel_id})'
 
     def __str__(self) -> str:
-        return f'YouTube-канал: {self.__title}'
+        return f'YouTube-канал: {self.title}'
+
+    @classmethod
+    def from_item(cls, item: dict) -> 'Channel':
+        """Создаёт канал из элемента ответа channels().list без обращения к API"""
+        return cls(channel_id=item.get('id'), channel_info={'items': [item]})
+
+    @classmethod
+    def from_dataset(cls, dataset: 'Dataset', channel_id: str) -> 'Channel':
+        """Создаёт канал по данным из офлайн-набора Dataset"""
+        item = dataset.get('channels', channel_id)
+        return cls(channel_id=channel_id, channel_info={'items': [item] if item is not None else []})
+
+    @classmethod
+    def _blank(cls, channel_id: str) -> 'Channel':
+        channel = cls.__new__(cls)
+        channel.__channel_id = channel_id
+        channel.__channel_info = None
+        return channel
+
+    @classmethod
+    def _from_response(cls, channel_id: str, response: dict) -> 'Channel':
+        return cls(channel_id=channel_id, channel_info=response)
+
+    @classmethod
+    def _fetch_one(cls, channel_id: str, part: str | None, fields: str | None) -> dict:
+        return Youtube.get_channel(channel_id, part, fields)
+
+    @classmethod
+    def _fetch_many(cls, channel_ids: List[str], part: str | None, fields: str | None,
+                    workers: int) -> Dict[str, dict]:
+        return Youtube.get_channels(channel_ids, part, fields, workers)
 
     def __len__(self) -> int | None:
         """Возвращает количество подписчиков"""
-        if self.__subscriber_count is not None:
-            return self.__subscriber_count
+        if self.subscriber_count is not None:
+            return self.subscriber_count
         return 0
 
     def __add__(self, other: 'Channel') -> int | None:
         """Сложение количества подписчиков двух каналов"""
         if not isinstance(other, Channel):
             raise ArithmeticError('Правый операнд должен быть объектом Channel')
-        if self.__subscriber_count is None or other.__subscriber_count is None:
+        if self.subscriber_count is None or other.subscriber_count is None:
             return None
-        return self.__subscriber_count + other.__subscriber_count
+        return self.subscriber_count + other.subscriber_count
+
+    def __lt__(self, other: 'Channel') -> bool | None:
+        """Возвращает True, если количество подписчиков на канале меньше, чем на другом канале"""
+        if not isinstance(other, Channel):
+            raise TypeError('Правый операнд должен быть объектом Channel')
+        if self.subscriber_count is None or other.subscriber_count is None:
+            return None
+        return self.subscriber_count < other.subscriber_count
 
     def __gt__(self, other: 'Channel') -> bool | None:
         """
@@ -129,9 +1861,33 @@ class Channel:
         """
         if not isinstance(other, Channel):
             raise TypeError('Правый операнд должен быть объектом Channel')
-        if self.__subscriber_count is None or other.__subscriber_count is None:
+        if self.subscriber_count is None or other.subscriber_count is None:
             return None
-        return self.__subscriber_count > other.__subscriber_count
+        return self.subscriber_count > other.subscriber_count
+
+    @classmethod
+    def load_many(cls, channel_ids: Iterable[str], part: str | None = None, workers: int = 1) -> List['Channel']:
+        """
+        Возвращает каналы по списку id в порядке списка.
+        Каналы, которых нет в реестре (или которые загружены без частей ответа part),
+        загружаются пачками по 50 id (в workers потоков) и добавляются в реестр.
+        Каналы, по которым API не вернул данные, в список не попадают.
+        """
+        return list(cls.get_many(channel_ids, part, workers).values())
+
+    @staticmethod
+    def rank(channels: Iterable['Channel'], by: str = 'subscriber_count', k: int = 10) -> List['Channel']:
+        """
+        Возвращает k лучших каналов по показателю by в порядке убывания:
+        subscriber_count, view_count, video_count или views_per_video.
+        Выбор выполняется через кучу (heapq.nlargest) за O(N log k); каналы без значения показателя пропускаются.
+        """
+        if by not in Channel.RANKING_KEYS:
+            raise ValueError(f'Неизвестный показатель: {by}')
+        ranked = ((getattr(channel, by), index, channel) for index, channel in enumerate(channels))
+        best = heapq.nlargest(k, (entry for entry in ranked if entry[0] is not None),
+                              key=lambda entry: (entry[0], -entry[1]))
+        return [channel for _, _, channel in best]
 
     @property
     def channel_id(self) -> str | None:
@@ -141,64 +1897,106 @@ class Channel:
     @property
     def title(self) -> str | None:
         """Возвращает название канала"""
-        if self.__channel_info.get('items'):
-            channel_title = self.__channel_info.get('items')[0].get('snippet').get('title')
-            return channel_title
+        record = self._loaded()
+        if record is not None:
+            return record.title
         return None
 
     @property
     def description(self) -> str | None:
         """Возвращает описание канала"""
-        if self.__channel_info.get('items'):
-            channel_description = self.__channel_info.get('items')[0].get('snippet').get('description')
-            return channel_description
+        record = self._loaded()
+        if record is not None:
+            return record.description
         return None
 
     @property
     def link(self) -> str | None:
         """Возвращает ссылку на канал"""
-        if self.__channel_info.get('items'):
-            channel_link = self.__channel_info.get('items')[0].get('snippet').get('customUrl')
-            return channel_link
+        record = self._loaded()
+        if record is not None:
+            return record.link
         return None
 
     @property
     def subscriber_count(self) -> int | None:
         """Возвращает количество подписчиков"""
-        if self.__channel_info.get('items'):
-            channel_subscriber = self.__channel_info.get('items')[0].get('statistics').get('subscriberCount')
-            return int(channel_subscriber)
+        record = self._loaded()
+        if record is not None:
+            return record.subscriber_count
         return None
 
     @property
     def video_count(self) -> int | None:
         """Возвращает количество видео"""
-        if self.__channel_info.get('items'):
-            channel_video = self.__channel_info.get('items')[0].get('statistics').get('videoCount')
-            return int(channel_video)
+        record = self._loaded()
+        if record is not None:
+            return record.video_count
         return None
 
     @property
     def view_count(self) -> int | None:
         """Возвращает количество просмотров"""
-        if self.__channel_info.get('items'):
-            channel_view = self.__channel_info.get('items')[0].get('statistics').get('viewCount')
-            return int(channel_view)
+        record = self._loaded()
+        if record is not None:
+            return record.view_count
+        return None
+
+    @property
+    def views_per_video(self) -> float | None:
+        """Возвращает среднее количество просмотров на одно видео"""
+        if not self.video_count or self.view_count is None:
+            return None
+        return self.view_count / self.video_count
+
+    @property
+    def uploads_playlist_id(self) -> str | None:
+        """Возвращает id плейлиста со всеми загруженными на канал видео"""
+        record = self._loaded()
+        if record is not None and record.uploads_playlist_id is not None:
+            return record.uploads_playlist_id
+        if self.__channel_id is not None:
+            return Youtube.get_uploads_playlist_id(self.__channel_id)
         return None
 
+    def iter_uploads(self, checkpoint: str | None = None) -> Iterator['Video']:
+        """
+        Возвращает все видео канала из плейлиста загрузок, запрашивая данные видео пачками по страницам.
+        Если указан путь к файлу checkpoint, прогресс сохраняется в него, и прерванный обход
+        при следующем вызове продолжается с места остановки (см. UploadsCrawler).
+        """
+        return iter(UploadsCrawler(self.__channel_id, checkpoint, uploads_playlist_id=self.uploads_playlist_id))
+
+    @property
+    def raw(self) -> dict | None:
+        """Возвращает полный ответ API, если он был сохранён (keep_raw=True)"""
+        return self.__channel_info
+
+    def info(self) -> dict:
+        """Возвращает информацию о канале в формате ответа API: полный ответ или восстановленный из записи"""
+        if self.__channel_info is not None:
+            return self.__channel_info
+        record = self._loaded()
+        return {'items': [record.to_item()] if record is not None else []}
+
+    def to_dict(self) -> dict:
+        """Возвращает данные канала в виде словаря для экспорта"""
+        record = self._loaded() or ChannelRecord(self.__channel_id)
+        return {'kind': 'channel', **record.to_dict()}
+
     def print_info(self) -> None:
         """Выводит на экран информацию о канале"""
-        print(self.__channel_info)
+        print(self.info())
 
     def to_json(self) -> None:
         """
         Сохраняет имеющуюся информации по каналу в json-файл
         """
         with open(f'{self.__channel_id}.json', 'w', encoding='utf-8') as file:
-            json.dump(self.__channel_info, file, indent='\t')
+            json.dump(self.info(), file, indent='\t')
 
 
-class Video:
+class Video(_RegistryEntity):
     """
     Базовый класс, описывающий видео на YouTube
     Attrs:
@@ -206,39 +2004,82 @@ class Video:
         :type video_id: str
         :param video_json: путь к файлу json с информацией о видео
         :type video_json: str
+        :param keep_raw: сохранять ли полный ответ API (по умолчанию KEEP_RAW)
+        :type keep_raw: bool
+        registry (IdentityMap): общий реестр загруженных видео
     """
 
-    def __init__(self, video_id=None, video_json=None) -> None:
+    __slots__ = ('__video_id', '__video_info')
+    KEEP_RAW = False
+    RECORD = VideoRecord
+    ID_FIELD = 'video_id'
+    registry = IdentityMap()
+    _pending = weakref.WeakValueDictionary()
+    _pending_lock = threading.Lock()
+
+    def __init__(self, video_id=None, video_json=None, video_info=None, keep_raw=None) -> None:
         """
        Экземпляр класса инициализируется по id видео или по пути к файлу json (для тестирования).
-       Во время создания экземпляра инициализируются атрибуты:
-       - video_info: информация о видео
+       Если вместе с id передан video_info (уже полученный ответ API), запрос к API не выполняется.
+       Во время создания экземпляра данные видео извлекаются из ответа API в компактную запись VideoRecord;
+       полный ответ API сохраняется, только если keep_raw=True. Доступны атрибуты:
        - title: название видео
        - view_count: количество просмотров
        - like_count: количество лайков
        - duration: длительность
        """
-        if video_id is not None:
-            self.__video_info = Youtube.get_video(video_id=video_id)
-        elif video_json is not None:
-            with open(video_json, 'r') as file:
-                data = file.read()
-                self.__video_info = json.loads(data)
-        else:
-            raise Exception('Illegal arguments')
+        keep_raw = self.KEEP_RAW if keep_raw is None else keep_raw
+        if video_info is None:
+            if video_id is not None:
+                video_info = Youtube.get_video(video_id=video_id, fields=None if keep_raw else VideoRecord.fields_mask())
+            elif video_json is not None:
+                with open(video_json, 'r') as file:
+                    data = file.read()
+                    video_info = json.loads(data)
+            else:
+                raise Exception('Illegal arguments')
 
         self.__video_id = video_id
-        self.__title = self.title
-        self.__url = self.url
-        self.__view_count = self.view_count
-        self.__like_count = self.like_count
-        self.__duration = self.duration
+        items = video_info.get('items')
+        self._record = VideoRecord.from_item(items[0]) if items else None
+        self.__video_info = video_info if keep_raw else None
 
     def __repr__(self) -> str:
         return f'Video(video_id={self.__video_id})'
 
     def __str__(self) -> str:
-        return self.__title
+        return self.title
+
+    @classmethod
+    def from_item(cls, item: dict) -> 'Video':
+        """Создаёт видео из элемента ответа videos().list без обращения к API"""
+        return cls(video_id=item.get('id'), video_info={'items': [item]})
+
+    @classmethod
+    def from_dataset(cls, dataset: 'Dataset', video_id: str) -> 'Video':
+        """Создаёт видео по данным из офлайн-набора Dataset"""
+        item = dataset.get('videos', video_id)
+        return cls(video_id=video_id, video_info={'items': [item] if item is not None else []})
+
+    @classmethod
+    def _blank(cls, video_id: str) -> 'Video':
+        video = cls.__new__(cls)
+        video.__video_id = video_id
+        video.__video_info = None
+        return video
+
+    @classmethod
+    def _from_response(cls, video_id: str, response: dict) -> 'Video':
+        return cls(video_id=video_id, video_info=response)
+
+    @classmethod
+    def _fetch_one(cls, video_id: str, part: str | None, fields: str | None) -> dict:
+        return Youtube.get_video(video_id, part, fields)
+
+    @classmethod
+    def _fetch_many(cls, video_ids: List[str], part: str | None, fields: str | None,
+                    workers: int) -> Dict[str, dict]:
+        return Youtube.get_videos(video_ids, part, fields, workers)
 
     @property
     def video_id(self) -> str:
@@ -248,45 +2089,120 @@ class Video:
     @property
     def title(self) -> str | None:
         """Геттер. Возвращает название видео"""
-        if self.__video_info.get('items'):
-            video_title = self.__video_info.get('items')[0].get('snippet').get('localized').get('title')
-            return video_title
+        record = self._loaded()
+        if record is not None:
+            return record.title
         return None
 
     @property
     def url(self) -> str | None:
         """Геттер. Возвращает ссылку на видео"""
-        if self.__video_info.get('items'):
-            video_id = self.__video_info.get('items')[0].get('id')
-            url = f'https://www.youtube.com/watch?v={video_id}'
-            return url
+        record = self._loaded()
+        if record is not None:
+            return f'https://www.youtube.com/watch?v={record.video_id}'
         return None
 
     @property
     def view_count(self) -> int | None:
         """Геттер. Возвращает количество просмотров"""
-        if self.__video_info.get('items'):
-            view_count = self.__video_info.get('items')[0].get('statistics').get('viewCount')
-            return int(view_count)
+        record = self._loaded()
+        if record is not None:
+            return record.view_count
         return None
 
     @property
     def like_count(self) -> int | None:
         """Геттер. Возвращает количество лайков"""
-        if self.__video_info.get('items'):
-            like_count = self.__video_info.get('items')[0].get('statistics').get('likeCount')
-            return int(like_count)
+        record = self._loaded()
+        if record is not None:
+            return record.like_count
         return None
 
     @property
-    def duration(self) -> str | None:
+    def duration(self) -> datetime.timedelta | None:
         """Геттер. Возвращает длительность видео"""
-        if self.__video_info.get('items'):
-            iso_8601_duration = self.__video_info.get('items')[0].get('contentDetails').get('duration')
-            duration = isodate.parse_duration(iso_8601_duration)
-            return duration
+        record = self._loaded()
+        if record is not None and record.duration_seconds is not None:
+            return datetime.timedelta(seconds=record.duration_seconds)
         return None
 
+    @property
+    def raw(self) -> dict | None:
+        """Возвращает полный ответ API, если он был сохранён (keep_raw=True)"""
+        return self.__video_info
+
+    def to_dict(self) -> dict:
+        """Возвращает данные видео в виде словаря для экспорта"""
+        record = self._loaded() or VideoRecord(self.__video_id)
+        return {'kind': 'video', **record.to_dict()}
+
+
+class PlaylistIndex:
+    """
+    Индекс состава плейлистов: для плейлиста хранится словарь {id видео: позиция}, построенный
+    за один постраничный обход плейлиста. Проверка принадлежности видео плейлисту после этого
+    не требует запросов к API. Для канала строится обратный индекс {id видео: [id плейлистов]}
+    по всем плейлистам канала. Индексы хранятся в реестрах IdentityMap и устаревают через ttl секунд.
+    Attrs:
+        :param maxsize: максимальное количество проиндексированных плейлистов
+        :type maxsize: int
+        :param ttl: время актуальности индекса в секундах
+        :type ttl: float
+    """
+
+    def __init__(self, maxsize: int = 1_000, ttl: float = 10 * 60) -> None:
+        self.__playlists = IdentityMap(maxsize=maxsize, ttl=ttl)
+        self.__channels = IdentityMap(maxsize=maxsize, ttl=ttl)
+
+    def is_indexed(self, playlist_id: str) -> bool:
+        """Возвращает True, если для плейлиста есть актуальный индекс"""
+        return playlist_id in self.__playlists
+
+    def positions(self, playlist_id: str) -> Dict[str, int]:
+        """
+        Возвращает словарь {id видео: позиция} для плейлиста, строя индекс при отсутствии.
+        Если видео встречается в плейлисте несколько раз, сохраняется первая позиция.
+        Если список видео загрузить полностью не удалось, вызывается исходная ошибка, а индекс не сохраняется.
+        """
+        positions = self.__playlists.get(playlist_id)
+        if positions is None:
+            video_ids = Youtube.get_playlist_video_ids(playlist_id)
+            if not video_ids.complete:
+                raise video_ids.error
+            positions = {}
+            for position, video_id in enumerate(video_ids):
+                positions.setdefault(video_id, position)
+            self.__playlists.put(playlist_id, positions)
+        return positions
+
+    def contains(self, playlist_id: str, video_id: str) -> bool:
+        """Возвращает True, если видео есть в плейлисте"""
+        return video_id in self.positions(playlist_id)
+
+    def position(self, playlist_id: str, video_id: str) -> int | None:
+        """Возвращает позицию видео в плейлисте или None, если его там нет"""
+        return self.positions(playlist_id).get(video_id)
+
+    def video_playlists(self, channel_id: str) -> Dict[str, List[str]]:
+        """Возвращает обратный индекс {id видео: [id плейлистов]} по всем плейлистам канала"""
+        reverse = self.__channels.get(channel_id)
+        if reverse is None:
+            reverse = {}
+            for playlist_id in Youtube.get_channel_playlist_ids(channel_id):
+                for video_id in self.positions(playlist_id):
+                    reverse.setdefault(video_id, []).append(playlist_id)
+            self.__channels.put(channel_id, reverse)
+        return reverse
+
+    def playlists_of(self, video_id: str, channel_id: str) -> List[str]:
+        """Возвращает id плейлистов канала, в которых есть видео"""
+        return list(self.video_playlists(channel_id).get(video_id, []))
+
+    def invalidate(self, playlist_id: str | None = None) -> None:
+        """Удаляет индекс плейлиста (или все индексы) и обратные индексы каналов"""
+        self.__playlists.invalidate(playlist_id)
+        self.__channels.invalidate()
+
 
 class PLVideo(Video):
     """
@@ -301,40 +2217,503 @@ class PLVideo(Video):
         :type playlist_id: str
         :param playlist_json: путь к файлу json с информацией о плейлисте
         :type playlist_json: str
+        index (PlaylistIndex): общий индекс состава плейлистов
     """
 
+    __slots__ = ('__playlist_id',)
+    index = PlaylistIndex()
+
     def __init__(self, video_id=None, video_json=None, playlist_id=None, playlist_json=None) -> None:
         """
         Экземпляр класса инициализируется по id видео и плейлиста или по пути к файлам json (для тестирования)
         Во время создания экземпляра инициализируются атрибуты:
-        - playlist_info: информация о плейлисте
-        - video_info: информация о видео
         - title: название видео
         - view_count: количество просмотров
         - like_count: количество лайков
         - id_playlist: если указанное видео есть в указанном плейлисте, то в этот
         атрибут будет записано id плейлиста
+        Если для плейлиста уже построен индекс PLVideo.index, принадлежность проверяется по нему без запроса к API.
+        Для проверки многих видео используйте load_many.
         """
         super().__init__(video_id, video_json)
+        if playlist_id is not None and video_id is not None and PLVideo.index.is_indexed(playlist_id):
+            self.__playlist_id = playlist_id if PLVideo.index.contains(playlist_id, video_id) else None
+            return
         if playlist_id is not None and video_id is not None:
-            self.__playlist_info = Youtube.get_video_in_playlist(video_id=video_id, playlist_id=playlist_id)
+            playlist_info = Youtube.get_video_in_playlist(video_id=video_id, playlist_id=playlist_id)
         elif playlist_json is not None and video_json is not None:
             with open(playlist_json, 'r') as file:
                 data = file.read()
-                self.__playlist_info = json.loads(data)
+                playlist_info = json.loads(data)
         else:
             raise Exception('Illegal arguments')
 
-        self.__id_playlist = self.id_playlist
+        items = playlist_info.get('items')
+        self.__playlist_id = items[0].get('snippet').get('playlistId') if items else None
+
+    @classmethod
+    def load_many(cls, pairs: Iterable[tuple], workers: int = 1) -> List['PLVideo']:
+        """
+        Возвращает видео в плейлистах по парам (id видео, id плейлиста) в порядке пар.
+        Каждый плейлист обходится один раз для построения индекса PLVideo.index, данные видео
+        загружаются пачками через Video.get_many, поэтому количество запросов не зависит от количества пар.
+        """
+        pairs = list(pairs)
+        for playlist_id in dict.fromkeys(playlist_id for _, playlist_id in pairs):
+            PLVideo.index.positions(playlist_id)
+        videos = Video.get_many((video_id for video_id, _ in pairs), workers=workers)
+        result = []
+        for video_id, playlist_id in pairs:
+            if video_id in videos and videos[video_id].record is not None:
+                video = cls.from_record(videos[video_id].record)
+            else:
+                video = cls.__new__(cls)
+                Video.__init__(video, video_id=video_id, video_info={'items': []})
+            video.__playlist_id = playlist_id if PLVideo.index.contains(playlist_id, video_id) else None
+            result.append(video)
+        return result
 
     @property
     def id_playlist(self) -> str:
-        if self.__playlist_info['items']:
-            id_playlist = self.__playlist_info.get('items')[0].get('snippet').get('playlistId')
-            return id_playlist
+        if self.__playlist_id is not None:
+            return self.__playlist_id
         return f'Видео "{self.title}" нет в указанном плейлисте'
 
 
+class UploadsCrawler:
+    """
+    Обход всех видео канала через плейлист загрузок (contentDetails.relatedPlaylists.uploads)
+    с сохранением контрольных точек.
+    В файл контрольной точки записываются токен текущей страницы плейлиста и id последнего отданного видео.
+    Точка сохраняется после каждой страницы и при прерывании обхода (исключение, break, закрытие генератора),
+    поэтому повторный запуск запрашивает заново не больше одной страницы.
+    Attrs:
+        :param channel_id: id канала
+        :type channel_id: str
+        :param checkpoint: путь к файлу контрольной точки (None - без сохранения прогресса)
+        :type checkpoint: str
+        :param uploads_playlist_id: id плейлиста загрузок, если он уже известен
+        :type uploads_playlist_id: str
+    """
+
+    def __init__(self, channel_id: str, checkpoint: str | None = None, uploads_playlist_id: str | None = None) -> None:
+        self.channel_id = channel_id
+        self.checkpoint = checkpoint
+        self.state = self.load_checkpoint() or {
+            'channel_id': channel_id,
+            'playlist_id': uploads_playlist_id,
+            'page_token': None,
+            'last_video_id': None,
+            'videos_done': 0,
+            'finished': False,
+        }
+
+    def load_checkpoint(self) -> dict | None:
+        """Возвращает сохранённое состояние обхода этого канала или None"""
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return None
+        with open(self.checkpoint, 'r', encoding='utf-8') as file:
+            state = json.loads(file.read())
+        if state.get('channel_id') != self.channel_id:
+            return None
+        return state
+
+    def save_checkpoint(self) -> None:
+        """Атомарно записывает текущее состояние обхода в файл контрольной точки"""
+        if self.checkpoint is None:
+            return
+        temporary_path = f'{self.checkpoint}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump(self.state, file, ensure_ascii=False)
+        os.replace(temporary_path, self.checkpoint)
+
+    def __iter__(self) -> Iterator['Video']:
+        state = self.state
+        if state['finished']:
+            return
+        if state['playlist_id'] is None:
+            state['playlist_id'] = Youtube.get_uploads_playlist_id(self.channel_id)
+            if state['playlist_id'] is None:
+                return
+        try:
+            for page in Youtube.iter_playlist_items(state['playlist_id'], page_token=state['page_token'],
+                                                    fields=Youtube.PLAYLIST_ITEM_IDS_FIELDS):
+                video_ids = [Youtube.playlist_item_video_id(item) for item in page['items']]
+                if state['last_video_id'] in video_ids:
+                    video_ids = video_ids[video_ids.index(state['last_video_id']) + 1:]
+                videos = Video.get_many(video_ids)
+                for video_id in video_ids:
+                    state['last_video_id'] = video_id
+                    state['videos_done'] += 1
+                    if video_id in videos:
+                        yield videos[video_id]
+                state['page_token'] = page.get('nextPageToken')
+                state['last_video_id'] = None
+                self.save_checkpoint()
+            state['finished'] = True
+        finally:
+            self.save_checkpoint()
+
+
+class SyncResult(NamedTuple):
+    """Результат инкрементальной синхронизации плейлиста"""
+    playlist_id: str
+    changed: bool
+    added: List[str]
+    removed: List[str]
+    refreshed: List[str]
+    complete: bool = True
+
+
+class PlaylistSync:
+    """
+    Инкрементальная синхронизация плейлистов и каналов с сохранёнными снимками.
+    Для каждого плейлиста в каталоге store_dir хранится снимок: ETag и itemCount плейлиста,
+    список id видео и последние известные данные каждого видео.
+    При синхронизации:
+    - плейлист запрашивается условно по ETag; если он не изменился (304 или совпали ETag и itemCount),
+      список элементов не загружается;
+    - иначе загружается список id видео, и полные данные запрашиваются только для новых видео;
+    - статистика обновляется для «горячих» видео, опубликованных не раньше hot_days дней назад.
+    Attrs:
+        :param store_dir: каталог со снимками
+        :type store_dir: str
+        :param hot_days: возраст видео в днях, до которого его статистика обновляется при каждой синхронизации
+        :type hot_days: float
+    """
+
+    def __init__(self, store_dir: str, hot_days: float = 7) -> None:
+        self.store_dir = store_dir
+        self.hot_days = hot_days
+        os.makedirs(store_dir, exist_ok=True)
+
+    def snapshot_path(self, name: str) -> str:
+        """Возвращает путь к файлу снимка"""
+        return os.path.join(self.store_dir, f'{name}.json')
+
+    def load_snapshot(self, name: str) -> dict | None:
+        """Возвращает сохранённый снимок или None"""
+        path = self.snapshot_path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.loads(file.read())
+
+    def save_snapshot(self, name: str, snapshot: dict) -> None:
+        """Атомарно сохраняет снимок"""
+        path = self.snapshot_path(name)
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+            json.dump(snapshot, file, ensure_ascii=False)
+        os.replace(f'{path}.tmp', path)
+
+    def is_hot(self, record: dict, now: datetime.datetime) -> bool:
+        """Возвращает True, если статистику видео нужно обновить при синхронизации"""
+        if not record.get('published_at'):
+            return False
+        published_at = datetime.datetime.fromisoformat(record['published_at'].replace('Z', '+00:00'))
+        return now - published_at <= datetime.timedelta(days=self.hot_days)
+
+    def videos(self, playlist_id: str) -> List[VideoRecord]:
+        """Возвращает сохранённые записи видео плейлиста в порядке следования в плейлисте"""
+        snapshot = self.load_snapshot(playlist_id) or {'video_ids': [], 'videos': {}}
+        return [VideoRecord.from_dict(snapshot['videos'][video_id])
+                for video_id in snapshot['video_ids'] if video_id in snapshot['videos']]
+
+    def sync(self, playlist_id: str) -> SyncResult:
+        """Синхронизирует снимок плейлиста с API и возвращает список изменений"""
+        snapshot = self.load_snapshot(playlist_id) or {
+            'playlist_id': playlist_id, 'etag': None, 'item_count': None, 'video_ids': [], 'videos': {},
+        }
+        videos = snapshot['videos']
+        added, removed = [], []
+        changed = False
+        complete = True
+
+        playlist = Youtube.get_playlist_if_changed(playlist_id, snapshot['etag'])
+        if playlist is not None:
+            item = playlist['items'][0] if playlist.get('items') else {}
+            item_count = item.get('contentDetails', {}).get('itemCount')
+            changed = playlist.get('etag') != snapshot['etag'] or item_count != snapshot['item_count']
+            if changed:
+                # плейлист изменился, поэтому страницы списка элементов в кэше могут быть устаревшими
+                with Youtube.revalidating():
+                    video_ids = Youtube.get_playlist_video_ids(playlist_id)
+                complete = video_ids.complete
+                if complete:
+                    current = set(video_ids)
+                    added = [video_id for video_id in dict.fromkeys(video_ids) if video_id not in videos]
+                    removed = [video_id for video_id in snapshot['video_ids'] if video_id not in current]
+                    snapshot.update(etag=playlist.get('etag'), item_count=item_count, video_ids=list(video_ids))
+                    for video_id in removed:
+                        videos.pop(video_id, None)
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        hot = [video_id for video_id in snapshot['video_ids']
+               if video_id in videos and video_id not in added and self.is_hot(videos[video_id], now)]
+        fetched_at = now.isoformat()
+        for video_id, api_item in Youtube.get_videos(added, fields=VideoRecord.fields_mask()).items():
+            videos[video_id] = dict(VideoRecord.from_item(api_item).to_dict(), fetched_at=fetched_at)
+        # у «горячих» видео меняется только статистика, остальные поля берутся из снимка
+        for video_id, api_item in Youtube.get_videos(hot, part='statistics',
+                                                     fields=VideoRecord.fields_mask('statistics')).items():
+            record = VideoRecord.from_item(api_item).merge(VideoRecord.from_dict(videos[video_id]))
+            videos[video_id] = dict(record.to_dict(), fetched_at=fetched_at)
+        snapshot['synced_at'] = fetched_at
+        self.save_snapshot(playlist_id, snapshot)
+        return SyncResult(playlist_id, changed, added, removed, hot, complete)
+
+    def sync_channel(self, channel_id: str) -> SyncResult:
+        """
+        Синхронизирует канал: сохраняет текущую статистику канала
+        и инкрементально синхронизирует его плейлист загрузок.
+        """
+        channel = Channel(channel_id=channel_id)
+        snapshot = dict(channel.record.to_dict() if channel.record else {'channel_id': channel_id},
+                        fetched_at=datetime.datetime.now(datetime.timezone.utc).isoformat())
+        self.save_snapshot(f'channel-{channel_id}', snapshot)
+        if channel.uploads_playlist_id is None:
+            raise Exception(f'Не найден плейлист загрузок канала {channel_id}')
+        return self.sync(channel.uploads_playlist_id)
+
+
+class StatsStore:
+    """
+    Хранилище истории статистики каналов и видео, в которое данные только дописываются.
+    Для каждого канала и видео ведётся отдельный файл из записей фиксированной длины
+    (CHANNEL_DTYPE или VIDEO_DTYPE); файлы читаются через отображение в память (numpy.memmap).
+    Записи в файле идут по возрастанию времени, поэтому выборка за период - это бинарный поиск.
+    Отсутствующие значения (например, скрытое количество подписчиков) хранятся как -1.
+    Attrs:
+        :param root: каталог хранилища
+        :type root: str
+    """
+
+    CHANNEL_DTYPE = _ClassConstant(lambda: np.dtype([
+        ('timestamp', '<i8'), ('subscriber_count', '<i8'), ('view_count', '<i8'), ('video_count', '<i8'),
+    ]))
+    VIDEO_DTYPE = _ClassConstant(lambda: np.dtype([
+        ('timestamp', '<i8'), ('view_count', '<i8'), ('like_count', '<i8'), ('comment_count', '<i8'),
+    ]))
+    KINDS = _ClassConstant(lambda: {'channels': StatsStore.CHANNEL_DTYPE, 'videos': StatsStore.VIDEO_DTYPE})
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        for kind in self.KINDS:
+            os.makedirs(os.path.join(root, kind), exist_ok=True)
+
+    def path(self, kind: str, entity_id: str) -> str:
+        """Возвращает путь к файлу истории канала (kind='channels') или видео (kind='videos')"""
+        return os.path.join(self.root, kind, f'{entity_id}.bin')
+
+    def append(self, kind: str, entity_id: str, values: dict, timestamp: int | None = None) -> None:
+        """
+        Дописывает запись в историю сущности. Время записи не может быть меньше времени последней записи.
+        """
+        dtype = self.KINDS[kind]
+        timestamp = int(time.time()) if timestamp is None else int(timestamp)
+        record = np.zeros(1, dtype=dtype)
+        record['timestamp'] = timestamp
+        for name in dtype.names[1:]:
+            value = values.get(name)
+            record[name] = -1 if value is None else value
+        path = self.path(kind, entity_id)
+        with open(path, 'ab+') as file:
+            if file.tell() >= dtype.itemsize:
+                file.seek(-dtype.itemsize, os.SEEK_END)
+                last = np.frombuffer(file.read(dtype.itemsize), dtype=dtype)
+                if last['timestamp'][0] > timestamp:
+                    raise Exception(f'Время записи {timestamp} меньше времени последней записи в {path}')
+            file.write(record.tobytes())
+
+    def append_channel(self, channel: 'Channel', timestamp: int | None = None) -> None:
+        """Дописывает текущую статистику канала"""
+        self.append('channels', channel.channel_id, {
+            'subscriber_count': channel.subscriber_count,
+            'view_count': channel.view_count,
+            'video_count': channel.video_count,
+        }, timestamp)
+
+    def append_video(self, video: 'Video', timestamp: int | None = None) -> None:
+        """Дописывает текущую статистику видео"""
+        record = video.record
+        self.append('videos', video.video_id, {
+            'view_count': video.view_count,
+            'like_count': video.like_count,
+            'comment_count': record.comment_count if record is not None else None,
+        }, timestamp)
+
+    def read(self, kind: str, entity_id: str, start: int | None = None, end: int | None = None) -> np.ndarray:
+        """Возвращает записи истории сущности с временем в промежутке [start, end]"""
+        dtype = self.KINDS[kind]
+        path = self.path(kind, entity_id)
+        if not os.path.exists(path) or os.path.getsize(path) < dtype.itemsize:
+            return np.zeros(0, dtype=dtype)
+        records = np.memmap(path, dtype=dtype, mode='r')
+        timestamps = records['timestamp']
+        first = 0 if start is None else np.searchsorted(timestamps, start, side='left')
+        last = len(records) if end is None else np.searchsorted(timestamps, end, side='right')
+        return np.array(records[first:last])
+
+    def known(self, kind: str, entity_id: str, field: str, start: int | None = None,
+              end: int | None = None) -> np.ndarray:
+        """Возвращает записи за период, в которых значение поля известно (не -1)"""
+        records = self.read(kind, entity_id, start, end)
+        return records[records[field] != -1]
+
+    def deltas(self, kind: str, entity_id: str, field: str, start: int | None = None,
+               end: int | None = None) -> np.ndarray:
+        """Возвращает приращения поля между соседними записями за период; записи без значения пропускаются"""
+        return np.diff(self.known(kind, entity_id, field, start, end)[field])
+
+    def growth(self, kind: str, entity_id: str, field: str, start: int | None = None,
+               end: int | None = None) -> dict | None:
+        """
+        Возвращает рост поля за период: первое и последнее известные значения, изменение и изменение в сутки.
+        Если записей с известным значением меньше двух, возвращает None.
+        """
+        records = self.known(kind, entity_id, field, start, end)
+        if len(records) < 2:
+            return None
+        first, last = records[0], records[-1]
+        delta = int(last[field] - first[field])
+        days = (int(last['timestamp']) - int(first['timestamp'])) / (24 * 60 * 60)
+        return {
+            'start': int(first[field]),
+            'end': int(last[field]),
+            'delta': delta,
+            'per_day': delta / days if days else None,
+        }
+
+
+class VideoTable:
+    """
+    Колоночная таблица видео: id, id канала, просмотры, лайки, комментарии и длительность в секундах
+    хранятся в массивах NumPy, поэтому суммы, выбор лучших, перцентили и группировки считаются
+    векторно, без цикла по объектам Video. Отсутствующие в ответе API значения хранятся как 0.
+    Attrs:
+        COLUMNS (tuple): числовые столбцы таблицы
+    """
+
+    COLUMNS = ('view_count', 'like_count', 'comment_count', 'duration_seconds')
+
+    def __init__(self, video_ids: Iterable[str], channel_ids: Iterable[str], view_count: Iterable[int],
+                 like_count: Iterable[int], comment_count: Iterable[int], duration_seconds: Iterable[int]) -> None:
+        self.video_ids = np.asarray(video_ids, dtype=object)
+        self.channel_ids = np.asarray(channel_ids, dtype=object)
+        self.view_count = np.asarray(view_count, dtype=np.int64)
+        self.like_count = np.asarray(like_count, dtype=np.int64)
+        self.comment_count = np.asarray(comment_count, dtype=np.int64)
+        self.duration_seconds = np.asarray(duration_seconds, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.video_ids)
+
+    def __repr__(self) -> str:
+        return f'VideoTable(rows={len(self)})'
+
+    @classmethod
+    def from_records(cls, records: Iterable[VideoRecord]) -> 'VideoTable':
+        """Создаёт таблицу из записей VideoRecord"""
+        records = list(records)
+        return cls(
+            [record.video_id for record in records],
+            [record.channel_id for record in records],
+            [record.view_count or 0 for record in records],
+            [record.like_count or 0 for record in records],
+            [record.comment_count or 0 for record in records],
+            [record.duration_seconds or 0 for record in records],
+        )
+
+    @classmethod
+    def from_items(cls, items: Iterable[dict]) -> 'VideoTable':
+        """
+        Создаёт таблицу из элементов ответа videos().list без создания объектов Video.
+        Длительности всего столбца разбираются одним вызовом parse_durations.
+        """
+        items = list(items)
+        statistics = [item.get('statistics', {}) for item in items]
+        return cls(
+            [item.get('id') for item in items],
+            [item.get('snippet', {}).get('channelId') for item in items],
+            [int(stats.get('viewCount') or 0) for stats in statistics],
+            [int(stats.get('likeCount') or 0) for stats in statistics],
+            [int(stats.get('commentCount') or 0) for stats in statistics],
+            parse_durations(item.get('contentDetails', {}).get('duration') for item in items),
+        )
+
+    @classmethod
+    def from_videos(cls, videos: Iterable[Video]) -> 'VideoTable':
+        """Создаёт таблицу из объектов Video"""
+        return cls.from_records(video.record for video in videos if video.record is not None)
+
+    @classmethod
+    def from_ids(cls, video_ids: Iterable[str], part: str | None = None) -> 'VideoTable':
+        """
+        Создаёт таблицу по списку id видео; данные загружаются пачками через Video.get_many.
+        Если задан part, запрашиваются только эти части ответа API, остальные столбцы могут остаться нулевыми.
+        """
+        video_ids = list(video_ids)
+        videos = Video.get_many(video_ids, part)
+        return cls.from_videos(videos[video_id] for video_id in video_ids if video_id in videos)
+
+    @classmethod
+    def from_playlist(cls, playlist: 'PlayList') -> 'VideoTable':
+        """Создаёт таблицу из видео плейлиста"""
+        return playlist.video_table()
+
+    def column(self, name: str) -> np.ndarray:
+        """Возвращает числовой столбец по названию"""
+        if name not in self.COLUMNS:
+            raise ValueError(f'Неизвестный столбец: {name}')
+        return getattr(self, name)
+
+    def take(self, indices: np.ndarray) -> 'VideoTable':
+        """Возвращает таблицу из строк с указанными индексами"""
+        return VideoTable(*(getattr(self, name)[indices] for name in ('video_ids', 'channel_ids') + self.COLUMNS))
+
+    def filter(self, mask: np.ndarray) -> 'VideoTable':
+        """Возвращает таблицу из строк, для которых mask истинна (например, table.view_count > 1000)"""
+        return self.take(np.flatnonzero(mask))
+
+    def sum(self, name: str) -> int:
+        """Возвращает сумму значений столбца"""
+        return int(self.column(name).sum())
+
+    def top_k(self, name: str, k: int) -> 'VideoTable':
+        """Возвращает k строк с наибольшими значениями столбца в порядке убывания"""
+        values = self.column(name)
+        k = min(k, len(values))
+        if k == 0:
+            return self.take(np.arange(0))
+        # argpartition выбирает среди равных k-му значению произвольные строки, поэтому из них
+        # берутся стоящие в таблице раньше; при равенстве значений выше оказывается более ранняя строка
+        threshold = values[np.argpartition(-values, k - 1)[k - 1]]
+        greater = np.flatnonzero(values > threshold)
+        indices = np.concatenate((greater, np.flatnonzero(values == threshold)[:k - len(greater)]))
+        indices = indices[np.lexsort((indices, -values[indices]))]
+        return self.take(indices)
+
+    def percentile(self, name: str, q: float | Iterable[float]) -> float | np.ndarray:
+        """Возвращает перцентиль (или несколько перцентилей) значений столбца"""
+        return np.percentile(self.column(name), q)
+
+    def ratio(self, numerator: str, denominator: str) -> np.ndarray:
+        """Возвращает поэлементное отношение столбцов, например лайков к просмотрам (0 при нулевом знаменателе)"""
+        top = self.column(numerator).astype(np.float64)
+        bottom = self.column(denominator).astype(np.float64)
+        return np.divide(top, bottom, out=np.zeros_like(top), where=bottom != 0)
+
+    def histogram(self, name: str, bins: int | Iterable[float] = 10) -> tuple:
+        """Возвращает гистограмму значений столбца: количества и границы интервалов"""
+        return np.histogram(self.column(name), bins=bins)
+
+    def group_by_channel(self, name: str) -> Dict[str, int]:
+        """Возвращает сумму значений столбца по каналам в виде словаря {id канала: сумма}"""
+        channels, inverse = np.unique(self.channel_ids.astype(str), return_inverse=True)
+        sums = np.bincount(inverse, weights=self.column(name), minlength=len(channels))
+        return {channel: int(total) for channel, total in zip(channels, sums)}
+
+
 class PlayList:
     """
     Базовый класс, описывающий плейлист на YouTube
@@ -343,38 +2722,104 @@ class PlayList:
         :type playlist_id: str
         :param playlist_json: путь к файлу json с информацией о плейлисте
         :type playlist_json: str
+        registry (IdentityMap): общий реестр загруженных плейлистов
     """
 
-    def __init__(self, playlist_id=None, playlist_json=None) -> None:
+    registry = IdentityMap(maxsize=1_000)
+    # маска частичного ответа с полями, которые использует PlayList
+    INFO_FIELDS = 'etag,items(id,snippet/title)'
+    _pending = weakref.WeakValueDictionary()
+    _pending_lock = threading.Lock()
+
+    def __init__(self, playlist_id=None, playlist_json=None, playlist_info=None, video_ids=None) -> None:
         """
         Экземпляр класса инициализируется по id плейлиста или по пути к файлу json (для тестирования)
+        Если вместе с id переданы playlist_info (уже полученный ответ API) и video_ids,
+        запросы к API не выполняются.
         Во время создания экземпляра инициализируются атрибуты:
         - playlist_info: информация о плейлисте
         - title: название плейлиста
         - url: ссылка на плейлист
-        - video_ids: список id видео в плейлисте
+        Список id видео (video_ids) загружается при первом обращении к нему;
+        для постраничной обработки без загрузки всего списка есть iter_video_ids и iter_videos.
         """
 
-        if playlist_id is not None:
-            self.__playlist_info = Youtube.get_playlist(playlist_id=playlist_id)
-            self.__video_ids = Youtube.get_playlist_video_ids(playlist_id=playlist_id)
+        if playlist_info is not None:
+            self.__playlist_info = playlist_info
+        elif playlist_id is not None:
+            self.__playlist_info = Youtube.get_playlist(playlist_id=playlist_id, part='snippet',
+                                                        fields=self.INFO_FIELDS)
         elif playlist_json is not None:
             with open(playlist_json, 'r') as file:
                 data = file.read()
                 self.__playlist_info = json.loads(data)
-                self.__video_ids = None
         else:
             raise Exception('Illegal arguments')
-
+        self.__video_ids = video_ids
         self.__playlist_id = playlist_id
-        self.__title = self.title
-        self.__url = self.url
 
     def __repr__(self) -> str:
         return f'PlayList(playlist_id={self.__playlist_id})'
 
     def __str__(self) -> str:
-        return f'YouTube-плейлист: {self.__title}'
+        return f'YouTube-плейлист: {self.title}'
+
+    @classmethod
+    def get(cls, playlist_id: str) -> 'PlayList':
+        """Возвращает плейлист из реестра загруженных плейлистов, загружая его при отсутствии или устаревании"""
+        playlist = PlayList.registry.get(playlist_id)
+        if playlist is None:
+            playlist = PlayList(playlist_id=playlist_id)
+            PlayList.registry.put(playlist_id, playlist)
+        return playlist
+
+    @classmethod
+    def lazy(cls, playlist_id: str) -> 'PlayList':
+        """
+        Возвращает плейлист без обращения к API: данные загружаются при первом обращении к атрибутам.
+        Данные всех ожидающих загрузки плейлистов, созданных lazy, запрашиваются вместе пачками по 50 id.
+        Если плейлист уже есть в реестре или уже ожидает загрузки, возвращается он. Ожидающие плейлисты
+        хранятся по слабым ссылкам: плейлист, на который больше никто не ссылается, не загружается.
+        """
+        playlist = PlayList.registry.get(playlist_id, count=False)
+        if playlist is not None:
+            return playlist
+        with PlayList._pending_lock:
+            playlist = PlayList._pending.get(playlist_id)
+            if playlist is None:
+                playlist = cls.__new__(cls)
+                playlist.__playlist_id = playlist_id
+                playlist.__playlist_info = None
+                playlist.__video_ids = None
+                PlayList._pending[playlist_id] = playlist
+        return playlist
+
+    @classmethod
+    def load_pending(cls) -> None:
+        """Загружает данные всех ожидающих загрузки плейлистов, созданных методом lazy"""
+        with PlayList._pending_lock:
+            pending = dict(PlayList._pending)
+            PlayList._pending.clear()
+        if not pending:
+            return
+        items = Youtube.get_playlists(pending, part='snippet', fields=cls.INFO_FIELDS)
+        for playlist_id, playlist in pending.items():
+            playlist.__playlist_info = {'items': [items[playlist_id]] if playlist_id in items else []}
+
+    @property
+    def is_loaded(self) -> bool:
+        """Возвращает False, если данные плейлиста, созданного lazy, ещё не загружены"""
+        return self.__playlist_info is not None
+
+    def __info(self) -> dict:
+        """Возвращает данные плейлиста, загружая данные ленивого плейлиста при первом обращении"""
+        if self.__playlist_info is None:
+            PlayList.load_pending()
+            if self.__playlist_info is None:
+                # плейлист загружается в другом потоке или пакетная загрузка завершилась ошибкой
+                self.__playlist_info = Youtube.get_playlist(self.__playlist_id, part='snippet',
+                                                            fields=self.INFO_FIELDS)
+        return self.__playlist_info
 
     @property
     def playlist_id(self):
@@ -384,46 +2829,743 @@ class PlayList:
     @property
     def title(self) -> str | None:
         """Геттер. Возвращает название плейлиста"""
-        if self.__playlist_info.get('items'):
-            playlist_title = self.__playlist_info.get('items')[0].get('snippet').get('title')
+        if self.__info().get('items'):
+            playlist_title = self.__info().get('items')[0].get('snippet').get('title')
             return playlist_title
         return None
 
     @property
     def url(self) -> str | None:
         """Геттер. Возвращает ссылку на плейлист"""
-        if self.__playlist_info.get('items'):
+        if self.__info().get('items'):
             url = f'https://www.youtube.com/playlist?list={self.__playlist_id}'
             return url
         return None
 
+    @property
+    def video_ids(self) -> List[str]:
+        """Возвращает список id видео в плейлисте, загружая его при первом обращении"""
+        if self.__video_ids is None:
+            if self.__playlist_id is None:
+                return []
+            self.__video_ids = Youtube.get_playlist_video_ids(playlist_id=self.__playlist_id)
+        return self.__video_ids
+
+    @property
+    def is_complete(self) -> bool:
+        """Возвращает False, если список видео плейлиста загружен не полностью"""
+        return getattr(self.video_ids, 'complete', True)
+
+    def iter_video_ids(self) -> Iterator[List[str]]:
+        """
+        Постранично возвращает id видео плейлиста (до 50 id на страницу).
+        Если список id ещё не загружен, страницы запрашиваются из API по мере перебора и не сохраняются.
+        """
+        if self.__video_ids is not None or self.__playlist_id is None:
+            video_ids = self.video_ids
+            for start in range(0, len(video_ids), Youtube.MAX_IDS_PER_REQUEST):
+                yield video_ids[start:start + Youtube.MAX_IDS_PER_REQUEST]
+            return
+        for page in Youtube.iter_playlist_items(self.__playlist_id, fields=Youtube.PLAYLIST_ITEM_IDS_FIELDS):
+            yield [Youtube.playlist_item_video_id(item) for item in page['items']]
+
+    def iter_videos(self) -> Iterator[Video]:
+        """
+        Возвращает видео плейлиста по одному в порядке следования в плейлисте.
+        Данные видео запрашиваются одним пакетным запросом на каждую страницу плейлиста,
+        поэтому перебор можно прервать, не загружая оставшиеся страницы.
+        """
+        done = 0
+        for video_ids in self.iter_video_ids():
+            videos = Video.get_many(video_ids)
+            done += len(video_ids)
+            if Youtube.metrics is not None:
+                Youtube.metrics.progress(f'playlist:{self.__playlist_id}:iter_videos', done)
+            for video_id in video_ids:
+                if video_id in videos:
+                    yield videos[video_id]
+
     @property
     def total_duration(self) -> datetime.timedelta:
         """
         Возвращает суммарную длительность плейлиста.
         """
         print('Подсчитываю длительность...')
-        total_duration = datetime.timedelta(seconds=0)
-        for video_id in self.__video_ids:
-            print('.', end='')
-            duration = Video(video_id=video_id).duration
-            total_duration += duration
-        print('\n')
-        return total_duration
+        with Youtube.track_progress(f'playlist:{self.__playlist_id}:total_duration'):
+            table = self.video_table(part='contentDetails')
+        return datetime.timedelta(seconds=table.sum('duration_seconds'))
 
-    def show_best_video(self) -> str:
+    def show_best_video(self) -> str | None:
         """
         Возвращает ссылку на самое популярное видео в плейлисте.
         """
         print('Выбираю лучшее видео...')
-        max_like_amount = 0
-        best_video_url = None
-        for video_id in self.__video_ids:
-            print('.', end='')
-            video = Video(video_id=video_id)
-            like_count = video.like_count
-            if max_like_amount < like_count:
-                max_like_amount = like_count
-                best_video_url = video.url
-        print('\n')
-        return best_video_url
+        with Youtube.track_progress(f'playlist:{self.__playlist_id}:show_best_video'):
+            best = self.video_table(part='statistics').top_k('like_count', 1)
+        if len(best) == 0 or best.like_count[0] <= 0:
+            return None
+        return f'https://www.youtube.com/watch?v={best.video_ids[0]}'
+
+    def to_dict(self) -> dict:
+        """
+        Возвращает данные плейлиста в виде словаря для экспорта.
+        Список id видео включается, только если он уже загружен.
+        """
+        return {'kind': 'playlist', 'playlist_id': self.__playlist_id, 'title': self.title,
+                'video_ids': None if self.__video_ids is None else list(self.__video_ids)}
+
+    @classmethod
+    def from_dataset(cls, dataset: 'Dataset', playlist_id: str) -> 'PlayList':
+        """Создаёт плейлист по данным из офлайн-набора Dataset"""
+        item = dataset.get('playlists', playlist_id)
+        video_ids = [Youtube.playlist_item_video_id(item) for item in dataset.playlist_items(playlist_id)]
+        return cls(playlist_id=playlist_id, playlist_info={'items': [item] if item is not None else []},
+                   video_ids=video_ids)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'PlayList':
+        """Создаёт плейлист из словаря, полученного методом to_dict, без обращения к API"""
+        playlist_info = {'items': [{'id': data['playlist_id'], 'snippet': {'title': data['title']}}]}
+        return cls(playlist_id=data['playlist_id'], playlist_info=playlist_info, video_ids=data.get('video_ids'))
+
+    def video_table(self, part: str | None = None) -> VideoTable:
+        """
+        Возвращает таблицу видео плейлиста в порядке следования в плейлисте.
+        Видео берутся из реестра Video.registry, недостающие запрашиваются пачками;
+        part ограничивает запрашиваемые части ответа API.
+        Для ненайденного плейлиста таблица пуста. Если загрузка списка видео остановилась на другой ошибке
+        (например, quotaExceeded), вызывается эта ошибка, чтобы итоги не считались по части плейлиста.
+        """
+        video_ids = self.video_ids
+        if not self.is_complete and (video_ids or RetryPolicy.error_status(video_ids.error) != 404):
+            raise video_ids.error
+        return VideoTable.from_ids(video_ids, part)
+
+
+class NDJSON:
+    """
+    Потоковый экспорт и импорт объектов Channel, Video и PlayList в формате NDJSON
+    (один объект JSON на строку), при необходимости со сжатием gzip.
+    Объекты записываются и читаются по одному, поэтому расход памяти не зависит от их количества.
+    Если установлен orjson, он используется для сериализации, иначе стандартный json.
+    """
+
+    @staticmethod
+    def _dumps(data: dict) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(data) + b'\n'
+        return json.dumps(data, ensure_ascii=False).encode('utf-8') + b'\n'
+
+    @staticmethod
+    def _loads(line: bytes) -> dict:
+        if orjson is not None:
+            return orjson.loads(line)
+        return json.loads(line)
+
+    @staticmethod
+    def dump(objects: Iterable, path: str, compress: bool | None = None) -> int:
+        """
+        Записывает объекты в файл и возвращает их количество.
+        Если compress не указан, сжатие включается для файлов с расширением .gz.
+        """
+        if compress is None:
+            compress = path.endswith('.gz')
+        count = 0
+        with (gzip.open(path, 'wb', compresslevel=6) if compress else open(path, 'wb')) as file:
+            for obj in objects:
+                file.write(NDJSON._dumps(obj.to_dict()))
+                count += 1
+        return count
+
+    @staticmethod
+    def load(path: str) -> Iterator:
+        """Построчно читает файл и возвращает объекты Channel, Video и PlayList; сжатие gzip определяется по файлу"""
+        with open(path, 'rb') as file:
+            compressed = file.read(2) == b'\x1f\x8b'
+        with (gzip.open(path, 'rb') if compressed else open(path, 'rb')) as file:
+            for line in file:
+                if line.strip():
+                    yield NDJSON.from_dict(NDJSON._loads(line))
+
+    @staticmethod
+    def from_dict(data: dict):
+        """Создаёт объект по словарю, полученному методом to_dict"""
+        kind = data.pop('kind', None)
+        if kind == 'channel':
+            return Channel.from_record(ChannelRecord.from_dict(data))
+        if kind == 'video':
+            return Video.from_record(VideoRecord.from_dict(data))
+        if kind == 'playlist':
+            return PlayList.from_dict(data)
+        raise Exception(f'Неизвестный тип объекта: {kind}')
+
+
+class Dataset:
+    """
+    Офлайн-набор записанных ответов API с индексом для произвольного доступа.
+    Набор состоит из двух файлов:
+    - <path>.data: элементы ответов API (видео, каналы, плейлисты, элементы плейлистов), по одному JSON на строку;
+    - <path>.index: отсортированные по ключу записи фиксированной длины (ключ, смещение, длина) в формате .npy;
+      длина поля ключа равна длине самого длинного ключа набора.
+    Оба файла читаются через mmap: поиск по ключу - бинарный поиск в индексе, декодируется только
+    запрошенная запись. Ключ имеет вид '<ресурс>/<id>', для элементов плейлистов -
+    'playlistItems/<id плейлиста>/<позиция>', поэтому элементы плейлиста лежат в индексе подряд.
+    Attrs:
+        :param path: путь к набору без расширения
+        :type path: str
+    """
+
+    RESOURCES = {
+        'youtube#video': 'videos',
+        'youtube#channel': 'channels',
+        'youtube#playlist': 'playlists',
+        'youtube#playlistItem': 'playlistItems',
+    }
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.__data_file = open(f'{path}.data', 'rb')
+        self.__data = mmap.mmap(self.__data_file.fileno(), 0, access=mmap.ACCESS_READ) \
+            if os.path.getsize(f'{path}.data') else b''
+        self.__index = np.load(f'{path}.index', mmap_mode='r')
+
+    def __len__(self) -> int:
+        return len(self.__index)
+
+    def __enter__(self) -> 'Dataset':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Закрывает файлы набора"""
+        if isinstance(self.__data, mmap.mmap):
+            self.__data.close()
+        self.__data_file.close()
+
+    @staticmethod
+    def index_dtype(key_size: int) -> np.dtype:
+        """Возвращает тип записей индекса с полем ключа длиной key_size байт"""
+        return np.dtype([('key', f'S{max(key_size, 1)}'), ('offset', '<u8'), ('length', '<u4')])
+
+    @classmethod
+    def key(cls, item: dict) -> str:
+        """Возвращает ключ элемента ответа API в индексе"""
+        resource = cls.RESOURCES.get(item.get('kind'))
+        if resource is None:
+            raise Exception(f'Неизвестный тип элемента: {item.get("kind")}')
+        if resource == 'playlistItems':
+            snippet = item.get('snippet', {})
+            return f'playlistItems/{snippet.get("playlistId")}/{snippet.get("position", 0):08d}'
+        return f'{resource}/{item["id"]}'
+
+    @classmethod
+    def build(cls, path: str, items: Iterable[dict]) -> 'Dataset':
+        """
+        Записывает элементы ответов API в набор и возвращает открытый набор.
+        Элементы записываются потоково; в памяти держится только индекс.
+        """
+        index = []
+        offset = 0
+        with open(f'{path}.data', 'wb') as file:
+            for item in items:
+                line = NDJSON._dumps(item)
+                index.append((cls.key(item).encode(), offset, len(line) - 1))
+                file.write(line)
+                offset += len(line)
+        # поле ключа вмещает самый длинный ключ: обрезанные ключи нарушили бы порядок элементов плейлиста
+        entries = np.array(index, dtype=cls.index_dtype(max((len(entry[0]) for entry in index), default=1)))
+        entries.sort(order='key', kind='stable')
+        with open(f'{path}.index', 'wb') as file:
+            np.save(file, entries)
+        return cls(path)
+
+    @staticmethod
+    def items_from_files(paths: Iterable[str]) -> Iterator[dict]:
+        """Возвращает элементы items из файлов json с записанными ответами API"""
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as file:
+                yield from json.loads(file.read()).get('items', [])
+
+    def __decode(self, entry) -> dict:
+        offset = int(entry['offset'])
+        return NDJSON._loads(self.__data[offset:offset + int(entry['length'])])
+
+    def get(self, resource: str, item_id: str) -> dict | None:
+        """Возвращает элемент ресурса (videos, channels, playlists) по id или None"""
+        key = f'{resource}/{item_id}'.encode()
+        position = np.searchsorted(self.__index['key'], key)
+        if position < len(self.__index) and self.__index['key'][position] == key:
+            return self.__decode(self.__index[position])
+        return None
+
+    def __range(self, prefix: str) -> tuple:
+        """Возвращает границы записей индекса, ключ которых начинается с prefix"""
+        keys = self.__index['key']
+        return int(np.searchsorted(keys, prefix.encode())), int(np.searchsorted(keys, prefix.encode() + b'\xff'))
+
+    def scan(self, prefix: str, start: int = 0, stop: int | None = None) -> Iterator[dict]:
+        """
+        Возвращает элементы, ключ которых начинается с prefix, в порядке ключей.
+        start и stop ограничивают номера элементов среди найденных, как в срезе; декодируются только они.
+        """
+        low, high = self.__range(prefix)
+        end = high if stop is None else min(low + stop, high)
+        for position in range(low + start, end):
+            yield self.__decode(self.__index[position])
+
+    def playlist_items(self, playlist_id: str, start: int = 0, stop: int | None = None) -> Iterator[dict]:
+        """Возвращает элементы плейлиста в порядке позиций, начиная с номера start и до stop"""
+        return self.scan(f'playlistItems/{playlist_id}/', start, stop)
+
+    def __iter__(self) -> Iterator[dict]:
+        """Последовательно возвращает все элементы набора в порядке записи"""
+        start = 0
+        size = len(self.__data)
+        while start < size:
+            end = self.__data.find(b'\n', start)
+            end = size if end == -1 else end
+            if end > start:
+                yield NDJSON._loads(self.__data[start:end])
+            start = end + 1
+
+
+class _OfflineRequest:
+    """Запрос к офлайн-набору с интерфейсом запроса googleapiclient"""
+
+    def __init__(self, dataset: Dataset, resource: str, params: dict) -> None:
+        self.dataset = dataset
+        self.resource = resource
+        self.params = params
+        self.headers = {}
+
+    def execute(self) -> dict:
+        if self.resource == 'playlistItems':
+            return self.__page()
+        items = [self.dataset.get(self.resource, item_id) for item_id in self.params.get('id', '').split(',')]
+        return {'kind': f'youtube#{self.resource}ListResponse', 'items': [item for item in items if item is not None]}
+
+    def __page(self) -> dict:
+        start = int(self.params.get('pageToken') or 0)
+        size = int(self.params.get('maxResults', 5))
+        if 'videoId' in self.params:
+            items = (item for item in self.dataset.playlist_items(self.params['playlistId'])
+                     if Youtube.playlist_item_video_id(item) == self.params['videoId'])
+            page = list(itertools.islice(items, start, start + size + 1))
+        else:
+            # декодируется только запрошенная страница и один элемент за ней, а не весь плейлист до неё
+            page = list(self.dataset.playlist_items(self.params['playlistId'], start, start + size + 1))
+        response = {'kind': 'youtube#playlistItemListResponse', 'items': page[:size]}
+        if len(page) > size:
+            response['nextPageToken'] = str(start + size)
+        return response
+
+
+class _OfflineResource:
+    def __init__(self, dataset: Dataset, resource: str) -> None:
+        self.dataset = dataset
+        self.resource = resource
+
+    def list(self, **params) -> _OfflineRequest:
+        return _OfflineRequest(self.dataset, self.resource, params)
+
+
+class OfflineClient:
+    """
+    Клиент с интерфейсом googleapiclient, отвечающий данными из офлайн-набора Dataset.
+    Подключается через Youtube.set_client(OfflineClient(dataset)).
+    """
+
+    def __init__(self, dataset: Dataset) -> None:
+        self.dataset = dataset
+
+    def channels(self) -> _OfflineResource:
+        return _OfflineResource(self.dataset, 'channels')
+
+    def videos(self) -> _OfflineResource:
+        return _OfflineResource(self.dataset, 'videos')
+
+    def playlists(self) -> _OfflineResource:
+        return _OfflineResource(self.dataset, 'playlists')
+
+    def playlistItems(self) -> _OfflineResource:
+        return _OfflineResource(self.dataset, 'playlistItems')
+
+
+class DumpAggregate:
+    """
+    Сводная статистика по файлам json с записанными ответами API (тем же, что читают
+    Channel(channel_json=...), Video(video_json=...) и PlayList(playlist_json=...)): количества элементов,
+    суммы, лучшие видео и каналы и гистограммы просмотров, лайков и длительностей видео.
+    Агрегаты по разным частям файлов объединяются методом merge, поэтому файлы можно обрабатывать
+    в нескольких процессах (from_files). Элемент, встречающийся в нескольких файлах, учитывается каждый раз.
+    Attrs:
+        :param top: количество лучших видео (по просмотрам) и каналов (по подписчикам)
+        :type top: int
+    """
+
+    COUNTS = ('files', 'channels', 'videos', 'playlists', 'playlist_items')
+    SUMS = VideoTable.COLUMNS + ('subscriber_count', 'channel_view_count', 'channel_video_count')
+    # левые границы интервалов гистограмм; последний интервал не ограничен сверху
+    HISTOGRAM_EDGES = {
+        'view_count': (0,) + tuple(10 ** power for power in range(13)),
+        'like_count': (0,) + tuple(10 ** power for power in range(11)),
+        'duration_seconds': (0, 60, 300, 600, 1200, 1800, 3600, 7200, 14400),
+    }
+
+    def __init__(self, top: int = 10) -> None:
+        self.top = top
+        self.counts = dict.fromkeys(self.COUNTS, 0)
+        self.sums = dict.fromkeys(self.SUMS, 0)
+        self.histograms = {name: np.zeros(len(edges), dtype=np.int64) for name, edges in self.HISTOGRAM_EDGES.items()}
+        self.top_videos = []
+        self.top_channels = []
+        self.failed = []
+
+    def __repr__(self) -> str:
+        return f'DumpAggregate(files={self.counts["files"]}, videos={self.counts["videos"]})'
+
+    @staticmethod
+    def _best(rows: Iterable[tuple], top: int) -> List[tuple]:
+        """Возвращает top пар (id, значение) с наибольшими значениями; при равенстве выше меньший id"""
+        return heapq.nsmallest(top, rows, key=lambda row: (-row[1], row[0]))
+
+    def add_items(self, items: Iterable[dict]) -> 'DumpAggregate':
+        """Добавляет в агрегат элементы ответов API; элементы неизвестных видов пропускаются"""
+        videos, channels = [], []
+        for item in items:
+            kind = item.get('kind', '')
+            if kind == 'youtube#video':
+                videos.append(item)
+            elif kind == 'youtube#channel':
+                channels.append(ChannelRecord.from_item(item))
+            elif kind == 'youtube#playlist':
+                self.counts['playlists'] += 1
+            elif kind == 'youtube#playlistItem':
+                self.counts['playlist_items'] += 1
+        if videos:
+            self.__add_videos(VideoTable.from_items(videos))
+        if channels:
+            self.__add_channels(channels)
+        return self
+
+    def __add_videos(self, table: VideoTable) -> None:
+        self.counts['videos'] += len(table)
+        for name in VideoTable.COLUMNS:
+            self.sums[name] += table.sum(name)
+        for name, edges in self.HISTOGRAM_EDGES.items():
+            bins = np.searchsorted(edges, table.column(name), side='right') - 1
+            self.histograms[name] += np.bincount(bins, minlength=len(edges))
+        best = table.top_k('view_count', self.top)
+        self.top_videos = self._best(self.top_videos + list(zip(best.video_ids.tolist(), best.view_count.tolist())),
+                                     self.top)
+
+    def __add_channels(self, channels: List[ChannelRecord]) -> None:
+        self.counts['channels'] += len(channels)
+        for record in channels:
+            self.sums['subscriber_count'] += record.subscriber_count or 0
+            self.sums['channel_view_count'] += record.view_count or 0
+            self.sums['channel_video_count'] += record.video_count or 0
+        rows = [(record.channel_id, record.subscriber_count or 0) for record in channels]
+        self.top_channels = self._best(self.top_channels + rows, self.top)
+
+    def add_file(self, path: str) -> 'DumpAggregate':
+        """Добавляет в агрегат элементы из файла; файл, который не удалось прочитать, попадает в failed"""
+        try:
+            items = list(Dataset.items_from_files([path]))
+        except (OSError, ValueError, AttributeError):
+            self.failed.append(path)
+            return self
+        self.counts['files'] += 1
+        return self.add_items(items)
+
+    def merge(self, other: 'DumpAggregate') -> 'DumpAggregate':
+        """Добавляет к агрегату данные другого агрегата (например, посчитанного в другом процессе)"""
+        for name in self.COUNTS:
+            self.counts[name] += other.counts[name]
+        for name in self.SUMS:
+            self.sums[name] += other.sums[name]
+        for name in self.HISTOGRAM_EDGES:
+            self.histograms[name] += other.histograms[name]
+        self.top_videos = self._best(self.top_videos + other.top_videos, self.top)
+        self.top_channels = self._best(self.top_channels + other.top_channels, self.top)
+        self.failed.extend(other.failed)
+        return self
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[str], top: int = 10) -> 'DumpAggregate':
+        """Возвращает агрегат по файлам, обработанным последовательно в текущем процессе"""
+        aggregate = cls(top)
+        for path in paths:
+            aggregate.add_file(path)
+        return aggregate
+
+    @classmethod
+    def from_files(cls, paths: Iterable[str], workers: int | None = None, top: int = 10,
+                   shards_per_worker: int = 4) -> 'DumpAggregate':
+        """
+        Возвращает агрегат по файлам, распределённым между workers процессами (по умолчанию по числу ядер).
+        Файлы делятся на shards_per_worker частей на процесс, чтобы процессы, получившие крупные файлы,
+        не задерживали остальных; каждый процесс возвращает частичный агрегат, и они объединяются через merge.
+        При workers=1 файлы обрабатываются в текущем процессе.
+        """
+        paths = list(paths)
+        workers = min(workers or os.cpu_count() or 1, max(len(paths), 1))
+        if workers <= 1:
+            return cls.from_paths(paths, top)
+        shard_count = min(len(paths), workers * shards_per_worker)
+        shards = [paths[index::shard_count] for index in range(shard_count)]
+        aggregate = cls(top)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for partial in executor.map(functools.partial(cls.from_paths, top=top), shards):
+                aggregate.merge(partial)
+        return aggregate
+
+    def mean(self, name: str) -> float:
+        """Возвращает среднее значение по видео (view_count, like_count, comment_count, duration_seconds)"""
+        if name not in VideoTable.COLUMNS:
+            raise ValueError(f'Неизвестный столбец: {name}')
+        return self.sums[name] / self.counts['videos'] if self.counts['videos'] else 0.0
+
+    def histogram(self, name: str) -> tuple:
+        """Возвращает гистограмму: количества и левые границы интервалов (последний не ограничен сверху)"""
+        return self.histograms[name].copy(), np.asarray(self.HISTOGRAM_EDGES[name])
+
+    def to_dict(self) -> dict:
+        """Возвращает агрегат в виде словаря, пригодного для записи в json"""
+        return {
+            'counts': dict(self.counts),
+            'sums': dict(self.sums),
+            'histograms': {name: {'edges': list(self.HISTOGRAM_EDGES[name]), 'counts': counts.tolist()}
+                           for name, counts in self.histograms.items()},
+            'top_videos': [list(row) for row in self.top_videos],
+            'top_channels': [list(row) for row in self.top_channels],
+            'failed': list(self.failed),
+        }
+
+
+class YoutubeApiError(Exception):
+    """
+    Ошибка ответа API YouTube, полученная асинхронным клиентом
+    Attrs:
+        status (int): HTTP-статус ответа
+        reasons (list): причины ошибки из тела ответа (например, quotaExceeded)
+    """
+
+    def __init__(self, status: int, content: bytes) -> None:
+        self.status = status
+        self.content = content
+        try:
+            errors = json.loads(content).get('error', {}).get('errors', [])
+        except (ValueError, AttributeError):
+            errors = []
+        self.reasons = [error.get('reason') for error in errors]
+        super().__init__(f'YouTube API error {status}: {self.reasons}')
+
+
+class _ConnectionPool:
+    """
+    Пул HTTP-соединений с поддержкой keep-alive к одному хосту.
+    Соединение берётся из пула на время запроса и возвращается обратно после чтения ответа.
+    """
+
+    def __init__(self, base_url: str, size: int, timeout: float) -> None:
+        url = urlsplit(base_url)
+        self.__connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.__host = url.netloc
+        self.__path = url.path.rstrip('/')
+        self.__timeout = timeout
+        self.__idle = queue.LifoQueue(maxsize=size)
+
+    def get(self, path: str) -> tuple:
+        """Выполняет GET-запрос и возвращает HTTP-статус и тело ответа"""
+        try:
+            connection, reused = self.__idle.get_nowait(), True
+        except queue.Empty:
+            connection, reused = self.__connection_class(self.__host, timeout=self.__timeout), False
+        try:
+            connection.request('GET', f'{self.__path}/{path}', headers={'Accept-Encoding': 'gzip'})
+            response = connection.getresponse()
+            content = response.read()
+        except (http.client.HTTPException, ConnectionError):
+            connection.close()
+            if reused:
+                # соединение могло быть закрыто сервером, пока лежало в пуле
+                return self.get(path)
+            raise
+        if response.getheader('Content-Encoding') == 'gzip':
+            content = gzip.decompress(content)
+        try:
+            self.__idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+        return response.status, content
+
+    def close(self) -> None:
+        """Закрывает все свободные соединения"""
+        while True:
+            try:
+                self.__idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class AsyncYoutube:
+    """
+    Асинхронный клиент API YouTube для массовой загрузки каналов, видео и плейлистов.
+    Одновременно выполняется не более concurrency запросов; соединения переиспользуются через пул.
+    Запросы выполняются в пуле потоков, поэтому клиент не требует сторонних HTTP-библиотек.
+    Attrs:
+        :param api_key: ключ для работы с API YouTube (по умолчанию Youtube.YOUTUBE_API_KEY)
+        :type api_key: str
+        :param base_url: адрес API (для тестов можно указать локальный сервер)
+        :type base_url: str
+        :param concurrency: максимальное количество одновременных запросов
+        :type concurrency: int
+        :param timeout: тайм-аут запроса в секундах
+        :type timeout: float
+    """
+
+    BASE_URL = 'https://www.googleapis.com/youtube/v3'
+
+    def __init__(self, api_key: str | None = None, base_url: str | None = None, concurrency: int = 10,
+                 timeout: float = 30) -> None:
+        self.api_key = api_key or Youtube.YOUTUBE_API_KEY or os.environ.get('YOUTUBE_API_KEY')
+        self.concurrency = concurrency
+        self.__pool = _ConnectionPool(base_url or self.BASE_URL, concurrency, timeout)
+        self.__executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='async-youtube')
+        self.__semaphore = asyncio.Semaphore(concurrency)
+        self.__in_flight = {}
+
+    async def __aenter__(self) -> 'AsyncYoutube':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Освобождает пул потоков и соединений"""
+        self.__executor.shutdown(wait=False)
+        self.__pool.close()
+
+    async def _execute(self, resource: str, **params) -> dict:
+        """
+        Выполняет запрос list к ресурсу API и возвращает разобранный ответ.
+        Одновременные одинаковые запросы из разных задач выполняются один раз, если не отключён
+        Youtube.single_flight; отмена одной из ожидающих задач не отменяет общий запрос.
+        """
+        if Youtube.single_flight is None:
+            return await self._execute_retrying(resource, **params)
+        key = (resource, tuple(sorted(params.items())))
+        task = self.__in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._execute_retrying(resource, **params))
+            self.__in_flight[key] = task
+            task.add_done_callback(lambda _: self.__in_flight.pop(key, None))
+        elif Youtube.metrics is not None:
+            Youtube.metrics.add(resource, 'coalesced')
+        return await asyncio.shield(task)
+
+    async def _execute_retrying(self, resource: str, **params) -> dict:
+        """Выполняет запрос, повторяя временные ошибки по правилам Youtube.retry_policy"""
+        metrics = Youtube.metrics
+        if metrics is None:
+            return await Youtube.retry_policy.call_async(self._execute_once, resource, **params)
+        attempts = itertools.count()
+
+        async def attempt():
+            if next(attempts):
+                metrics.add(resource, 'retries')
+            return await self._execute_once(resource, **params)
+
+        return await Youtube.retry_policy.call_async(attempt)
+
+    async def _execute_once(self, resource: str, **params) -> dict:
+        """Выполняет одну попытку запроса к ресурсу API"""
+        if self.api_key:
+            params['key'] = self.api_key
+        path = f'{resource}?{urlencode(params)}'
+        async with self.__semaphore:
+            loop = asyncio.get_running_loop()
+            if Youtube.scheduler is not None:
+                await loop.run_in_executor(
+                    self.__executor, Youtube.scheduler.acquire, resource, _request_priority.get()
+                )
+            started = time.perf_counter()
+            status, content = await loop.run_in_executor(self.__executor, self.__pool.get, path)
+        metrics = Youtube.metrics
+        if metrics is not None:
+            quota = (Youtube.scheduler or QuotaScheduler).ENDPOINT_COSTS.get(resource, 1)
+            metrics.record_call(resource, time.perf_counter() - started, quota, error=status >= 300)
+            metrics.add(resource, 'bytes', len(content))
+        if status >= 300:
+            raise YoutubeApiError(status, content)
+        return json.loads(content)
+
+    async def _get_many(self, resource: str, ids: Iterable[str], part: str | None = None,
+                        fields: str | None = None) -> Dict[str, dict]:
+        """Загружает элементы ресурса по id пачками по Youtube.MAX_IDS_PER_REQUEST, пачки запрашиваются параллельно"""
+        unique_ids = list(dict.fromkeys(ids))
+        size = Youtube.MAX_IDS_PER_REQUEST
+        responses = await asyncio.gather(*[
+            self._execute(resource, **Youtube._projection(resource, part, fields,
+                                                          id=','.join(unique_ids[start:start + size]), maxResults=size))
+            for start in range(0, len(unique_ids), size)
+        ])
+        return {item['id']: item for response in responses for item in response.get('items', [])}
+
+    async def get_channels(self, channel_ids: Iterable[str], part: str | None = None,
+                           fields: str | None = None) -> Dict[str, dict]:
+        """Возвращает данные о каналах в виде словаря {id канала: данные канала}"""
+        return await self._get_many('channels', channel_ids, part, fields)
+
+    async def get_videos(self, video_ids: Iterable[str], part: str | None = None,
+                         fields: str | None = None) -> Dict[str, dict]:
+        """Возвращает данные о видео в виде словаря {id видео: данные видео}"""
+        return await self._get_many('videos', video_ids, part, fields)
+
+    async def get_playlist(self, playlist_id: str, part: str | None = None, fields: str | None = None) -> dict:
+        """Возвращает данные о плейлисте"""
+        return await self._execute('playlists', **Youtube._projection('playlists', part, fields, id=playlist_id,
+                                                                      maxResults=50))
+
+    async def get_playlist_video_ids(self, playlist_id: str) -> List[str]:
+        """Возвращает список id видео в плейлисте"""
+        video_ids = []
+        params = Youtube._projection('playlistItems', None, Youtube.PLAYLIST_ITEM_IDS_FIELDS, playlistId=playlist_id,
+                                     maxResults=50)
+        while True:
+            page = await self._execute('playlistItems', **params)
+            video_ids.extend(item['contentDetails']['videoId'] for item in page['items'])
+            params['pageToken'] = page.get('nextPageToken')
+            if not params['pageToken']:
+                return video_ids
+
+    async def load_channels(self, channel_ids: Iterable[str]) -> List[Channel]:
+        """Возвращает список каналов, созданных из загруженных данных"""
+        items = await self.get_channels(channel_ids, fields=None if Channel.KEEP_RAW else ChannelRecord.fields_mask())
+        return [Channel.from_item(item) for item in items.values()]
+
+    async def load_videos(self, video_ids: Iterable[str]) -> List[Video]:
+        """Возвращает список видео, созданных из загруженных данных"""
+        items = await self.get_videos(video_ids, fields=None if Video.KEEP_RAW else VideoRecord.fields_mask())
+        return [Video.from_item(item) for item in items.values()]
+
+
+class AsyncPlayList:
+    """Асинхронная загрузка плейлистов через AsyncYoutube"""
+
+    @staticmethod
+    async def load(playlist_id: str, client: AsyncYoutube) -> PlayList:
+        """Загружает плейлист: данные плейлиста и список видео запрашиваются параллельно"""
+        playlist_info, video_ids = await asyncio.gather(
+            client.get_playlist(playlist_id, part='snippet', fields=PlayList.INFO_FIELDS),
+            client.get_playlist_video_ids(playlist_id)
+        )
+        return PlayList(playlist_id=playlist_id, playlist_info=playlist_info, video_ids=video_ids)
+
+    @staticmethod
+    async def load_many(playlist_ids: Iterable[str], client: AsyncYoutube) -> List[PlayList]:
+        """Загружает несколько плейлистов параллельно"""
+        return list(await asyncio.gather(*[AsyncPlayList.load(playlist_id, client) for playlist_id in playlist_ids]))